@@ -1,28 +1,35 @@
-from app.algorithms.q_learning import QLearning
-from app.algorithms.sarsa import SARSA
-from app.algorithms.policy_iteration import PolicyIteration
-from app.algorithms.value_iteration import ValueIteration
-from app.algorithms.monte_carlo import MonteCarlo
-from app.algorithms.td import TDLearning
-from app.algorithms.n_step_td import NStepTD
+import importlib
+from typing import Dict, Tuple, Type
 from app.algorithms.base import RLAlgorithm
 from app.models.enums import AlgorithmType
 
+# Algorithm modules are imported on first use (see app.environments)
+# AlgorithmType -> (module, class name)
+ALGORITHM_REGISTRY: Dict[AlgorithmType, Tuple[str, str]] = {
+    AlgorithmType.Q_LEARNING: ("app.algorithms.q_learning", "QLearning"),
+    AlgorithmType.SARSA: ("app.algorithms.sarsa", "SARSA"),
+    AlgorithmType.POLICY_ITERATION: ("app.algorithms.policy_iteration", "PolicyIteration"),
+    AlgorithmType.VALUE_ITERATION: ("app.algorithms.value_iteration", "ValueIteration"),
+    AlgorithmType.MONTE_CARLO: ("app.algorithms.monte_carlo", "MonteCarlo"),
+    AlgorithmType.TD_LEARNING: ("app.algorithms.td", "TDLearning"),
+    AlgorithmType.N_STEP_TD: ("app.algorithms.n_step_td", "NStepTD"),
+}
+
+_CLASS_MODULES = {class_name: module for module, class_name in ALGORITHM_REGISTRY.values()}
+
+def get_algorithm_class(algo_type: AlgorithmType) -> Type[RLAlgorithm]:
+    """Import (on first use) and return the class implementing an algorithm type"""
+    if algo_type not in ALGORITHM_REGISTRY:
+        raise ValueError(f"Unknown algorithm type: {algo_type}")
+    module, class_name = ALGORITHM_REGISTRY[algo_type]
+    return getattr(importlib.import_module(module), class_name)
+
 def create_algorithm(algo_type: AlgorithmType) -> RLAlgorithm:
     """Factory function to create algorithms"""
-    if algo_type == AlgorithmType.Q_LEARNING:
-        return QLearning()
-    elif algo_type == AlgorithmType.SARSA:
-        return SARSA()
-    elif algo_type == AlgorithmType.POLICY_ITERATION:
-        return PolicyIteration()
-    elif algo_type == AlgorithmType.VALUE_ITERATION:
-        return ValueIteration()
-    elif algo_type == AlgorithmType.MONTE_CARLO:
-        return MonteCarlo()
-    elif algo_type == AlgorithmType.TD_LEARNING:
-        return TDLearning()
-    elif algo_type == AlgorithmType.N_STEP_TD:
-        return NStepTD()
-    else:
-        raise ValueError(f"Unknown algorithm type: {algo_type}")
+    return get_algorithm_class(algo_type)()
+
+def __getattr__(name: str):
+    # Keeps `from app.algorithms import QLearning` working without eager imports
+    if name in _CLASS_MODULES:
+        return getattr(importlib.import_module(_CLASS_MODULES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,167 @@
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from app.algorithms.shared import PREVIEW_SIZE, ProcessGroup, SharedArray, read_preview, write_preview
+from app.models.schemas import TrainingConfig
+
+# Transition record columns
+STATE, ACTION, REWARD, NEXT_STATE, DONE, EPISODE_END = range(6)
+RECORD_COLUMNS = 6
+RING_CAPACITY = 1 << 15  # records per actor
+PUSH_WAIT_SECONDS = 0.001  # actor back-off while its ring is full
+RECORDS_PER_POLL = 4096  # learner budget per poll over all actors; bounds each next() on the event loop
+
+class TransitionRing:
+    """
+    Single-producer / single-consumer ring of transition records in shared memory.
+    The actor only advances the write cursor and the learner only the read cursor,
+    so no lock is needed: a record is written before the cursor that publishes it.
+    Records are (state, action, reward, next_state, done, episode_end); done marks a
+    terminal state (no bootstrap), episode_end also covers the time limit. Other
+    record layouts pass their column count to create().
+    """
+
+    def __init__(self, records: SharedArray, cursors: SharedArray):
+        self.records = records
+        self.cursors = cursors  # [records written, records read], both monotonic
+        self.capacity = records.shape[0]
+
+    @classmethod
+    def create(cls, capacity: int = RING_CAPACITY, columns: int = RECORD_COLUMNS) -> "TransitionRing":
+        cursors = SharedArray((2,), np.int64)
+        cursors.array[...] = 0
+        return cls(SharedArray((capacity, columns)), cursors)
+
+    @classmethod
+    def attach(cls, spec) -> "TransitionRing":
+        records_spec, cursors_spec = spec
+        return cls(SharedArray.attach(records_spec), SharedArray.attach(cursors_spec))
+
+    def spec(self):
+        return self.records.spec(), self.cursors.spec()
+
+    def push(self, record: Tuple[float, ...]) -> bool:
+        """Append one record (actor side); False if the ring is full"""
+        written, read = self.cursors.array
+        if written - read >= self.capacity:
+            return False
+        self.records.array[written % self.capacity] = record
+        self.cursors.array[0] = written + 1
+        return True
+
+    def pop_batch(self, max_records: int) -> np.ndarray:
+        """Copy out up to max_records records in order (learner side)"""
+        written, read = self.cursors.array
+        n = int(min(written - read, max_records))
+        if n <= 0:
+            return np.empty((0, self.records.shape[1]))
+        batch = self.records.array[np.arange(read, read + n) % self.capacity]
+        self.cursors.array[1] = read + n
+        return batch
+
+    def close(self):
+        self.records.close()
+        self.cursors.close()
+
+def _actor_worker(actor: int, ring_spec, policy_spec, preview_spec, stop, config_data: Dict[str, Any],
+                  env_options: Dict[str, Any], n_episodes: int, seed: int):
+    """
+    Actor process: epsilon-greedy episodes on a local copy of the policy Q-table,
+    refreshed from the learner every config.policy_sync_interval episodes.
+    """
+    from app.environments import create_environment
+
+    np.random.seed(seed)
+    config = TrainingConfig.model_validate(config_data)
+    env = create_environment(config.environment, **env_options)
+    ring = TransitionRing.attach(ring_spec)
+    policy_shared = SharedArray.attach(policy_spec)
+    preview_shared = SharedArray.attach(preview_spec)
+    preview = preview_shared.array if actor == 0 else None
+    q_table = np.array(policy_shared.array)
+    n_actions = q_table.shape[1]
+    try:
+        for episode in range(n_episodes):
+            if stop.is_set():
+                break
+            if episode % config.policy_sync_interval == 0:
+                q_table[...] = policy_shared.array
+            state = env.reset().observation
+            for step in range(config.max_steps):
+                if np.random.random() < config.epsilon:
+                    action = np.random.randint(n_actions)
+                else:
+                    q_values = q_table[state]
+                    best_actions = np.flatnonzero(q_values == q_values.max())
+                    action = best_actions[np.random.randint(len(best_actions))]
+                next_state_info = env.step(action)
+                next_state = next_state_info.observation
+                done = next_state_info.done
+                record = (state, action, next_state_info.reward, next_state, done, done or step == config.max_steps - 1)
+                while not ring.push(record):
+                    if stop.is_set():
+                        return
+                    time.sleep(PUSH_WAIT_SECONDS)
+                if preview is not None:
+                    write_preview(preview, next_state_info.info.get('continuous_state', [next_state]))
+                state = next_state
+                if done:
+                    break
+    finally:
+        env.close()
+        ring.close()
+        policy_shared.close()
+        preview_shared.close()
+
+class ActorLearnerRunner:
+    """
+    Owns the actor processes of one actor/learner session, one transition ring
+    per actor, and the shared policy table the actors pull from.
+    """
+
+    def __init__(self, q_table: np.ndarray, config: TrainingConfig, env_options: Dict[str, Any],
+                 ring_capacity: int = RING_CAPACITY):
+        self.config = config
+        self.n_actors = config.n_workers
+        self.policy = SharedArray.from_array(q_table)
+        self.rings = [TransitionRing.create(ring_capacity) for _ in range(self.n_actors)]
+        self.preview = SharedArray((PREVIEW_SIZE,))
+        self.preview.array[...] = 0.0
+        self._env_options = env_options
+        self.workers = ProcessGroup()
+
+    def start(self, seed: Optional[int] = None):
+        seed = np.random.randint(2 ** 31 - self.n_actors) if seed is None else seed
+        # Split the episode budget across actors
+        shares = np.full(self.n_actors, self.config.n_episodes // self.n_actors)
+        shares[:self.config.n_episodes % self.n_actors] += 1
+        config_data = self.config.model_dump(mode="json")
+        self.workers.start(_actor_worker, [
+            (actor, self.rings[actor].spec(), self.policy.spec(), self.preview.spec(), self.workers.stop_event,
+             config_data, self._env_options, int(shares[actor]), seed + actor)
+            for actor in range(self.n_actors)
+        ])
+
+    def is_alive(self) -> bool:
+        return self.workers.is_alive()
+
+    def drain(self, max_records: int) -> List[np.ndarray]:
+        """Pending records of each actor (up to max_records per actor)"""
+        return [ring.pop_batch(max_records) for ring in self.rings]
+
+    def publish(self, q_table: np.ndarray):
+        """Copy the learner's table into the policy snapshot (actors may read a mix of old and new rows)"""
+        self.policy.array[...] = q_table
+
+    def preview_state(self) -> List[float]:
+        return read_preview(self.preview.array)
+
+    def close(self):
+        """Stop the actors; rings and tables are freed once they have exited (in the background)"""
+        self.workers.stop(cleanup=self._free)
+
+    def _free(self):
+        for ring in self.rings:
+            ring.close()
+        self.policy.close()
+        self.preview.close()
@@ -1,8 +1,44 @@
+import numpy as np
 from abc import ABC, abstractmethod
-from typing import Generator, Dict, Any, Union
-from app.models.schemas import TrainingConfig, TrainingUpdate
+from typing import Generator, Dict, Any, Union, Tuple, Optional
+from app.algorithms.actor_learner import ActorLearnerRunner, EPISODE_END, RECORDS_PER_POLL, REWARD
+from app.algorithms.q_storage import HashedQTable, create_table, export_table, greedy_actions, import_table, is_table, table_rows
+from app.algorithms.timing import NULL_TIMER, PhaseTimer
+from app.environments import environment_options
+from app.models.schemas import TrainingConfig, TrainingUpdate, EnvironmentState
+from app.models.enums import EnvironmentType
+
+# Defaults for the Breakout fields sent to the frontend renderer
+BREAKOUT_RENDER_DEFAULTS = {
+    'paddle_x': 80,
+    'ball_x': 80,
+    'ball_y': 100,
+    'ball_vel_x': 0,
+    'ball_vel_y': 0,
+    'lives': 5,
+    'score': 0,
+    'bricks_destroyed': 0,
+    'remaining_bricks': 40
+}
 
 class RLAlgorithm(ABC):
+    # Attributes holding the learned tables (persisted when a session is hibernated)
+    state_attributes: Tuple[str, ...] = ("q_table",)
+    # Per-phase timer; sessions replace it with an enabled PhaseTimer on request
+    timer: PhaseTimer = NULL_TIMER
+    # Env steps behind the last yielded update when it is not one per lane (parallel modes)
+    update_env_steps: Optional[int] = None
+    # Sink for finished episodes; sessions attach an EpisodeLog (app.services.learning_curves)
+    episode_log = None
+    # Continue from the tables already loaded (forked sessions) instead of reinitializing them
+    warm_start: bool = False
+    # Subscriber-selected Projection for snapshots; snapshot_projection describes the last one taken
+    projection = None
+    snapshot_projection: Optional[Dict[str, Any]] = None
+    # Early-stopping ConvergenceMonitor (app.algorithms.convergence); sessions attach one per run
+    convergence = None
+    convergence_reason: Optional[str] = None
+
     @abstractmethod
     def train(self, env, config: TrainingConfig) -> Generator[TrainingUpdate, None, None]:
         pass
@@ -18,3 +54,256 @@ class RLAlgorithm(ABC):
     @abstractmethod
     def select_action(self, state: Union[int, tuple]) -> int:
         pass
+    
+    def _visualization_state(self, env, config: TrainingConfig, state: Any, state_info: EnvironmentState) -> Any:
+        """
+        State sent to the frontend: continuous observation for CartPole and MountainCar,
+        render data (paddle_x, ball_x, ball_y, lives) for Breakout, the discrete state otherwise.
+        """
+        if config.environment == EnvironmentType.CARTPOLE or config.environment == EnvironmentType.MOUNTAINCAR:
+            return state_info.info.get('continuous_state', state)
+        if config.environment == EnvironmentType.BREAKOUT:
+            t0 = self.timer.start()
+            render_data = env.render()
+            visualization_state = {key: render_data.get(key, default) for key, default in BREAKOUT_RENDER_DEFAULTS.items()}
+            self.timer.lap("render", t0)
+            return visualization_state
+        return state
+    
+    def _init_q_table(self, config: TrainingConfig, name: str = "q_table", dtype=None):
+        """
+        Per-(state, action) table for the start of train() in the configured backend
+        (app.algorithms.q_storage): small random values (zeros for integer dtypes), or
+        the loaded one when warm-starting.
+        """
+        table = getattr(self, name, None)
+        if self.warm_start and is_table(table) and table.shape == (self.n_states, self.n_actions):
+            return table
+        return create_table(self.n_states, self.n_actions, config.q_table_backend, dtype or config.q_table_dtype.value)
+    
+    def _end_episode(self, reward: float, length: int) -> bool:
+        """Learners call this once per finished episode; True once training has converged"""
+        if self.episode_log is not None:
+            self.episode_log.append(reward, length)
+        if self.convergence is not None and self.convergence_reason is None:
+            self.convergence_reason = self.convergence.update(getattr(self, "q_table", None), reward)
+        return self.convergence_reason is not None
+    
+    def _converged_update(self, episode: int, cumulative_reward: float, state: Any) -> TrainingUpdate:
+        """Last update of a run stopped by the convergence monitor, carrying a final snapshot"""
+        value_function, policy = self._snapshot(True)
+        return TrainingUpdate(
+            episode=episode,
+            step=0,
+            reward=0.0,
+            cumulative_reward=cumulative_reward,
+            state=state,
+            action=0,
+            value_function=value_function,
+            policy=policy
+        )
+    
+    def _refine_tables(self, env):
+        """
+        Call after env.reset() on an adaptive environment: grow the per-state tables
+        to the refined state space, each new state starting from its parent's row.
+        """
+        splits = env.take_splits()
+        n_states = env.get_state_space()['n']
+        if n_states == self.n_states:
+            return
+        for name in self.state_attributes:
+            table = getattr(self, name, None)
+            if isinstance(table, HashedQTable) and len(table) == self.n_states:
+                table.grow(n_states, splits)
+                continue
+            if not isinstance(table, np.ndarray) or len(table) != self.n_states:
+                continue
+            grown = np.zeros((n_states,) + table.shape[1:], dtype=table.dtype)
+            grown[:self.n_states] = table
+            # In creation order, so a split of a just-created state copies the right row
+            for parent, child in splits:
+                if child >= self.n_states:
+                    grown[child] = grown[parent]
+            setattr(self, name, grown)
+        self.n_states = n_states
+    
+    def _compiled_kernels(self, env, config: TrainingConfig):
+        """The kernels module when config.use_jit and env can run in it, else None.
+        Imported here so sessions on the Python path never load Numba."""
+        if not config.use_jit:
+            return None
+        from app.algorithms import kernels
+        return kernels if kernels.jit_available(env) else None
+    
+    def _train_compiled(self, env, config: TrainingConfig, n_rows: int,
+                        run_episode) -> Generator[TrainingUpdate, None, None]:
+        """
+        Drive whole episodes through a compiled kernel (see kernels.py):
+        run_episode(start, uniforms) -> (episode reward, steps, final state, last action).
+        Streams one summary update per episode instead of one per step.
+        """
+        cumulative_reward = 0.0
+        timer = self.timer
+        for episode in range(config.n_episodes):
+            start = env.reset().observation
+            uniforms = np.random.random((n_rows, 3))
+            t0 = timer.start()
+            episode_reward, steps, final_state, last_action = run_episode(start, uniforms)
+            timer.lap("episode_kernel", t0)
+            cumulative_reward += episode_reward
+            converged = self._end_episode(episode_reward, steps)
+            
+            value_function, policy = self._snapshot(converged or episode % 50 == 0)
+            t0 = timer.start()
+            update = TrainingUpdate(
+                episode=episode + 1,
+                step=int(steps),
+                reward=float(episode_reward),
+                cumulative_reward=cumulative_reward,
+                state=int(final_state),
+                action=int(last_action),
+                value_function=value_function,
+                policy=policy
+            )
+            timer.lap("update_build", t0)
+            yield update
+            if converged:
+                break
+    
+    def _train_actor_learner(self, env, config: TrainingConfig, learn) -> Generator[TrainingUpdate, None, None]:
+        """
+        Actor/learner training: config.n_workers actor processes push transitions into
+        shared-memory rings and this generator is the learner. Each poll drains the
+        rings, hands every actor's records to learn(actor, batch), publishes q_table as
+        the actors' next policy snapshot and yields one progress update.
+        """
+        runner = ActorLearnerRunner(self.q_table, config, environment_options(config))
+        runner.start()
+        continuous = config.environment in (EnvironmentType.CARTPOLE, EnvironmentType.MOUNTAINCAR)
+        timer = self.timer
+        actor_rewards = np.zeros(runner.n_actors)  # reward of each actor's unfinished episode
+        actor_steps = np.zeros(runner.n_actors, dtype=np.int64)
+        episode = 0
+        last_reward = 0.0
+        cumulative_reward = 0.0
+        steps = 0
+        try:
+            while True:
+                # Checked before draining, so records pushed by exited actors are all seen
+                alive = runner.is_alive()
+                batches = runner.drain(max(1, RECORDS_PER_POLL // runner.n_actors))
+                t0 = timer.start()
+                for actor, batch in enumerate(batches):
+                    if len(batch):
+                        learn(actor, batch)
+                runner.publish(self.q_table)
+                timer.lap("learner_update", t0)
+                
+                previous = episode
+                converged = False
+                for actor, batch in enumerate(batches):
+                    start = 0
+                    for end in np.flatnonzero(batch[:, EPISODE_END]):
+                        last_reward = actor_rewards[actor] + batch[start:end + 1, REWARD].sum()
+                        cumulative_reward += last_reward
+                        converged |= self._end_episode(float(last_reward), int(actor_steps[actor]) + end + 1 - start)
+                        actor_rewards[actor] = 0.0
+                        actor_steps[actor] = 0
+                        episode += 1
+                        start = end + 1
+                    actor_rewards[actor] += batch[start:, REWARD].sum()
+                    actor_steps[actor] += len(batch) - start
+                n_records = sum(len(batch) for batch in batches)
+                self.update_env_steps = n_records
+                steps += n_records
+                finished = converged or (not alive and n_records == 0)
+                
+                preview = runner.preview_state()
+                value_function, policy = self._snapshot(finished or previous // 50 != episode // 50)
+                yield TrainingUpdate(
+                    episode=min(episode + 1, config.n_episodes),
+                    step=steps,
+                    reward=float(last_reward),
+                    cumulative_reward=float(cumulative_reward),
+                    state=preview if continuous else int(preview[0]) if preview else 0,
+                    action=0,
+                    value_function=value_function,
+                    policy=policy
+                )
+                if finished:
+                    break
+        finally:
+            runner.close()
+            self.update_env_steps = None
+    
+    def _snapshot(self, take: bool) -> Tuple[Optional[Dict[str, float]], Optional[Dict[str, Any]]]:
+        """Value function and policy for the update stream, or (None, None) when not due"""
+        if not take:
+            return None, None
+        t0 = self.timer.start()
+        arrays = self._state_values() if self.projection is not None else None
+        if arrays is not None:
+            snapshot = self.projection.apply(*arrays)
+            self.snapshot_projection = self.projection.describe()
+        else:
+            snapshot = self.get_value_function(), self.get_policy()
+            self.snapshot_projection = None
+        self.timer.lap("snapshot", t0)
+        return snapshot
+    
+    def _state_values(self) -> Optional[Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]]:
+        """
+        (value, greedy action, state) arrays for projections, or None if there is no
+        table yet; states is None when the arrays cover every state in order.
+        """
+        q_table = getattr(self, "q_table", None)
+        if not is_table(q_table) or len(q_table) != self.n_states:
+            return None
+        states, rows = table_rows(q_table)
+        return rows.max(axis=1), rows.argmax(axis=1), states
+    
+    def _q_value_function(self) -> Dict[str, float]:
+        """V(s) = max_a Q(s, a) per state (only the states a hashed table has allocated)"""
+        if not is_table(self.q_table):
+            return {}
+        states, rows = table_rows(self.q_table)
+        keys = range(len(rows)) if states is None else states.tolist()
+        return {str(s): value for s, value in zip(keys, rows.max(axis=1).tolist())}
+    
+    def _q_policy(self) -> Dict[str, Any]:
+        """pi(s) = argmax_a Q(s, a) per state, ties broken randomly (allocated states only when hashed)"""
+        if not is_table(self.q_table):
+            return {}
+        states, rows = table_rows(self.q_table)
+        keys = range(len(rows)) if states is None else states.tolist()
+        return {str(s): action for s, action in zip(keys, greedy_actions(rows).tolist())}
+    
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Returns the learned tables as NumPy arrays (empty before training)"""
+        state = {}
+        for name in self.state_attributes:
+            if is_table(getattr(self, name, None)):
+                state.update(export_table(name, getattr(self, name)))
+        if state:
+            state["n_states"] = np.asarray(self.n_states)
+            state["n_actions"] = np.asarray(self.n_actions)
+        return state
+    
+    def load_state(self, state: Dict[str, np.ndarray]):
+        """Restores tables previously returned by get_state()"""
+        if "n_states" in state:
+            self.n_states = int(state["n_states"])
+            self.n_actions = int(state["n_actions"])
+        for name in self.state_attributes:
+            table = import_table(name, state, self.n_states)
+            if table is not None:
+                setattr(self, name, table)
+    
+    def estimate_memory(self) -> int:
+        """Approximate number of bytes held by the learned tables"""
+        return sum(
+            getattr(self, name).nbytes
+            for name in self.state_attributes
+            if is_table(getattr(self, name, None))
+        )
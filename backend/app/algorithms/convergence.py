@@ -0,0 +1,74 @@
+import numpy as np
+from typing import Optional
+from app.algorithms.q_storage import is_table, table_rows
+from app.models.schemas import ConvergenceConfig
+
+class ConvergenceMonitor:
+    """
+    Early-stopping checks fed once per finished episode (RLAlgorithm._end_episode).
+    Every check_every episodes it compares the greedy policy and the Q-table with
+    the previous check (one argmax and one subtraction over the table); the return
+    plateau keeps the last 2 * return_window episode returns in a ring buffer.
+    Hashed tables are compared on the states allocated at the previous check (their
+    rows are never freed), so a check costs O(visited states), not O(n_states).
+    update() returns the name of the first criterion met, or None.
+    """
+
+    def __init__(self, config: ConvergenceConfig):
+        self.config = config
+        self.episodes = 0
+        self._returns = np.zeros(2 * config.return_window) if config.return_window else None
+        self._previous_policy: Optional[np.ndarray] = None
+        self._previous_q: Optional[np.ndarray] = None
+        self._previous_states: Optional[np.ndarray] = None  # rows of _previous_q (None: every state)
+        self._policy_stable_episodes = 0
+        self._calm_checks = 0
+
+    def update(self, q_table, episode_return: float) -> Optional[str]:
+        config = self.config
+        self.episodes += 1
+        if self._returns is not None:
+            self._returns[(self.episodes - 1) % len(self._returns)] = episode_return
+        if self.episodes < config.min_episodes or self.episodes % config.check_every:
+            return None
+
+        if self._returns is not None and self.episodes >= len(self._returns) and self._return_plateau():
+            return "return_plateau"
+        if not is_table(q_table):
+            return None
+        states, rows = table_rows(q_table)
+        # Current rows of the states the baselines cover
+        if states is not None and self._previous_states is not None:
+            baseline_rows = rows[np.searchsorted(states, self._previous_states)]
+        else:
+            baseline_rows = rows
+        # Baselines are dropped when a dense table changes shape (adaptive discretization)
+        same_shape = (self._previous_q is not None and self._previous_q.shape == baseline_rows.shape
+                      and len(baseline_rows) > 0)
+
+        if config.policy_stable_episodes is not None:
+            if same_shape and np.array_equal(baseline_rows.argmax(axis=1), self._previous_policy):
+                self._policy_stable_episodes += config.check_every
+            else:
+                self._policy_stable_episodes = 0
+            self._previous_policy = rows.argmax(axis=1)
+            if self._policy_stable_episodes >= config.policy_stable_episodes:
+                return "policy_stable"
+
+        if config.q_change_threshold is not None:
+            if same_shape and np.abs(baseline_rows - self._previous_q).max() < config.q_change_threshold:
+                self._calm_checks += 1
+            else:
+                self._calm_checks = 0
+            if self._calm_checks >= config.patience:
+                return "q_converged"
+        self._previous_q = np.array(rows)
+        self._previous_states = states
+        return None
+
+    def _return_plateau(self) -> bool:
+        """Mean return of the last window vs the window before (relative; absolute below 1)"""
+        window = self.config.return_window
+        ordered = np.roll(self._returns, -(self.episodes % len(self._returns)))
+        older, recent = ordered[:window].mean(), ordered[window:].mean()
+        return abs(recent - older) <= self.config.return_tolerance * max(abs(older), 1.0)
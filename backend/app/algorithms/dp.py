@@ -0,0 +1,193 @@
+import numpy as np
+from typing import Optional, Sequence, Tuple
+
+# Vectorized dynamic-programming kernels over a full tabular model given as
+# (next_states, probs, rewards, dones) arrays of shape (n_states, n_actions, K),
+# as returned by get_transition_arrays() on the grid environments.
+TransitionArrays = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+def q_values(model: TransitionArrays, V: np.ndarray, gamma: float) -> np.ndarray:
+    """Bellman backup for every (state, action): (n_states, n_actions)"""
+    next_states, probs, rewards, dones = model
+    return (probs * (rewards + gamma * V[next_states] * ~dones)).sum(axis=-1)
+
+def value_sweep(model: TransitionArrays, V: np.ndarray, gamma: float) -> Tuple[np.ndarray, float]:
+    """One synchronous Bellman optimality sweep; returns (new V, max change)"""
+    V_new = q_values(model, V, gamma).max(axis=1)
+    return V_new, float(np.max(np.abs(V_new - V))) if len(V) else 0.0
+
+def greedy_policy(model: TransitionArrays, V: np.ndarray, gamma: float) -> np.ndarray:
+    return q_values(model, V, gamma).argmax(axis=1)
+
+def improve_policy(model: TransitionArrays, V: np.ndarray, policy: np.ndarray, gamma: float) -> Tuple[np.ndarray, bool]:
+    """Greedy improvement of policy w.r.t. V; keeps the current action on ties so policy iteration terminates"""
+    Q = q_values(model, V, gamma)
+    states = np.arange(len(policy))
+    best = Q.argmax(axis=1)
+    improved = Q[states, best] > Q[states, policy] + 1e-12
+    return np.where(improved, best, policy), not improved.any()
+
+def policy_model(model: TransitionArrays, policy: np.ndarray) -> TransitionArrays:
+    """Restrict the model to one action per state: arrays of shape (n_states, K)"""
+    states = np.arange(len(policy))
+    return tuple(array[states, policy] for array in model)
+
+def evaluate_policy(model: TransitionArrays, policy: np.ndarray, V: np.ndarray, gamma: float,
+                    theta: float) -> Tuple[np.ndarray, int]:
+    """Iterative policy evaluation from V until the max change drops below theta; returns (V, sweeps)"""
+    next_states, probs, rewards, dones = policy_model(model, policy)
+    expected_reward = (probs * rewards).sum(axis=-1)
+    discount = gamma * probs * ~dones
+    sweeps = 0
+    while True:
+        sweeps += 1
+        V_new = expected_reward + (discount * V[next_states]).sum(axis=-1)
+        delta = float(np.max(np.abs(V_new - V))) if len(V) else 0.0
+        V = V_new
+        if delta < theta:
+            return V, sweeps
+
+# Batched value iteration over B problem variants with the same state and action
+# counts (e.g. several discount factors or slip settings): each variant's model is
+# folded once into (flat_next, weights, expected_reward), so a sweep of all variants
+# is one gather, one multiply and two reductions.
+BatchModel = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+def stack_models(models: Sequence[TransitionArrays], gammas: Sequence[float]) -> BatchModel:
+    """
+    Stack one model per variant (models of different K are padded with zero-probability
+    outcomes): flat_next (B, S, A, K) indexes the flattened (B * S) value array,
+    weights = gamma * probs * ~dones and expected_reward = sum_k probs * rewards.
+    """
+    n_outcomes = max(model[0].shape[-1] for model in models)
+    n_states = models[0][0].shape[0]
+    flat_next, weights, expected_reward = [], [], []
+    for b, ((next_states, probs, rewards, dones), gamma) in enumerate(zip(models, gammas)):
+        pad = [(0, 0), (0, 0), (0, n_outcomes - next_states.shape[-1])]
+        flat_next.append(np.pad(next_states, pad) + b * n_states)
+        weights.append(np.pad(gamma * probs * ~dones, pad))
+        expected_reward.append((probs * rewards).sum(axis=-1))
+    return np.stack(flat_next), np.stack(weights), np.stack(expected_reward)
+
+def batch_q_values(batch: BatchModel, V: np.ndarray) -> np.ndarray:
+    """Bellman backups of every variant from V (B, S): (B, S, A)"""
+    flat_next, weights, expected_reward = batch
+    return expected_reward + (weights * V.ravel()[flat_next]).sum(axis=-1)
+
+def batch_value_iteration(batch: BatchModel, theta: float, max_sweeps: int,
+                          V: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Value iteration on all variants at once, each stopping when its own max change
+    drops below theta. Converged variants are frozen and, once they are at least
+    half of the rows still swept, dropped from the stacked arrays.
+    Returns (V (B, S), greedy policy (B, S), sweeps per variant, last max change per variant).
+    """
+    flat_next, weights, expected_reward = batch
+    n_variants, n_states = expected_reward.shape[:2]
+    V = np.zeros((n_variants, n_states)) if V is None else np.array(V, dtype=np.float64)
+    sweeps = np.zeros(n_variants, dtype=np.int64)
+    deltas = np.full(n_variants, np.inf)
+    rows = np.arange(n_variants)  # variants still in the stacked arrays
+    active = np.ones(n_variants, dtype=bool)
+    for _ in range(max_sweeps):
+        if not active.any():
+            break
+        V_new = (expected_reward + (weights * V.ravel()[flat_next]).sum(axis=-1)).max(axis=-1)
+        change = np.abs(V_new - V[rows]).max(axis=1) if n_states else np.zeros(len(rows))
+        live = active[rows]
+        V[rows[live]] = V_new[live]
+        deltas[rows[live]] = change[live]
+        sweeps[rows[live]] += 1
+        active[rows[live & (change < theta)]] = False
+        keep = active[rows]
+        if keep.sum() * 2 <= len(rows):
+            rows = rows[keep]
+            flat_next, weights, expected_reward = flat_next[keep], weights[keep], expected_reward[keep]
+    policy = batch_q_values(batch, V).argmax(axis=-1)
+    return V, policy, sweeps, deltas
+
+# Incremental re-solve after a small model change: only states whose backup can have
+# changed are swept, using the reverse transition graph to push changes backwards.
+def predecessors(model: TransitionArrays) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reverse transition graph in CSR form: the states whose backup reads V[s] are
+    indices[indptr[s]:indptr[s + 1]] (outcomes with zero probability or that end
+    the episode do not bootstrap, so they are not edges).
+    """
+    next_states, probs, _, dones = model
+    n_states = next_states.shape[0]
+    sources = np.broadcast_to(np.arange(n_states)[:, None, None], next_states.shape)
+    edge = (probs > 0) & ~dones
+    # Sorted unique (target, source) pairs give the CSR layout directly
+    edges = np.unique(next_states[edge].astype(np.int64) * n_states + sources[edge])
+    targets, indices = np.divmod(edges, n_states)
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(targets, minlength=n_states))])
+    return indptr, indices
+
+def _gather(indptr: np.ndarray, indices: np.ndarray, states: np.ndarray) -> np.ndarray:
+    """Unique union of the CSR rows of states"""
+    starts = indptr[states]
+    counts = indptr[states + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+    return np.unique(indices[offsets])
+
+def changed_states(old: TransitionArrays, new: TransitionArrays) -> np.ndarray:
+    """States whose transitions differ between two models of the same state space"""
+    n_states = new[0].shape[0]
+    if any(a.shape != b.shape for a, b in zip(old, new)):
+        return np.arange(n_states)
+    changed = np.zeros(n_states, dtype=bool)
+    for a, b in zip(old, new):
+        changed |= (a != b).reshape(n_states, -1).any(axis=1)
+    return np.flatnonzero(changed)
+
+def bellman_residual(model: TransitionArrays, V: np.ndarray, gamma: float) -> np.ndarray:
+    """|T V - V| per state"""
+    return np.abs(q_values(model, V, gamma).max(axis=1) - V)
+
+def frontier_value_iteration(model: TransitionArrays, V: np.ndarray, gamma: float, theta: float,
+                             frontier: np.ndarray, max_sweeps: int,
+                             graph: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Tuple[np.ndarray, int, int, float]:
+    """
+    Value iteration from V that only backs up the frontier: starting from the given
+    states, each sweep updates the frontier and the next frontier is the predecessors
+    of the states that changed by theta or more. When it empties, one full residual
+    check restarts from any state still off by theta or more.
+    Returns (V, sweeps, state backups, final max residual).
+    """
+    indptr, indices = predecessors(model) if graph is None else graph
+    next_states, probs, rewards, dones = model
+    V = np.array(V, dtype=np.float64)
+    frontier = np.unique(np.asarray(frontier, dtype=np.int64))
+    sweeps = backups = 0
+    residual = np.inf
+    while sweeps < max_sweeps:
+        if len(frontier) == 0:
+            residuals = bellman_residual(model, V, gamma)
+            residual = float(residuals.max()) if len(V) else 0.0
+            frontier = np.flatnonzero(residuals >= theta)
+            if len(frontier) == 0:
+                break
+        sub = (next_states[frontier], probs[frontier], rewards[frontier], dones[frontier])
+        V_new = q_values(sub, V, gamma).max(axis=1)
+        moved = frontier[np.abs(V_new - V[frontier]) >= theta]
+        V[frontier] = V_new
+        sweeps += 1
+        backups += len(frontier)
+        frontier = _gather(indptr, indices, moved)
+    else:
+        residual = float(bellman_residual(model, V, gamma).max()) if len(V) else 0.0
+    return V, sweeps, backups, residual
+
+def frontier_policy_evaluation(model: TransitionArrays, policy: np.ndarray, V: np.ndarray, gamma: float,
+                               theta: float, frontier: np.ndarray, max_sweeps: int) -> Tuple[np.ndarray, int, int, float]:
+    """
+    Iterative evaluation of policy from V, backing up only the frontier and what it
+    reaches (frontier_value_iteration on the model restricted to the policy's actions),
+    for at most max_sweeps sweeps. Returns (V, sweeps, state backups, final max residual).
+    """
+    single_action = tuple(array[:, None] for array in policy_model(model, policy))
+    return frontier_value_iteration(single_action, V, gamma, theta, frontier, max_sweeps)
@@ -0,0 +1,133 @@
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional
+from app.algorithms.actor_learner import PUSH_WAIT_SECONDS, TransitionRing
+from app.algorithms.shared import PREVIEW_SIZE, ProcessGroup, SharedArray, read_preview, write_preview
+from app.models.schemas import TrainingConfig
+
+# Progress row per worker: episodes done, env steps, summed episode reward, last episode reward
+PROGRESS_COLUMNS = 4
+# Finished-episode records per worker: (return, length), for the episode log and convergence checks
+EPISODE_REWARD, EPISODE_LENGTH = range(2)
+EPISODE_RING_CAPACITY = 4096
+
+def _hogwild_worker(worker: int, q_spec, progress_spec, preview_spec, episodes_spec, stop,
+                    config_data: Dict[str, Any], env_options: Dict[str, Any], n_episodes: int, seed: int):
+    """
+    Worker process: Q-learning on its own environment copy, updating the shared
+    Q-table in place without locks (lost updates are tolerated, as in Hogwild!).
+    """
+    from app.environments import create_environment
+
+    np.random.seed(seed)
+    config = TrainingConfig.model_validate(config_data)
+    env = create_environment(config.environment, **env_options)
+    q_shared = SharedArray.attach(q_spec)
+    progress_shared = SharedArray.attach(progress_spec)
+    preview_shared = SharedArray.attach(preview_spec)
+    episodes = TransitionRing.attach(episodes_spec)
+    q_table = q_shared.array
+    progress = progress_shared.array[worker]
+    preview = preview_shared.array if worker == 0 else None
+    n_actions = q_table.shape[1]
+    try:
+        for _ in range(n_episodes):
+            if stop.is_set():
+                break
+            state_info = env.reset()
+            state = state_info.observation
+            episode_reward = 0.0
+            episode_steps = 0
+            for _ in range(config.max_steps):
+                if np.random.random() < config.epsilon:
+                    action = np.random.randint(n_actions)
+                else:
+                    # Copy the row: other workers may write it between max() and the comparison
+                    q_values = q_table[state].copy()
+                    best_actions = np.flatnonzero(q_values == q_values.max())
+                    action = best_actions[np.random.randint(len(best_actions))]
+                next_state_info = env.step(action)
+                next_state = next_state_info.observation
+                reward = next_state_info.reward
+                done = next_state_info.done
+
+                td_target = reward + config.discount_factor * q_table[next_state].max() * (not done)
+                q_table[state, action] += config.learning_rate * (td_target - q_table[state, action])
+
+                episode_reward += reward
+                episode_steps += 1
+                progress[1] += 1
+                if preview is not None:
+                    write_preview(preview, next_state_info.info.get('continuous_state', [next_state]))
+                state = next_state
+                if done:
+                    break
+            while not episodes.push((episode_reward, episode_steps)):
+                if stop.is_set():
+                    return
+                time.sleep(PUSH_WAIT_SECONDS)
+            progress[2] += episode_reward
+            progress[3] = episode_reward
+            progress[0] += 1
+    finally:
+        env.close()
+        q_shared.close()
+        progress_shared.close()
+        preview_shared.close()
+        episodes.close()
+
+class HogwildRunner:
+    """
+    Owns the shared Q-table and the worker processes of one Hogwild session.
+    The parent only reads the shared buffers (progress polling and snapshots).
+    """
+
+    def __init__(self, q_table: np.ndarray, config: TrainingConfig, env_options: Dict[str, Any]):
+        self.config = config
+        self.n_workers = config.n_workers
+        self.q = SharedArray.from_array(q_table)
+        self.progress = SharedArray((self.n_workers, PROGRESS_COLUMNS))
+        self.progress.array[...] = 0.0
+        self.preview = SharedArray((PREVIEW_SIZE,))
+        self.preview.array[...] = 0.0
+        self.episode_rings = [TransitionRing.create(EPISODE_RING_CAPACITY, 2) for _ in range(self.n_workers)]
+        self._env_options = env_options
+        self.workers = ProcessGroup()
+
+    def start(self, seed: Optional[int] = None):
+        seed = np.random.randint(2 ** 31 - self.n_workers) if seed is None else seed
+        # Split the episode budget across workers
+        shares = np.full(self.n_workers, self.config.n_episodes // self.n_workers)
+        shares[:self.config.n_episodes % self.n_workers] += 1
+        config_data = self.config.model_dump(mode="json")
+        self.workers.start(_hogwild_worker, [
+            (worker, self.q.spec(), self.progress.spec(), self.preview.spec(), self.episode_rings[worker].spec(),
+             self.workers.stop_event,
+             config_data, self._env_options, int(shares[worker]), seed + worker)
+            for worker in range(self.n_workers)
+        ])
+
+    def is_alive(self) -> bool:
+        return self.workers.is_alive()
+
+    def totals(self) -> np.ndarray:
+        """Summed progress columns over workers"""
+        return self.progress.array.sum(axis=0)
+
+    def finished_episodes(self) -> np.ndarray:
+        """(return, length) of the episodes the workers finished since the last call"""
+        return np.concatenate([ring.pop_batch(EPISODE_RING_CAPACITY) for ring in self.episode_rings])
+
+    def preview_state(self) -> List[float]:
+        return read_preview(self.preview.array)
+
+    def close(self):
+        """Stop the workers; the shared buffers are freed once they have exited (in the background)"""
+        self.workers.stop(cleanup=self._free)
+
+    def _free(self):
+        self.q.close()
+        self.progress.close()
+        self.preview.close()
+        for ring in self.episode_rings:
+            ring.close()
@@ -0,0 +1,191 @@
+import logging
+import threading
+import numpy as np
+from app.environments.maps import empty_map, grid_transition_arrays, next_state_table
+
+logger = logging.getLogger(__name__)
+
+# Whole-episode kernels for the tabular learners on environments that expose their
+# model as arrays (get_transition_arrays). Compiled with Numba when it is installed;
+# otherwise the learners keep their regular step-by-step path.
+#
+# Randomness comes from a pre-drawn (steps + 1, 3) array of uniforms per episode
+# (columns: explore?, which action, which outcome), so a fixed NumPy seed gives the
+# same episode with and without compilation (kernel.py_func is the reference).
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+_warned = False
+_warm_lock = threading.Lock()
+_warmed = set()  # Q-table dtypes the kernels are compiled for
+
+def jit_available(env) -> bool:
+    """True if episodes on this environment can run in compiled kernels"""
+    global _warned
+    if not NUMBA_AVAILABLE:
+        if not _warned:
+            logger.info("Numba is not installed; JIT kernels disabled, using the Python learners")
+            _warned = True
+        return False
+    return hasattr(env, 'get_transition_arrays')
+
+@njit(cache=True)
+def _select_action(q, state, epsilon, u_explore, u_pick):
+    n_actions = q.shape[1]
+    if u_explore < epsilon:
+        return min(int(u_pick * n_actions), n_actions - 1)
+    # Greedy, ties broken uniformly
+    best = q[state, 0]
+    n_best = 1
+    for a in range(1, n_actions):
+        if q[state, a] > best:
+            best = q[state, a]
+            n_best = 1
+        elif q[state, a] == best:
+            n_best += 1
+    pick = min(int(u_pick * n_best), n_best - 1)
+    for a in range(n_actions):
+        if q[state, a] == best:
+            if pick == 0:
+                return a
+            pick -= 1
+    return 0
+
+@njit(cache=True)
+def _transition(next_states, probs, rewards, dones, state, action, u):
+    """Sample an outcome of (state, action); returns (next_state, reward, done)"""
+    cumulative = 0.0
+    n_outcomes = probs.shape[2]
+    k = n_outcomes - 1
+    for i in range(n_outcomes):
+        cumulative += probs[state, action, i]
+        if u < cumulative:
+            k = i
+            break
+    return next_states[state, action, k], rewards[state, action, k], dones[state, action, k]
+
+@njit(cache=True)
+def q_learning_episode(q, next_states, probs, rewards, dones, start, max_steps, time_limit,
+                       alpha, gamma, epsilon, uniforms):
+    """One Q-learning episode; returns (episode reward, steps, final state, last action)"""
+    state = start
+    action = 0
+    total = 0.0
+    steps = 0
+    for t in range(max_steps):
+        action = _select_action(q, state, epsilon, uniforms[t, 0], uniforms[t, 1])
+        next_state, reward, done = _transition(next_states, probs, rewards, dones, state, action, uniforms[t, 2])
+        steps += 1
+        done = done or steps >= time_limit
+        target = reward
+        if not done:
+            target += gamma * np.max(q[next_state])
+        q[state, action] += alpha * (target - q[state, action])
+        total += reward
+        state = next_state
+        if done:
+            break
+    return total, steps, state, action
+
+@njit(cache=True)
+def sarsa_episode(q, next_states, probs, rewards, dones, start, max_steps, time_limit,
+                  alpha, gamma, epsilon, uniforms):
+    """One SARSA episode; returns (episode reward, steps, final state, last action)"""
+    state = start
+    action = _select_action(q, state, epsilon, uniforms[0, 0], uniforms[0, 1])
+    last_action = action
+    total = 0.0
+    steps = 0
+    for t in range(max_steps):
+        next_state, reward, done = _transition(next_states, probs, rewards, dones, state, action, uniforms[t, 2])
+        steps += 1
+        done = done or steps >= time_limit
+        next_action = _select_action(q, next_state, epsilon, uniforms[t + 1, 0], uniforms[t + 1, 1])
+        target = reward
+        if not done:
+            target += gamma * q[next_state, next_action]
+        q[state, action] += alpha * (target - q[state, action])
+        total += reward
+        last_action = action
+        state = next_state
+        action = next_action
+        if done:
+            break
+    return total, steps, state, last_action
+
+@njit(cache=True)
+def n_step_episode(q, next_states, probs, rewards, dones, start, time_limit,
+                   alpha, gamma, epsilon, n, uniforms):
+    """
+    One n-step SARSA episode (as in NStepTD); runs until the episode ends (at the
+    latest time_limit steps). Returns (episode reward, steps, final state, last action).
+    """
+    horizon = time_limit + 1
+    states = np.zeros(horizon, dtype=np.int64)
+    actions = np.zeros(horizon, dtype=np.int64)
+    step_rewards = np.zeros(horizon)
+    states[0] = start
+    actions[0] = _select_action(q, start, epsilon, uniforms[0, 0], uniforms[0, 1])
+    T = horizon + n  # "infinity" until the episode ends
+    total = 0.0
+    t = 0
+    while True:
+        if t < T:
+            next_state, reward, done = _transition(
+                next_states, probs, rewards, dones, states[t], actions[t], uniforms[t, 2]
+            )
+            done = done or t + 1 >= time_limit
+            step_rewards[t] = reward
+            total += reward
+            states[t + 1] = next_state
+            if done:
+                T = t + 1
+            else:
+                actions[t + 1] = _select_action(q, next_state, epsilon, uniforms[t + 1, 0], uniforms[t + 1, 1])
+        tau = t - n + 1
+        if tau >= 0:
+            G = 0.0
+            for i in range(tau + 1, min(tau + n, T) + 1):
+                G += gamma ** (i - tau - 1) * step_rewards[i - 1]
+            if tau + n < T:
+                G += gamma ** n * q[states[tau + n], actions[tau + n]]
+            q[states[tau], actions[tau]] += alpha * (G - q[states[tau], actions[tau]])
+        if tau == T - 1:
+            break
+        t += 1
+    return total, T, states[T], actions[T - 1]
+
+def warm_up(q_dtype=np.float64):
+    """
+    Compile (or load from Numba's cache) every kernel for Q-tables of q_dtype, once
+    per process. A cold compile takes about a second per kernel, so call this off the
+    event loop before the first compiled episode.
+    """
+    if not NUMBA_AVAILABLE:
+        return
+    q_dtype = np.dtype(q_dtype)
+    with _warm_lock:
+        if q_dtype in _warmed:
+            return
+        # 2x2 grid models with the array types (and layouts) of the GridWorld/FrozenLake ones:
+        # one outcome per action (deterministic moves) and three (slippery FrozenLake)
+        moves = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+        q = np.zeros((4, len(moves)), dtype=q_dtype)
+        uniforms = np.full((3, 3), 0.5)
+        try:
+            for outcomes in ([(0, 1.0)], [(0, 1 / 3), (-1, 1 / 3), (1, 1 / 3)]):
+                model = grid_transition_arrays(empty_map(2), next_state_table(2, moves), outcomes, 0.0, 1.0, 0.0, True)
+                q_learning_episode(q, *model, 0, 2, 2, 0.1, 0.9, 0.1, uniforms)
+                sarsa_episode(q, *model, 0, 2, 2, 0.1, 0.9, 0.1, uniforms)
+                n_step_episode(q, *model, 0, 2, 0.1, 0.9, 0.1, 1, uniforms)
+        except Exception as e:
+            logger.warning("Could not compile JIT kernels for %s Q-tables: %s", q_dtype, e)
+        _warmed.add(q_dtype)
@@ -0,0 +1,244 @@
+import multiprocessing
+import time
+import numpy as np
+from typing import Any, Dict, Generator, List, Optional, Tuple
+from app.algorithms.dp import TransitionArrays
+from app.environments.base import RLEnvironment
+from app.models.enums import EnvironmentType
+from app.models.schemas import EnvironmentState, TrainingConfig, TrainingUpdate
+
+# Transition record columns
+STATE, ACTION, NEXT_STATE, REWARD, DONE = range(5)
+# Environments DP learners can solve through a learned model (small fixed grids, cheap episodes)
+LEARNED_MODEL_ENVIRONMENTS = (EnvironmentType.CARTPOLE, EnvironmentType.MOUNTAINCAR)
+# Seconds of in-process collection between progress updates, so the event loop is never held longer
+COLLECTION_SLICE = 0.05
+Transitions = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+class EmpiricalMDP(RLEnvironment):
+    """
+    Certainty-equivalence model of an environment with a fixed discrete (discretized)
+    state space, estimated from observed transitions. Counts and reward sums are kept
+    sparsely, one entry per distinct (state, action, next state, terminal) key, and
+    get_transition_arrays() turns them into the (S, A, K) arrays the DP kernels use
+    (K = most distinct outcomes of any pair). Pairs never tried end the episode with
+    reward 0. Acting (reset/step/render) goes to the wrapped environment.
+    """
+
+    def __init__(self, env: RLEnvironment):
+        self.env = env
+        self.n_states = env.get_state_space()['n']
+        self.n_actions = env.get_action_space()['n']
+        self.keys = np.empty(0, dtype=np.int64)  # sorted
+        self.counts = np.empty(0, dtype=np.int64)
+        self.reward_sums = np.empty(0)
+        self.n_transitions = 0
+        self._transition_arrays: Optional[TransitionArrays] = None
+
+    @staticmethod
+    def supports(config: TrainingConfig, env: RLEnvironment) -> bool:
+        return config.environment in LEARNED_MODEL_ENVIRONMENTS and not env.is_adaptive()
+
+    def add_transitions(self, records: np.ndarray):
+        """Merge (state, action, next_state, reward, terminal) rows into the counts"""
+        if len(records) == 0:
+            return
+        columns = records[:, [STATE, ACTION, NEXT_STATE, DONE]].astype(np.int64)
+        keys = ((columns[:, 0] * self.n_actions + columns[:, 1]) * self.n_states + columns[:, 2]) * 2 + columns[:, 3]
+        keys, inverse = np.unique(np.concatenate([self.keys, keys]), return_inverse=True)
+        ones = np.ones(len(records), dtype=np.int64)
+        self.counts = np.bincount(inverse, weights=np.concatenate([self.counts, ones]), minlength=len(keys)).astype(np.int64)
+        self.reward_sums = np.bincount(inverse, weights=np.concatenate([self.reward_sums, records[:, REWARD]]),
+                                       minlength=len(keys))
+        self.keys = keys
+        self.n_transitions += len(records)
+        self._transition_arrays = None
+
+    def get_transition_arrays(self) -> TransitionArrays:
+        """Maximum-likelihood model as (next_states, probs, rewards, dones), each (S, A, K)"""
+        if self._transition_arrays is None:
+            n_pairs = self.n_states * self.n_actions
+            pairs = self.keys // (2 * self.n_states)
+            next_states = (self.keys // 2) % self.n_states
+            dones = (self.keys % 2).astype(bool)
+            pair_counts = np.bincount(pairs, weights=self.counts, minlength=n_pairs)
+            # Keys are sorted, so each pair's outcomes are contiguous
+            rank = np.arange(len(self.keys)) - np.searchsorted(pairs, pairs)
+            n_outcomes = int(rank.max()) + 1 if len(rank) else 1
+            # Padding (and untried pairs): zero probability, terminal, so nothing bootstraps
+            model_next = np.zeros((n_pairs, n_outcomes), dtype=np.int64)
+            model_probs = np.zeros((n_pairs, n_outcomes))
+            model_rewards = np.zeros((n_pairs, n_outcomes))
+            model_dones = np.ones((n_pairs, n_outcomes), dtype=bool)
+            model_next[pairs, rank] = next_states
+            model_probs[pairs, rank] = self.counts / pair_counts[pairs]
+            model_rewards[pairs, rank] = self.reward_sums / self.counts
+            model_dones[pairs, rank] = dones
+            model_probs[pair_counts == 0, 0] = 1.0
+            shape = (self.n_states, self.n_actions, n_outcomes)
+            self._transition_arrays = (model_next.reshape(shape), model_probs.reshape(shape),
+                                       model_rewards.reshape(shape), model_dones.reshape(shape))
+        return self._transition_arrays
+
+    def visited_pairs(self) -> int:
+        return len(np.unique(self.keys // (2 * self.n_states)))
+
+    def is_model_based(self) -> bool:
+        return True
+
+    def get_transitions(self, state: int, action: int) -> List[Tuple[float, int, float, bool]]:
+        next_states, probs, rewards, dones = (array[state, action] for array in self.get_transition_arrays())
+        return [(float(p), int(s), float(r), bool(d)) for s, p, r, d in zip(next_states, probs, rewards, dones) if p > 0]
+
+    def reset(self) -> EnvironmentState:
+        return self.env.reset()
+
+    def step(self, action: int) -> EnvironmentState:
+        return self.env.step(action)
+
+    def get_state_space(self) -> Dict[str, Any]:
+        return self.env.get_state_space()
+
+    def get_action_space(self) -> Dict[str, Any]:
+        return self.env.get_action_space()
+
+    def render(self) -> Dict[str, Any]:
+        return self.env.render()
+
+    def estimate_memory(self) -> int:
+        size = self.keys.nbytes + self.counts.nbytes + self.reward_sums.nbytes
+        if self._transition_arrays is not None:
+            size += sum(array.nbytes for array in self._transition_arrays)
+        return size + self.env.estimate_memory()
+
+def run_episodes(env: RLEnvironment, n_episodes: int, max_steps: int, policy: Optional[np.ndarray],
+                 epsilon: float, seed=None) -> Transitions:
+    """
+    Epsilon-greedy episodes around policy (uniformly random without one); seed may
+    also be a np.random.Generator to continue from.
+    Returns (transition records, episode rewards, episode lengths). An episode cut by
+    the environment's time limit is not recorded as terminal, so the model bootstraps there.
+    """
+    rng = np.random.default_rng(seed)
+    n_actions = env.get_action_space()['n']
+    time_limit = getattr(env, "max_steps", None)
+    records: List[Tuple[float, ...]] = []
+    rewards = np.zeros(n_episodes)
+    lengths = np.zeros(n_episodes, dtype=np.int64)
+    for episode in range(n_episodes):
+        state = env.reset().observation
+        for step in range(max_steps):
+            if policy is None or rng.random() < epsilon:
+                action = int(rng.integers(n_actions))
+            else:
+                action = int(policy[state])
+            state_info = env.step(action)
+            terminal = state_info.done and not (time_limit is not None and step + 1 >= time_limit)
+            records.append((state, action, state_info.observation, state_info.reward, terminal))
+            rewards[episode] += state_info.reward
+            lengths[episode] += 1
+            state = state_info.observation
+            if state_info.done:
+                break
+    return np.array(records, dtype=np.float64).reshape(-1, 5), rewards, lengths
+
+def _collect_worker(config_data: Dict[str, Any], env_options: Dict[str, Any], n_episodes: int,
+                    policy: Optional[np.ndarray], epsilon: float, seed: int):
+    """Collection process: its own environment copy, transitions returned to the parent"""
+    from app.environments import create_environment
+
+    config = TrainingConfig.model_validate(config_data)
+    env = create_environment(config.environment, **env_options)
+    try:
+        return run_episodes(env, n_episodes, config.max_steps, policy, epsilon, seed)
+    finally:
+        env.close()
+
+def collect_transitions(env: RLEnvironment, config: TrainingConfig, policy: Optional[np.ndarray],
+                        epsilon: float) -> Generator[Transitions, None, None]:
+    """
+    config.model_episodes episodes, split over config.model_workers processes when
+    above one. Yields the transitions in parts so the caller can hand control back
+    between them: in process, whatever COLLECTION_SLICE seconds of episodes produced;
+    with workers, each worker's share as it finishes and an empty part per poll until then.
+    """
+    n_workers = min(config.model_workers, config.model_episodes)
+    if n_workers == 1:
+        rng = np.random.default_rng()
+        remaining = config.model_episodes
+        while remaining:
+            started = time.perf_counter()
+            parts = []
+            while remaining and time.perf_counter() - started < COLLECTION_SLICE:
+                parts.append(run_episodes(env, 1, config.max_steps, policy, epsilon, rng))
+                remaining -= 1
+            yield tuple(np.concatenate(part) for part in zip(*parts))
+        return
+    from app.environments import environment_options
+
+    shares = np.full(n_workers, config.model_episodes // n_workers)
+    shares[:config.model_episodes % n_workers] += 1
+    seeds = np.random.randint(2 ** 31, size=n_workers)
+    config_data = config.model_dump(mode="json")
+    options = environment_options(config)
+    # spawn: forking the server process (event loop, threads) is not safe
+    with multiprocessing.get_context("spawn").Pool(n_workers) as pool:
+        pending = [
+            pool.apply_async(_collect_worker, (config_data, options, int(shares[worker]), policy, epsilon, int(seeds[worker])))
+            for worker in range(n_workers)
+        ]
+        while pending:
+            ready = [result for result in pending if result.ready()]
+            pending = [result for result in pending if result not in ready]
+            for result in ready:
+                yield result.get()
+            if not ready:
+                yield np.empty((0, 5)), np.empty(0), np.empty(0, dtype=np.int64)
+
+def train_on_learned_model(algorithm, env: RLEnvironment, config: TrainingConfig):
+    """
+    Certainty equivalence for DP learners on environments without a known model:
+    each of config.model_rounds rounds collects config.model_episodes episodes into
+    an EmpiricalMDP and solves it with algorithm.train(). The first round acts
+    uniformly at random, later ones epsilon-greedily around the last solution and
+    warm-start from it. Collection yields a progress update per part
+    (collect_transitions), so no single step of the generator runs for long.
+    """
+    model = EmpiricalMDP(env)
+    warm_start = algorithm.warm_start
+    timer = algorithm.timer
+    policy = None
+    episodes = 0
+    cumulative_reward = 0.0
+    try:
+        for _ in range(config.model_rounds):
+            parts = collect_transitions(env, config, policy, 1.0 if policy is None else config.epsilon)
+            collected = []
+            while True:
+                t0 = timer.start()
+                part = next(parts, None)
+                timer.lap("model_collection", t0)
+                if part is None:
+                    break
+                records, rewards, lengths = part
+                collected.append(records)
+                for reward, length in zip(rewards.tolist(), lengths.tolist()):
+                    algorithm._end_episode(reward, length)
+                episodes += len(rewards)
+                cumulative_reward += float(rewards.sum())
+                yield TrainingUpdate(
+                    episode=episodes,
+                    step=int(lengths.sum()),
+                    reward=float(rewards[-1]) if len(rewards) else 0.0,
+                    cumulative_reward=cumulative_reward,
+                    state=0,
+                    action=0
+                )
+            t0 = timer.start()
+            model.add_transitions(np.concatenate(collected))
+            timer.lap("model_collection", t0)
+            yield from algorithm.train(model, config)
+            algorithm.warm_start = True
+            policy = np.asarray(algorithm.policy)
+    finally:
+        algorithm.warm_start = warm_start
@@ -1,16 +1,20 @@
 import numpy as np
 from typing import Generator, Dict, Any, Union, List
-from collections import defaultdict
+from app.algorithms.actor_learner import ACTION, EPISODE_END, REWARD, STATE
 from app.algorithms.base import RLAlgorithm
 from app.models.schemas import TrainingConfig, TrainingUpdate
-from app.models.enums import EnvironmentType
+from app.models.enums import EnvironmentType, ParallelMode
 
 class MonteCarlo(RLAlgorithm):
     """Monte Carlo Control with epsilon-greedy policy"""
     
+    state_attributes = ("q_table", "returns_count")
+    
     def __init__(self, first_visit: bool = True):
         self.q_table = {}
-        self.returns = defaultdict(list)  #Track returns for each (state, action) pair
+        # Number of returns averaged into each Q(s, a); Q is kept as an incremental mean
+        # so memory stays bounded instead of storing every return
+        self.returns_count = None
         self.n_states = 0
         self.n_actions = 0
         self.first_visit = first_visit
@@ -32,15 +36,24 @@ class MonteCarlo(RLAlgorithm):
         self.n_states = state_space['n']
         self.n_actions = action_space['n']
         
-        self.q_table = np.random.uniform(-0.01, 0.01, (self.n_states, self.n_actions))
+        self.q_table = self._init_q_table(config)
+        self.returns_count = self._init_q_table(config, "returns_count", np.int64)
+        
+        if config.parallel_mode == ParallelMode.ACTOR_LEARNER:
+            yield from self._train_actor_learner(env, config, self._episode_learner(config))
+            return
         
         cumulative_reward = 0.0
+        timer = self.timer
+        adaptive = env.is_adaptive()
         
         for episode in range(config.n_episodes):
             # Generate episode
             episode_history: List[tuple] = []  # (state, action, reward)
             state_info = env.reset()
             state = state_info.observation
+            if adaptive:
+                self._refine_tables(env)
             episode_reward = 0
             
             # For CartPole and MountainCar, send continuous state for visualization on reset
@@ -59,86 +72,94 @@ class MonteCarlo(RLAlgorithm):
             
             for step in range(config.max_steps):
                 action = self._epsilon_greedy(state, config.epsilon)
+                t0 = timer.start()
                 next_state_info = env.step(action)
+                timer.lap("env_step", t0)
                 reward = next_state_info.reward
                 done = next_state_info.done
                 
                 episode_history.append((state, action, reward))
                 episode_reward += reward
                 
-                # For CartPole and MountainCar, send continuous state for visualization
-                # For Breakout, send render data (paddle_x, ball_x, ball_y, lives)
-                visualization_state = state
-                if config.environment == EnvironmentType.CARTPOLE:
-                    if 'continuous_state' in next_state_info.info:
-                        visualization_state = next_state_info.info['continuous_state']
-                elif config.environment == EnvironmentType.MOUNTAINCAR:
-                    if 'continuous_state' in next_state_info.info:
-                        visualization_state = next_state_info.info['continuous_state']
-                elif config.environment == EnvironmentType.BREAKOUT:
-                    # Use render data for Breakout visualization
-                    render_data = env.render()
-                    visualization_state = {
-                        'paddle_x': render_data.get('paddle_x', 80),
-                        'ball_x': render_data.get('ball_x', 80),
-                        'ball_y': render_data.get('ball_y', 100),
-                        'ball_vel_x': render_data.get('ball_vel_x', 0),
-                        'ball_vel_y': render_data.get('ball_vel_y', 0),
-                        'lives': render_data.get('lives', 5),
-                        'score': render_data.get('score', 0),
-                        'bricks_destroyed': render_data.get('bricks_destroyed', 0),
-                        'remaining_bricks': render_data.get('remaining_bricks', 40)
-                    }
+                visualization_state = self._visualization_state(env, config, state, next_state_info)
+                value_function, policy = self._snapshot(done and episode % 50 == 0)
                 
                 # Yield update on every step for real-time visualization
-                yield TrainingUpdate(
+                t0 = timer.start()
+                update = TrainingUpdate(
                     episode=episode + 1,
                     step=step + 1,
                     reward=reward,
                     cumulative_reward=cumulative_reward + episode_reward,
                     state=visualization_state,
                     action=action,
-                    value_function=self.get_value_function() if done and episode % 50 == 0 else None,
-                    policy=self.get_policy() if done and episode % 50 == 0 else None
+                    value_function=value_function,
+                    policy=policy
                 )
+                timer.lap("update_build", t0)
+                yield update
                 
                 state = next_state_info.observation
                 if done:
                     break
             
-           # Update Q-values using episode returns
-            G = 0  # Return
-            visited_pairs = set()
-            
-            # Process episode in reverse
-            for t in range(len(episode_history) - 1, -1, -1):
-                state, action, reward = episode_history[t]
-                G = config.discount_factor * G + reward
-                
-                pair = (state, action)
-                
-                # First-visit or every-visit MC
-                if self.first_visit and pair in visited_pairs:
-                    continue
-                
-                visited_pairs.add(pair)
-                self.returns[pair].append(G)
-                self.q_table[state][action] = np.mean(self.returns[pair])
+            # Update Q-values using episode returns
+            t0 = timer.start()
+            self._update_from_episode(episode_history, config.discount_factor, env if adaptive else None)
+            timer.lap("learner_update", t0)
             
             cumulative_reward += episode_reward
+            if self._end_episode(episode_reward, len(episode_history)):
+                yield self._converged_update(episode + 1, cumulative_reward, visualization_state)
+                break
+    
+    def _update_from_episode(self, episode_history: List[tuple], discount_factor: float, adaptive_env=None):
+        """Average the returns of a finished episode [(state, action, reward), ...] into Q"""
+        G = 0  # Return
+        visited_pairs = set()
+        
+        # Process episode in reverse
+        for t in range(len(episode_history) - 1, -1, -1):
+            state, action, reward = episode_history[t]
+            G = discount_factor * G + reward
+            
+            pair = (state, action)
+            
+            # First-visit or every-visit MC
+            if self.first_visit and pair in visited_pairs:
+                continue
+            
+            visited_pairs.add(pair)
+            if adaptive_env is not None:
+                adaptive_env.record_td_error(state, G - self.q_table[state][action])
+            self.returns_count[state][action] += 1
+            n = self.returns_count[state][action]
+            if n == 1:
+                self.q_table[state][action] = G
+            else:
+                self.q_table[state][action] += (G - self.q_table[state][action]) / n
+    
+    def _episode_learner(self, config: TrainingConfig):
+        """Actor/learner callback: collect each actor's records and learn from every finished episode"""
+        pending: Dict[int, List[tuple]] = {}
+        
+        def learn(actor: int, batch: np.ndarray):
+            history = pending.setdefault(actor, [])
+            for state, action, reward, end in zip(
+                batch[:, STATE].astype(np.int64).tolist(), batch[:, ACTION].astype(np.int64).tolist(),
+                batch[:, REWARD].tolist(), batch[:, EPISODE_END].tolist()
+            ):
+                history.append((state, action, reward))
+                if end:
+                    self._update_from_episode(history, config.discount_factor)
+                    history.clear()
+        return learn
     
     def get_value_function(self) -> Dict[str, float]:
-        return {str(i): float(np.max(self.q_table[i])) for i in range(self.n_states)}
+        return self._q_value_function()
     
     def get_policy(self) -> Dict[str, Any]:
-        # Break ties randomly when Q-values are equal
-        policy = {}
-        for i in range(self.n_states):
-            q_values = self.q_table[i]
-            max_q = np.max(q_values)
-            best_actions = np.where(q_values == max_q)[0]
-            policy[str(i)] = int(np.random.choice(best_actions))
-        return policy
+        return self._q_policy()
     
     def select_action(self, state: Union[int, tuple]) -> int:
         if isinstance(state, tuple):
@@ -28,14 +28,28 @@ class NStepTD(RLAlgorithm):
         self.n_states = state_space['n']
         self.n_actions = action_space['n']
         
-        self.q_table = np.random.uniform(-0.01, 0.01, (self.n_states, self.n_actions))
+        self.q_table = self._init_q_table(config)
+        
+        kernels = self._compiled_kernels(env, config)
+        if kernels is not None:
+            # Like the Python path, episodes run until the environment ends them
+            model = env.get_transition_arrays()
+            yield from self._train_compiled(env, config, env.max_steps + 1, lambda start, uniforms: kernels.n_step_episode(
+                self.q_table, *model, start, env.max_steps,
+                config.learning_rate, config.discount_factor, config.epsilon, config.n_step, uniforms
+            ))
+            return
         
         cumulative_reward = 0.0
+        timer = self.timer
         n_step = config.n_step
+        adaptive = env.is_adaptive()
         
         for episode in range(config.n_episodes):
             state_info = env.reset()
             state = state_info.observation
+            if adaptive:
+                self._refine_tables(env)
             action = self._epsilon_greedy(state, config.epsilon)
             
             if config.environment == EnvironmentType.CARTPOLE or config.environment == EnvironmentType.MOUNTAINCAR:
@@ -65,7 +79,9 @@ class NStepTD(RLAlgorithm):
             
             while True:
                 if t < T:
+                    t0 = timer.start()
                     next_state_info = env.step(action)
+                    timer.lap("env_step", t0)
                     next_state = next_state_info.observation
                     reward = next_state_info.reward
                     done = next_state_info.done
@@ -74,28 +90,10 @@ class NStepTD(RLAlgorithm):
                     episode_reward += reward
                     episode_steps += 1
                     
-                    visualization_state = state
-                    if config.environment == EnvironmentType.CARTPOLE:
-                        if 'continuous_state' in next_state_info.info:
-                            visualization_state = next_state_info.info['continuous_state']
-                    elif config.environment == EnvironmentType.MOUNTAINCAR:
-                        if 'continuous_state' in next_state_info.info:
-                            visualization_state = next_state_info.info['continuous_state']
-                    elif config.environment == EnvironmentType.BREAKOUT:
-                        render_data = env.render()
-                        visualization_state = {
-                            'paddle_x': render_data.get('paddle_x', 80),
-                            'ball_x': render_data.get('ball_x', 80),
-                            'ball_y': render_data.get('ball_y', 100),
-                            'ball_vel_x': render_data.get('ball_vel_x', 0),
-                            'ball_vel_y': render_data.get('ball_vel_y', 0),
-                            'lives': render_data.get('lives', 5),
-                            'score': render_data.get('score', 0),
-                            'bricks_destroyed': render_data.get('bricks_destroyed', 0),
-                            'remaining_bricks': render_data.get('remaining_bricks', 40)
-                        }
+                    visualization_state = self._visualization_state(env, config, state, next_state_info)
                     
-                    yield TrainingUpdate(
+                    t0 = timer.start()
+                    update = TrainingUpdate(
                         episode=episode + 1,
                         step=episode_steps,
                         reward=reward,
@@ -105,6 +103,8 @@ class NStepTD(RLAlgorithm):
                         value_function=None,
                         policy=None
                     )
+                    timer.lap("update_build", t0)
+                    yield update
                     
                     if done:
                         T = t + 1
@@ -117,7 +117,8 @@ class NStepTD(RLAlgorithm):
                 tau = t - n_step + 1
                 
                 if tau >= 0:
-                    G = sum([config.discount_factor ** (i - tau - 1) * rewards[i] 
+                    t0 = timer.start()
+                    G = sum([config.discount_factor ** (i - tau) * rewards[i] 
                             for i in range(tau, min(tau + n_step, T))])
                     
                     if tau + n_step < T:
@@ -127,7 +128,11 @@ class NStepTD(RLAlgorithm):
                     
                     s_tau = states[tau]
                     a_tau = actions[tau]
-                    self.q_table[s_tau][a_tau] += config.learning_rate * (G - self.q_table[s_tau][a_tau])
+                    td_error = G - self.q_table[s_tau][a_tau]
+                    self.q_table[s_tau][a_tau] += config.learning_rate * td_error
+                    if adaptive:
+                        env.record_td_error(s_tau, td_error)
+                    timer.lap("learner_update", t0)
                 
                 if tau == T - 1:
                     break
@@ -135,8 +140,10 @@ class NStepTD(RLAlgorithm):
                 t += 1
             
             cumulative_reward += episode_reward
+            converged = self._end_episode(episode_reward, episode_steps)
             
-            if episode % 50 == 0:
+            if converged or episode % 50 == 0:
+                value_function, policy = self._snapshot(True)
                 yield TrainingUpdate(
                     episode=episode + 1,
                     step=episode_steps,
@@ -144,21 +151,17 @@ class NStepTD(RLAlgorithm):
                     cumulative_reward=cumulative_reward,
                     state=state,
                     action=0,
-                    value_function=self.get_value_function(),
-                    policy=self.get_policy()
+                    value_function=value_function,
+                    policy=policy
                 )
+            if converged:
+                break
     
     def get_value_function(self) -> Dict[str, float]:
-        return {str(i): float(np.max(self.q_table[i])) for i in range(self.n_states)}
+        return self._q_value_function()
     
     def get_policy(self) -> Dict[str, Any]:
-        policy = {}
-        for i in range(self.n_states):
-            q_values = self.q_table[i]
-            max_q = np.max(q_values)
-            best_actions = np.where(q_values == max_q)[0]
-            policy[str(i)] = int(np.random.choice(best_actions))
-        return policy
+        return self._q_policy()
     
     def select_action(self, state: Union[int, tuple]) -> int:
         if isinstance(state, tuple):
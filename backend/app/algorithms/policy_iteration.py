@@ -1,71 +1,104 @@
 import numpy as np
 from typing import Generator, Dict, Any, Union
+from app.algorithms import dp
 from app.algorithms.base import RLAlgorithm
+from app.algorithms.model_learning import EmpiricalMDP, train_on_learned_model
 from app.models.schemas import TrainingConfig, TrainingUpdate
 
 class PolicyIteration(RLAlgorithm):
     """Policy Iteration: Model-based DP algorithm"""
     
+    state_attributes = ("value_function", "policy")
+    
     def __init__(self):
         self.value_function = {}
         self.policy = {}
         self.n_states = 0
         self.n_actions = 0
+        self.n_sweeps = 0  # Evaluation + improvement passes in the last train()
     
     def train(self, env, config: TrainingConfig) -> Generator[TrainingUpdate, None, None]:
         if not env.is_model_based():
-            raise ValueError("Policy Iteration requires a model-based environment")
+            # Certainty equivalence: solve a model estimated from collected transitions
+            if not EmpiricalMDP.supports(config, env):
+                raise ValueError("Policy Iteration requires a model-based environment, or cartpole/mountaincar without adaptive_discretization")
+            yield from train_on_learned_model(self, env, config)
+            return
         
         state_space = env.get_state_space()
         action_space = env.get_action_space()
         self.n_states = state_space['n']
         self.n_actions = action_space['n']
         
-        # Initialize value function and policy
-        V = np.zeros(self.n_states)
-        policy = np.zeros(self.n_states, dtype=int)
+        # Initialize value function and policy (forked sessions continue from the loaded solution)
+        if (self.warm_start and isinstance(self.value_function, np.ndarray) and len(self.value_function) == self.n_states
+                and isinstance(self.policy, np.ndarray)):
+            V = np.array(self.value_function, dtype=np.float64)
+            policy = np.array(self.policy, dtype=int)
+        else:
+            V = np.zeros(self.n_states)
+            policy = np.zeros(self.n_states, dtype=int)
         
         theta = 1e-6  # Convergence threshold
         max_iterations = config.n_episodes  # Use n_episodes as iteration limit
+        self.n_sweeps = 0
+        
+        # Grid environments expose the whole model as arrays: sweep all states at once
+        model = env.get_transition_arrays() if hasattr(env, 'get_transition_arrays') else None
+        timer = self.timer
         
         for iteration in range(max_iterations):
             # Policy Evaluation
-            while True:
-                delta = 0
-                for s in range(self.n_states):
-                    v = V[s]
-                    action = policy[s]
+            t0 = timer.start()
+            if model is not None:
+                V, sweeps = dp.evaluate_policy(model, policy, V, config.discount_factor, theta)
+                self.n_sweeps += sweeps
+            else:
+                while True:
+                    delta = 0
+                    self.n_sweeps += 1
+                    for s in range(self.n_states):
+                        v = V[s]
+                        action = policy[s]
+                        
+                        # Calculate expected value for current policy
+                        transitions = env.get_transitions(s, action)
+                        new_value = sum(prob * (reward + config.discount_factor * V[next_s] * (not done))
+                                        for prob, next_s, reward, done in transitions)
+                        V[s] = new_value
+                        delta = max(delta, abs(v - V[s]))
                     
-                    # Calculate expected value for current policy
-                    transitions = env.get_transitions(s, action)
-                    new_value = sum(prob * (reward + config.discount_factor * V[next_s] * (not done))
-                                    for prob, next_s, reward, done in transitions)
-                    V[s] = new_value
-                    delta = max(delta, abs(v - V[s]))
-                
-                if delta < theta:
-                    break
+                    if delta < theta:
+                        break
+            
+            t0 = timer.lap("policy_evaluation", t0)
             
             # Policy Improvement
             policy_stable = True
-            for s in range(self.n_states):
-                old_action = policy[s]
-                
-                # Calculate Q-values for all actions
-                action_values = np.zeros(self.n_actions)
-                for a in range(self.n_actions):
-                    transitions = env.get_transitions(s, a)
-                    action_values[a] = sum(prob * (reward + config.discount_factor * V[next_s] * (not done))
-                                           for prob, next_s, reward, done in transitions)
-                
-                # Select best action
-                policy[s] = np.argmax(action_values)
-                
-                if old_action != policy[s]:
-                    policy_stable = False
+            self.n_sweeps += 1
+            if model is not None:
+                policy, policy_stable = dp.improve_policy(model, V, policy, config.discount_factor)
+            else:
+                for s in range(self.n_states):
+                    old_action = policy[s]
+                    
+                    # Calculate Q-values for all actions
+                    action_values = np.zeros(self.n_actions)
+                    for a in range(self.n_actions):
+                        transitions = env.get_transitions(s, a)
+                        action_values[a] = sum(prob * (reward + config.discount_factor * V[next_s] * (not done))
+                                               for prob, next_s, reward, done in transitions)
+                    
+                    # Select best action
+                    policy[s] = np.argmax(action_values)
+                    
+                    if old_action != policy[s]:
+                        policy_stable = False
+            
+            t0 = timer.lap("policy_improvement", t0)
             
             # Yield update
-            yield TrainingUpdate(
+            update = TrainingUpdate(
                 episode=iteration + 1,
                 step=0,
                 reward=0.0,
@@ -75,6 +108,8 @@ class PolicyIteration(RLAlgorithm):
                 value_function=self.get_value_function_from_array(V),
                 policy=self.get_policy_from_array(policy)
             )
+            timer.lap("update_build", t0)
+            yield update
             
             # Check for convergence
             if policy_stable:
@@ -0,0 +1,98 @@
+import numpy as np
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+REDUCTIONS = ("max", "mean")
+
+class Projection:
+    """
+    Low-dimensional view of per-state snapshots for state spaces laid out as a
+    mixed-radix grid (get_state_space()['shape'], first dimension most significant).
+    Values are reduced (max or mean) over the dropped dimensions with one reshape;
+    the policy of a projected cell is the action of its highest-valued state.
+    Projected cells are keyed by their row-major index over the kept dimensions.
+    Snapshots of only some states (hashed Q-tables) project those states alone:
+    cells none of them falls in are left out, and means are over the given states.
+    """
+
+    def __init__(self, shape: Sequence[int], dimensions: Sequence[str],
+                 keep: Sequence[Union[int, str]], reduce: str = "max"):
+        if reduce not in REDUCTIONS:
+            raise ValueError(f"Unknown reduction '{reduce}' (expected one of {', '.join(REDUCTIONS)})")
+        self.shape = tuple(int(n) for n in shape)
+        self.dimensions = list(dimensions)
+        self.axes = [self._axis(dim) for dim in keep]
+        if not self.axes or len(set(self.axes)) != len(self.axes):
+            raise ValueError("A projection keeps one or more distinct dimensions")
+        self.reduce = reduce
+        self.kept_shape = tuple(self.shape[axis] for axis in self.axes)
+        self.n_cells = int(np.prod(self.kept_shape))
+        self._states: Optional[np.ndarray] = None  # built on the first full snapshot
+
+    @classmethod
+    def for_state_space(cls, state_space: Dict[str, Any], keep: Union[str, Sequence[Union[int, str]]],
+                        reduce: str = "max") -> "Projection":
+        """Projection over an environment's state space; keep may be 'pole_angle,pole_angular_velocity'"""
+        if "shape" not in state_space:
+            raise ValueError("This state space has no grid layout to project")
+        if isinstance(keep, str):
+            keep = [int(dim) if dim.strip().isdigit() else dim.strip() for dim in keep.split(",") if dim.strip()]
+        shape = state_space["shape"]
+        dimensions = state_space.get("dimensions") or [str(axis) for axis in range(len(shape))]
+        return cls(shape, dimensions, keep, reduce)
+
+    def _axis(self, dim: Union[int, str]) -> int:
+        if isinstance(dim, int):
+            if not 0 <= dim < len(self.shape):
+                raise ValueError(f"No dimension {dim} (state space has {len(self.shape)})")
+            return dim
+        if dim not in self.dimensions:
+            raise ValueError(f"Unknown dimension '{dim}' (expected one of {', '.join(self.dimensions)})")
+        return self.dimensions.index(dim)
+
+    def _arrange(self, per_state: np.ndarray) -> np.ndarray:
+        """(n_cells, n_dropped) view: kept axes first (in requested order), the rest flattened"""
+        grid = per_state.reshape(self.shape)
+        moved = np.moveaxis(grid, self.axes, range(len(self.axes)))
+        return moved.reshape(self.n_cells, -1)
+
+    def apply(self, values: np.ndarray, actions: np.ndarray,
+              states: Optional[np.ndarray] = None) -> Tuple[Dict[str, float], Dict[str, int]]:
+        """Projected (value function, policy) dicts from values and greedy actions of every state, or of the given states"""
+        if states is not None:
+            return self._apply_sparse(values, actions, states)
+        if self._states is None:
+            # State index of every (projected cell, dropped-dimension combination)
+            self._states = self._arrange(np.arange(int(np.prod(self.shape))))
+        cells = self._arrange(values)
+        reduced = cells.max(axis=1) if self.reduce == "max" else cells.mean(axis=1)
+        best = self._states[np.arange(self.n_cells), cells.argmax(axis=1)]
+        keys = [str(i) for i in range(self.n_cells)]
+        return dict(zip(keys, reduced.tolist())), dict(zip(keys, np.asarray(actions)[best].tolist()))
+
+    def _apply_sparse(self, values: np.ndarray, actions: np.ndarray,
+                      states: np.ndarray) -> Tuple[Dict[str, float], Dict[str, int]]:
+        coordinates = np.unravel_index(np.asarray(states, dtype=np.int64), self.shape)
+        cells = np.ravel_multi_index([coordinates[axis] for axis in self.axes], self.kept_shape)
+        if self.reduce == "max":
+            reduced = np.full(self.n_cells, -np.inf)
+            np.maximum.at(reduced, cells, values)
+        else:
+            reduced = np.bincount(cells, weights=values, minlength=self.n_cells)
+        counts = np.bincount(cells, minlength=self.n_cells)
+        if self.reduce == "mean":
+            reduced = reduced / np.maximum(counts, 1)
+        # Highest-valued state of each cell: last of its cell after sorting by (cell, value)
+        order = np.lexsort((values, cells))
+        last = order[np.r_[cells[order][1:] != cells[order][:-1], True]] if len(order) else order
+        best = np.zeros(self.n_cells, dtype=np.int64)
+        best[cells[last]] = np.asarray(actions)[last]
+        keys = np.flatnonzero(counts).tolist()
+        return ({str(i): float(reduced[i]) for i in keys}, {str(i): int(best[i]) for i in keys})
+    
+    def describe(self) -> Dict[str, Any]:
+        """Metadata sent with projected snapshots"""
+        return {
+            "dimensions": [self.dimensions[axis] for axis in self.axes],
+            "shape": list(self.kept_shape),
+            "reduce": self.reduce,
+        }
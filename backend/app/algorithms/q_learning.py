@@ -1,8 +1,12 @@
 import numpy as np
 from typing import Generator, Dict, Any, Union
+from app.algorithms import q_storage
 from app.algorithms.base import RLAlgorithm
+from app.algorithms.hogwild import HogwildRunner
+from app.algorithms.actor_learner import ACTION, DONE, NEXT_STATE, REWARD, STATE
+from app.environments import environment_options
 from app.models.schemas import TrainingConfig, TrainingUpdate
-from app.models.enums import EnvironmentType
+from app.models.enums import EnvironmentType, ParallelMode
 
 class QLearning(RLAlgorithm):
     def __init__(self):
@@ -17,13 +21,39 @@ class QLearning(RLAlgorithm):
         self.n_states = state_space['n']
         self.n_actions = action_space['n']
         
-        self.q_table = np.random.uniform(-0.01, 0.01, (self.n_states, self.n_actions))
+        self.q_table = self._init_q_table(config)
+        
+        if getattr(env, 'n_envs', 1) > 1:
+            yield from self._train_batched(env, config)
+            return
+        
+        if config.parallel_mode == ParallelMode.HOGWILD:
+            yield from self._train_hogwild(env, config)
+            return
+        
+        if config.parallel_mode == ParallelMode.ACTOR_LEARNER:
+            yield from self._train_actor_learner(env, config, lambda actor, batch: self._learn_batch(batch, config))
+            return
+        
+        kernels = self._compiled_kernels(env, config)
+        if kernels is not None:
+            model = env.get_transition_arrays()
+            max_steps = min(config.max_steps, env.max_steps)
+            yield from self._train_compiled(env, config, max_steps + 1, lambda start, uniforms: kernels.q_learning_episode(
+                self.q_table, *model, start, max_steps, env.max_steps,
+                config.learning_rate, config.discount_factor, config.epsilon, uniforms
+            ))
+            return
         
         cumulative_reward = 0.0
+        timer = self.timer
+        adaptive = env.is_adaptive()
         
         for episode in range(config.n_episodes):
             state_info = env.reset()
             state = state_info.observation
+            if adaptive:
+                self._refine_tables(env)
             episode_reward = 0
             episode_steps = 0
             
@@ -41,23 +71,12 @@ class QLearning(RLAlgorithm):
                         policy=None
                     )
             elif config.environment == EnvironmentType.BREAKOUT:
-                render_data = env.render()
                 yield TrainingUpdate(
                     episode=episode + 1,
                     step=0,
                     reward=0.0,
                     cumulative_reward=cumulative_reward,
-                    state={
-                        'paddle_x': render_data.get('paddle_x', 80),
-                        'ball_x': render_data.get('ball_x', 80),
-                        'ball_y': render_data.get('ball_y', 100),
-                        'ball_vel_x': render_data.get('ball_vel_x', 0),
-                        'ball_vel_y': render_data.get('ball_vel_y', 0),
-                        'lives': render_data.get('lives', 5),
-                        'score': render_data.get('score', 0),
-                        'bricks_destroyed': render_data.get('bricks_destroyed', 0),
-                        'remaining_bricks': render_data.get('remaining_bricks', 40)
-                    },
+                    state=self._visualization_state(env, config, state, state_info),
                     action=0,
                     value_function=None,
                     policy=None
@@ -74,7 +93,9 @@ class QLearning(RLAlgorithm):
                     best_actions = np.where(q_values == max_q)[0]
                     action = np.random.choice(best_actions)
                 
+                t0 = timer.start()
                 next_state_info = env.step(action)
+                t0 = timer.lap("env_step", t0)
                 next_state = next_state_info.observation
                 reward = next_state_info.reward
                 done = next_state_info.done
@@ -88,65 +109,178 @@ class QLearning(RLAlgorithm):
                 td_target = reward + config.discount_factor * self.q_table[next_state][best_next_action] * (not done)
                 td_error = td_target - self.q_table[state][action]
                 self.q_table[state][action] += config.learning_rate * td_error
+                if adaptive:
+                    env.record_td_error(state, td_error)
+                timer.lap("learner_update", t0)
                 
                 episode_reward += reward
                 episode_steps += 1
                 
-                # For CartPole and MountainCar, send continuous state for visualization
-                # For Breakout, send render data (paddle_x, ball_x, ball_y, lives)
-                visualization_state = state
-                if config.environment == EnvironmentType.CARTPOLE:
-                    if 'continuous_state' in next_state_info.info:
-                        visualization_state = next_state_info.info['continuous_state']
-                elif config.environment == EnvironmentType.MOUNTAINCAR:
-                    if 'continuous_state' in next_state_info.info:
-                        visualization_state = next_state_info.info['continuous_state']
-                elif config.environment == EnvironmentType.BREAKOUT:
-                    # Use render data for Breakout visualization
-                    render_data = env.render()
-                    visualization_state = {
-                        'paddle_x': render_data.get('paddle_x', 80),
-                        'ball_x': render_data.get('ball_x', 80),
-                        'ball_y': render_data.get('ball_y', 100),
-                        'ball_vel_x': render_data.get('ball_vel_x', 0),
-                        'ball_vel_y': render_data.get('ball_vel_y', 0),
-                        'lives': render_data.get('lives', 5),
-                        'score': render_data.get('score', 0),
-                        'bricks_destroyed': render_data.get('bricks_destroyed', 0),
-                        'remaining_bricks': render_data.get('remaining_bricks', 40)
-                    }
+                visualization_state = self._visualization_state(env, config, state, next_state_info)
+                value_function, policy = self._snapshot(done and episode % 50 == 0)
                 
                 # Yield update on every step for real-time visualization
-                yield TrainingUpdate(
+                t0 = timer.start()
+                update = TrainingUpdate(
                     episode=episode + 1,
                     step=episode_steps,
                     reward=reward,
                     cumulative_reward=cumulative_reward + episode_reward,
                     state=visualization_state,
                     action=action,
-                    value_function=self.get_value_function() if done and episode % 50 == 0 else None,
-                    policy=self.get_policy() if done and episode % 50 == 0 else None
+                    value_function=value_function,
+                    policy=policy
                 )
+                timer.lap("update_build", t0)
+                yield update
                 
                 state = next_state
                 if done:
                     break
             
             cumulative_reward += episode_reward
+            if self._end_episode(episode_reward, episode_steps):
+                yield self._converged_update(episode + 1, cumulative_reward, visualization_state)
+                break
+    
+    def _train_batched(self, env, config: TrainingConfig) -> Generator[TrainingUpdate, None, None]:
+        """
+        Q-learning over a batched environment (reset_batch/step_batch): every batch
+        step applies one vectorized update for all lanes. Episodes are counted
+        across lanes; lane 0 is streamed for visualization.
+        """
+        n_envs = env.n_envs
+        timer = self.timer
+        states = env.reset_batch()
+        lane_rewards = np.zeros(n_envs)
+        lane_steps = np.zeros(n_envs, dtype=np.int64)
+        episode = 0  # completed episodes across all lanes
+        cumulative_reward = 0.0
+        
+        yield TrainingUpdate(
+            episode=1,
+            step=0,
+            reward=0.0,
+            cumulative_reward=0.0,
+            state=self._visualization_state(env, config, int(states[0]), None),
+            action=0,
+            value_function=None,
+            policy=None
+        )
+        
+        while episode < config.n_episodes:
+            # Epsilon-greedy per lane, ties broken randomly
+            q_values = self.q_table[states]
+            ties = np.where(q_values == q_values.max(axis=1, keepdims=True), np.random.random(q_values.shape), -1.0)
+            actions = np.where(
+                np.random.random(n_envs) < config.epsilon,
+                np.random.randint(self.n_actions, size=n_envs),
+                ties.argmax(axis=1)
+            )
+            
+            t0 = timer.start()
+            next_states, rewards, dones = env.step_batch(actions)
+            t0 = timer.lap("env_step", t0)
+            
+            # Finished lanes already hold the next episode's state; done masks the bootstrap
+            td_target = rewards + config.discount_factor * self.q_table[next_states].max(axis=1) * ~dones
+            td_error = td_target - self.q_table[states, actions]
+            q_storage.add_at(self.q_table, states, actions, config.learning_rate * td_error)
+            timer.lap("learner_update", t0)
+            
+            lane_rewards += rewards
+            lane_steps += 1
+            lane0_reward = lane_rewards[0]
+            lane0_steps = int(lane_steps[0])
+            finished = int(dones.sum())
+            previous = episode
+            converged = False
+            if finished:
+                episode += finished
+                cumulative_reward += float(lane_rewards[dones].sum())
+                for reward, length in zip(lane_rewards[dones].tolist(), lane_steps[dones].tolist()):
+                    converged |= self._end_episode(reward, length)
+                lane_rewards[dones] = 0.0
+                lane_steps[dones] = 0
+            
+            visualization_state = self._visualization_state(env, config, int(next_states[0]), None)
+            value_function, policy = self._snapshot(converged or previous // 50 != episode // 50)
+            
+            t0 = timer.start()
+            update = TrainingUpdate(
+                episode=min(previous + 1, config.n_episodes),
+                step=lane0_steps,
+                reward=float(rewards[0]),
+                cumulative_reward=cumulative_reward + (0.0 if dones[0] else float(lane0_reward)),
+                state=visualization_state,
+                action=int(actions[0]),
+                value_function=value_function,
+                policy=policy
+            )
+            timer.lap("update_build", t0)
+            yield update
+            if converged:
+                break
+            
+            states = next_states
+    
+    def _train_hogwild(self, env, config: TrainingConfig) -> Generator[TrainingUpdate, None, None]:
+        """
+        Q-learning in config.n_workers processes that share one lock-free Q-table.
+        Each update is a poll of the workers' progress; q_table is a private copy of the
+        shared table refreshed every poll (so snapshots never see rows change mid-scan).
+        """
+        runner = HogwildRunner(self.q_table, config, environment_options(config))
+        runner.start()
+        continuous = config.environment in (EnvironmentType.CARTPOLE, EnvironmentType.MOUNTAINCAR)
+        reported_steps = 0
+        polls = 0
+        try:
+            while True:
+                alive = runner.is_alive()
+                episodes, steps, reward_sum, last_reward = runner.totals()
+                self.update_env_steps = int(steps) - reported_steps
+                np.copyto(self.q_table, runner.q.array)
+                converged = False
+                for reward, length in runner.finished_episodes().tolist():
+                    converged |= self._end_episode(reward, int(length))
+                reported_steps = int(steps)
+                polls += 1
+                preview = runner.preview_state()
+                value_function, policy = self._snapshot(not alive or converged or polls % 50 == 0)
+                yield TrainingUpdate(
+                    episode=min(int(episodes) + 1, config.n_episodes),
+                    step=int(steps),
+                    reward=float(last_reward),
+                    cumulative_reward=float(reward_sum),
+                    state=preview if continuous else int(preview[0]) if preview else 0,
+                    action=0,
+                    value_function=value_function,
+                    policy=policy
+                )
+                if not alive or converged:
+                    break
+        finally:
+            np.copyto(self.q_table, runner.q.array)
+            runner.close()
+            self.update_env_steps = None
+    
+    def _learn_batch(self, batch: np.ndarray, config: TrainingConfig):
+        """Q-learning updates for one actor's transition records, in order"""
+        q_table = self.q_table
+        alpha, gamma = config.learning_rate, config.discount_factor
+        for state, action, reward, next_state, done in zip(
+            batch[:, STATE].astype(np.int64).tolist(), batch[:, ACTION].astype(np.int64).tolist(),
+            batch[:, REWARD].tolist(), batch[:, NEXT_STATE].astype(np.int64).tolist(), batch[:, DONE].tolist()
+        ):
+            td_target = reward if done else reward + gamma * q_table[next_state].max()
+            q_table[state, action] += alpha * (td_target - q_table[state, action])
     
     def get_value_function(self) -> Dict[str, float]:
-        # V(s) = max_a Q(s, a)
-        return {str(i): float(np.max(self.q_table[i])) for i in range(self.n_states)}
+        return self._q_value_function()
     
     def get_policy(self) -> Dict[str, Any]:
-        # pi(s) = argmax_a Q(s, a), break ties randomly
-        policy = {}
-        for i in range(self.n_states):
-            q_values = self.q_table[i]
-            max_q = np.max(q_values)
-            best_actions = np.where(q_values == max_q)[0]
-            policy[str(i)] = int(np.random.choice(best_actions))
-        return policy
+        return self._q_policy()
     
     def select_action(self, state: Union[int, tuple]) -> int:
         if isinstance(state, tuple):
@@ -0,0 +1,203 @@
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from app.models.enums import QTableBackend
+
+EMPTY = -1  # free hash slot
+BLOCK_ROWS = 4096  # rows per storage block; blocks never move, so row views stay valid
+MAX_LOAD = 0.5  # the index doubles once more than this fraction of its slots is used
+FIBONACCI = 0x9E3779B97F4A7C15  # 2^64 / golden ratio: spreads neighbouring state indices
+HASH_MASK = (1 << 64) - 1
+INIT_RANGE = 0.01  # float tables start uniform in [-INIT_RANGE, INIT_RANGE], counters at 0
+
+def _initial_rows(n_rows: int, n_actions: int, dtype: np.dtype) -> np.ndarray:
+    if dtype.kind in "iu":
+        return np.zeros((n_rows, n_actions), dtype=dtype)
+    return np.random.uniform(-INIT_RANGE, INIT_RANGE, (n_rows, n_actions)).astype(dtype, copy=False)
+
+class HashedQTable:
+    """
+    (n_states, n_actions) table that allocates a state's row the first time the state
+    is indexed, for discretizations far larger than the part an agent ever visits.
+    States map to rows through an open-addressing index (Fibonacci hashing, linear
+    probing, power-of-two size); rows live in fixed-size blocks initialized like the
+    dense table. Integer indexing returns a writable row view, so learner code written
+    against ndarrays (q[s][a] += x, np.max(q[s]), q[states, actions]) works unchanged.
+    Nothing here builds an n_states-sized array: whole-table views go through items(),
+    which covers the allocated states only.
+    """
+
+    def __init__(self, n_states: int, n_actions: int, dtype=np.float64, capacity: int = 1024):
+        self.n_states = n_states
+        self.n_actions = n_actions
+        self.dtype = np.dtype(dtype)
+        self.n_rows = 0
+        self._bits = max(int(capacity - 1).bit_length(), 4)
+        self._keys = np.full(1 << self._bits, EMPTY, dtype=np.int64)
+        self._rows = np.zeros(1 << self._bits, dtype=np.int64)
+        self._blocks: List[np.ndarray] = []
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.n_states, self.n_actions
+
+    @property
+    def nbytes(self) -> int:
+        return self._keys.nbytes + self._rows.nbytes + sum(block.nbytes for block in self._blocks)
+
+    def __len__(self) -> int:
+        return self.n_states
+
+    def _slot(self, state: int) -> int:
+        """Slot holding state, or the free slot it would be inserted at"""
+        keys = self._keys
+        mask = len(keys) - 1
+        slot = ((state * FIBONACCI) & HASH_MASK) >> (64 - self._bits)
+        while True:
+            key = keys.item(slot)
+            if key == state or key == EMPTY:
+                return slot
+            slot = (slot + 1) & mask
+
+    def __contains__(self, state: int) -> bool:
+        return self._keys.item(self._slot(int(state))) == state
+
+    def row_index(self, state: int) -> int:
+        """Storage row of state, allocated on first access"""
+        if not 0 <= state < self.n_states:
+            raise IndexError(f"state {state} is out of range for {self.n_states} states")
+        slot = self._slot(state)
+        if self._keys.item(slot) == state:
+            return self._rows.item(slot)
+        row = self.n_rows
+        if row == len(self._blocks) * BLOCK_ROWS:
+            self._blocks.append(_initial_rows(BLOCK_ROWS, self.n_actions, self.dtype))
+        self.n_rows += 1
+        self._keys[slot] = state
+        self._rows[slot] = row
+        if self.n_rows > MAX_LOAD * len(self._keys):
+            self._rehash(self._bits + 1)
+        return row
+
+    def _rehash(self, bits: int):
+        occupied = self._keys != EMPTY
+        states, rows = self._keys[occupied], self._rows[occupied]
+        self._bits = bits
+        self._keys = np.full(1 << bits, EMPTY, dtype=np.int64)
+        self._rows = np.zeros(1 << bits, dtype=np.int64)
+        for state, row in zip(states.tolist(), rows.tolist()):
+            slot = self._slot(state)
+            self._keys[slot] = state
+            self._rows[slot] = row
+
+    def row(self, state: int) -> np.ndarray:
+        """Writable view of state's Q-values"""
+        block, offset = divmod(self.row_index(state), BLOCK_ROWS)
+        return self._blocks[block][offset]
+
+    def gather(self, states) -> np.ndarray:
+        """Copy of the rows of several states, (len(states), n_actions)"""
+        states = np.asarray(states, dtype=np.int64).ravel()
+        out = np.empty((len(states), self.n_actions), dtype=self.dtype)
+        for i, state in enumerate(states.tolist()):
+            out[i] = self.row(state)
+        return out
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self.row(int(key))
+        if isinstance(key, tuple):
+            states, actions = key
+            if np.ndim(states) == 0:
+                return self.row(int(states))[actions]
+            return self.gather(states)[np.arange(np.size(states)), actions]
+        if np.ndim(key) == 0:
+            return self.row(int(key))
+        return self.gather(key)
+
+    def __setitem__(self, key, value):
+        if isinstance(key, tuple):
+            states, actions = key
+            if np.ndim(states) == 0:
+                self.row(int(states))[actions] = value
+                return
+            for state, action, item in zip(np.ravel(states).tolist(), np.ravel(actions).tolist(),
+                                           np.broadcast_to(value, np.shape(states)).ravel().tolist()):
+                self.row(state)[action] = item
+            return
+        self.row(int(key))[...] = value
+
+    def add_at(self, states, actions, deltas):
+        """Unbuffered q[states, actions] += deltas (repeated pairs accumulate, like np.add.at)"""
+        for state, action, delta in zip(np.ravel(states).tolist(), np.ravel(actions).tolist(),
+                                        np.broadcast_to(deltas, np.shape(states)).ravel().tolist()):
+            self.row(state)[action] += delta
+
+    def items(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(states, rows) of every allocated state, in state order (rows are a copy)"""
+        occupied = self._keys != EMPTY
+        states, rows = self._keys[occupied], self._rows[occupied]
+        order = np.argsort(states)
+        states, rows = states[order], rows[order]
+        if not len(rows):
+            return states, np.empty((0, self.n_actions), dtype=self.dtype)
+        return states, np.concatenate(self._blocks)[rows]
+
+    def grow(self, n_states: int, splits: List[Tuple[int, int]]):
+        """Extend to n_states; a new state starts from its parent's row when the parent has one"""
+        previous = self.n_states
+        self.n_states = n_states
+        # In creation order, so a split of a just-created state copies the right row
+        for parent, child in splits:
+            if child >= previous and parent in self:
+                self.row(child)[...] = self.row(parent)
+
+    @classmethod
+    def from_items(cls, n_states: int, states: np.ndarray, rows: np.ndarray) -> "HashedQTable":
+        table = cls(n_states, rows.shape[1], rows.dtype, capacity=int(len(states) / MAX_LOAD) + 1)
+        for state, values in zip(states.tolist(), rows):
+            table.row(state)[...] = values
+        return table
+
+def create_table(n_states: int, n_actions: int, backend: QTableBackend = QTableBackend.DENSE, dtype=np.float64):
+    """Per-(state, action) table: small random values for float dtypes, zeros for counters"""
+    dtype = np.dtype(dtype)
+    if backend == QTableBackend.HASHED:
+        return HashedQTable(n_states, n_actions, dtype)
+    return _initial_rows(n_states, n_actions, dtype)
+
+def is_table(value: Any) -> bool:
+    return isinstance(value, (np.ndarray, HashedQTable))
+
+def add_at(table, states: np.ndarray, actions: np.ndarray, deltas: np.ndarray):
+    """table[states, actions] += deltas with repeated pairs accumulating, for either backend"""
+    if isinstance(table, HashedQTable):
+        table.add_at(states, actions, deltas)
+    else:
+        np.add.at(table, (states, actions), deltas)
+
+def table_rows(table) -> Tuple[Optional[np.ndarray], np.ndarray]:
+    """
+    (states, Q rows) for whole-table views: every row of a dense table (states None,
+    rows in state order, no copy), the allocated states of a hashed table.
+    """
+    if isinstance(table, HashedQTable):
+        return table.items()
+    return None, table
+
+def greedy_actions(rows: np.ndarray) -> np.ndarray:
+    """argmax_a Q(s, a) per row, ties broken uniformly at random"""
+    ties = np.where(rows == rows.max(axis=1, keepdims=True), np.random.random(rows.shape), -1.0)
+    return ties.argmax(axis=1)
+
+def export_table(name: str, table) -> Dict[str, np.ndarray]:
+    """Arrays to persist a table under name (hashed tables as their allocated states and rows)"""
+    if isinstance(table, HashedQTable):
+        states, rows = table.items()
+        return {f"{name}_states": states, f"{name}_rows": rows}
+    return {name: table}
+
+def import_table(name: str, state: Dict[str, np.ndarray], n_states: int):
+    """Table persisted by export_table(), or None if state has none under name"""
+    if f"{name}_rows" in state:
+        return HashedQTable.from_items(n_states, np.asarray(state[f"{name}_states"]), np.asarray(state[f"{name}_rows"]))
+    return state.get(name)
@@ -30,13 +30,27 @@ class SARSA(RLAlgorithm):
         self.n_states = state_space['n']
         self.n_actions = action_space['n']
         
-        self.q_table = np.random.uniform(-0.01, 0.01, (self.n_states, self.n_actions))
+        self.q_table = self._init_q_table(config)
+        
+        kernels = self._compiled_kernels(env, config)
+        if kernels is not None:
+            model = env.get_transition_arrays()
+            max_steps = min(config.max_steps, env.max_steps)
+            yield from self._train_compiled(env, config, max_steps + 1, lambda start, uniforms: kernels.sarsa_episode(
+                self.q_table, *model, start, max_steps, env.max_steps,
+                config.learning_rate, config.discount_factor, config.epsilon, uniforms
+            ))
+            return
         
         cumulative_reward = 0.0
+        timer = self.timer
+        adaptive = env.is_adaptive()
         
         for episode in range(config.n_episodes):
             state_info = env.reset()
             state = state_info.observation
+            if adaptive:
+                self._refine_tables(env)
             action = self._epsilon_greedy(state, config.epsilon)
             episode_reward = 0
             episode_steps = 0
@@ -57,7 +71,9 @@ class SARSA(RLAlgorithm):
             
             for step in range(config.max_steps):
                 # Take action
+                t0 = timer.start()
                 next_state_info = env.step(action)
+                t0 = timer.lap("env_step", t0)
                 next_state = next_state_info.observation
                 reward = next_state_info.reward
                 done = next_state_info.done
@@ -69,45 +85,30 @@ class SARSA(RLAlgorithm):
                 td_target = reward + config.discount_factor * self.q_table[next_state][next_action] * (not done)
                 td_error = td_target - self.q_table[state][action]
                 self.q_table[state][action] += config.learning_rate * td_error
+                if adaptive:
+                    env.record_td_error(state, td_error)
+                timer.lap("learner_update", t0)
                 
                 episode_reward += reward
                 episode_steps += 1
                 
-                # For CartPole and MountainCar, send continuous state for visualization
-                # For Breakout, send render data (paddle_x, ball_x, ball_y, lives)
-                visualization_state = state
-                if config.environment == EnvironmentType.CARTPOLE:
-                    if 'continuous_state' in next_state_info.info:
-                        visualization_state = next_state_info.info['continuous_state']
-                elif config.environment == EnvironmentType.MOUNTAINCAR:
-                    if 'continuous_state' in next_state_info.info:
-                        visualization_state = next_state_info.info['continuous_state']
-                elif config.environment == EnvironmentType.BREAKOUT:
-                    # Use render data for Breakout visualization
-                    render_data = env.render()
-                    visualization_state = {
-                        'paddle_x': render_data.get('paddle_x', 80),
-                        'ball_x': render_data.get('ball_x', 80),
-                        'ball_y': render_data.get('ball_y', 100),
-                        'ball_vel_x': render_data.get('ball_vel_x', 0),
-                        'ball_vel_y': render_data.get('ball_vel_y', 0),
-                        'lives': render_data.get('lives', 5),
-                        'score': render_data.get('score', 0),
-                        'bricks_destroyed': render_data.get('bricks_destroyed', 0),
-                        'remaining_bricks': render_data.get('remaining_bricks', 40)
-                    }
+                visualization_state = self._visualization_state(env, config, state, next_state_info)
+                value_function, policy = self._snapshot(done and episode % 50 == 0)
                 
                 # Yield update on every step for real-time visualization
-                yield TrainingUpdate(
+                t0 = timer.start()
+                update = TrainingUpdate(
                     episode=episode + 1,
                     step=episode_steps,
                     reward=reward,
                     cumulative_reward=cumulative_reward + episode_reward,
                     state=visualization_state,
                     action=action,
-                    value_function=self.get_value_function() if done and episode % 50 == 0 else None,
-                    policy=self.get_policy() if done and episode % 50 == 0 else None
+                    value_function=value_function,
+                    policy=policy
                 )
+                timer.lap("update_build", t0)
+                yield update
                 
                 state = next_state
                 action = next_action
@@ -116,20 +117,15 @@ class SARSA(RLAlgorithm):
                     break
             
             cumulative_reward += episode_reward
+            if self._end_episode(episode_reward, episode_steps):
+                yield self._converged_update(episode + 1, cumulative_reward, visualization_state)
+                break
     
     def get_value_function(self) -> Dict[str, float]:
-        # V(s) = max_a Q(s, a)
-        return {str(i): float(np.max(self.q_table[i])) for i in range(self.n_states)}
+        return self._q_value_function()
     
     def get_policy(self) -> Dict[str, Any]:
-        # pi(s) = argmax_a Q(s, a), break ties randomly
-        policy = {}
-        for i in range(self.n_states):
-            q_values = self.q_table[i]
-            max_q = np.max(q_values)
-            best_actions = np.where(q_values == max_q)[0]
-            policy[str(i)] = int(np.random.choice(best_actions))
-        return policy
+        return self._q_policy()
     
     def select_action(self, state: Union[int, tuple]) -> int:
         if isinstance(state, tuple):
@@ -0,0 +1,121 @@
+import multiprocessing
+import threading
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+class SharedArray:
+    """
+    NumPy array backed by multiprocessing.shared_memory, for tables that worker
+    processes read and write in place. The creating process owns the segment
+    and unlinks it; workers attach by name (see spec()).
+    """
+
+    def __init__(self, shape: Tuple[int, ...], dtype=np.float64, name: Optional[str] = None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.owner = name is None
+        if self.owner:
+            size = max(1, int(np.prod(self.shape)) * self.dtype.itemsize)
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> "SharedArray":
+        shared = cls(array.shape, array.dtype)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, spec: Tuple[str, Tuple[int, ...], str]) -> "SharedArray":
+        name, shape, dtype = spec
+        return cls(shape, dtype, name=name)
+
+    def spec(self) -> Tuple[str, Tuple[int, ...], str]:
+        """Picklable (name, shape, dtype) handed to worker processes"""
+        return self._shm.name, self.shape, self.dtype.str
+
+    def close(self):
+        """Detach (and free the segment if this process created it)"""
+        self.array = None
+        try:
+            self._shm.close()
+            if self.owner:
+                self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+# Observation preview published by one worker for the visualization: [length, values...]
+PREVIEW_SIZE = 9
+
+def write_preview(preview: np.ndarray, observation) -> None:
+    values = np.asarray(observation, dtype=np.float64).ravel()[:PREVIEW_SIZE - 1]
+    preview[1:1 + len(values)] = values
+    preview[0] = len(values)
+
+def read_preview(preview: np.ndarray) -> list:
+    n = int(preview[0])
+    return preview[1:1 + n].tolist()
+
+class ProcessGroup:
+    """
+    Worker processes of one parallel session. The runners are driven from a
+    training generator on the event loop, so spawning (a fresh interpreter per
+    process) and joining (up to JOIN_TIMEOUT each) happen in background threads.
+    """
+
+    JOIN_TIMEOUT = 5.0
+
+    def __init__(self):
+        # spawn: forking the server process (event loop, threads) is not safe
+        self._context = multiprocessing.get_context("spawn")
+        self.stop_event = self._context.Event()
+        self.processes: List[multiprocessing.Process] = []
+        self._starter: Optional[threading.Thread] = None
+        self._stopper: Optional[threading.Thread] = None
+
+    def start(self, target: Callable, args: Sequence[Tuple[Any, ...]]):
+        """Start one process per argument tuple, in a background thread"""
+        def spawn():
+            for process_args in args:
+                if self.stop_event.is_set():
+                    break
+                process = self._context.Process(target=target, args=process_args, daemon=True)
+                process.start()
+                self.processes.append(process)
+        self._starter = threading.Thread(target=spawn, daemon=True)
+        self._starter.start()
+
+    def is_alive(self) -> bool:
+        """True while processes are still being started or any of them runs"""
+        if self._starter is not None and self._starter.is_alive():
+            return True
+        return any(process.is_alive() for process in self.processes)
+
+    def stop(self, cleanup: Optional[Callable[[], None]] = None):
+        """Signal the workers to stop; join them (terminating stragglers), then run cleanup, in a background thread"""
+        self.stop_event.set()
+        if self._stopper is not None:
+            return
+        def join():
+            if self._starter is not None:
+                self._starter.join()
+            for process in self.processes:
+                process.join(timeout=self.JOIN_TIMEOUT)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+            if cleanup is not None:
+                cleanup()
+        # Not a daemon: interpreter shutdown waits for it, so the shared memory is still unlinked
+        self._stopper = threading.Thread(target=join)
+        self._stopper.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until a stop() has joined every process; False on timeout"""
+        if self._stopper is None:
+            return False
+        self._stopper.join(timeout)
+        return not self._stopper.is_alive()
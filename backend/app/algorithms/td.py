@@ -30,14 +30,18 @@ class TDLearning(RLAlgorithm):
         self.n_states = state_space['n']
         self.n_actions = action_space['n']
         
-        self.q_table = np.random.uniform(-0.01, 0.01, (self.n_states, self.n_actions))
+        self.q_table = self._init_q_table(config)
         
         cumulative_reward = 0.0
+        timer = self.timer
         n_step = config.n_step  # n for n-step TD
+        adaptive = env.is_adaptive()
         
         for episode in range(config.n_episodes):
             state_info = env.reset()
             state = state_info.observation
+            if adaptive:
+                self._refine_tables(env)
             action = self._epsilon_greedy(state, config.epsilon)
             
             # For CartPole and MountainCar, send continuous state for visualization on reset
@@ -70,7 +74,9 @@ class TDLearning(RLAlgorithm):
             while True:
                 if t < T:
                     # Take action
+                    t0 = timer.start()
                     next_state_info = env.step(action)
+                    timer.lap("env_step", t0)
                     next_state = next_state_info.observation
                     reward = next_state_info.reward
                     done = next_state_info.done
@@ -79,32 +85,11 @@ class TDLearning(RLAlgorithm):
                     episode_reward += reward
                     episode_steps += 1
                     
-                    # For CartPole and MountainCar, send continuous state for visualization
-                    # For Breakout, send render data (paddle_x, ball_x, ball_y, lives)
-                    visualization_state = state
-                    if config.environment == EnvironmentType.CARTPOLE:
-                        if 'continuous_state' in next_state_info.info:
-                            visualization_state = next_state_info.info['continuous_state']
-                    elif config.environment == EnvironmentType.MOUNTAINCAR:
-                        if 'continuous_state' in next_state_info.info:
-                            visualization_state = next_state_info.info['continuous_state']
-                    elif config.environment == EnvironmentType.BREAKOUT:
-                        # Use render data for Breakout visualization
-                        render_data = env.render()
-                        visualization_state = {
-                            'paddle_x': render_data.get('paddle_x', 80),
-                            'ball_x': render_data.get('ball_x', 80),
-                            'ball_y': render_data.get('ball_y', 100),
-                            'ball_vel_x': render_data.get('ball_vel_x', 0),
-                            'ball_vel_y': render_data.get('ball_vel_y', 0),
-                            'lives': render_data.get('lives', 5),
-                            'score': render_data.get('score', 0),
-                            'bricks_destroyed': render_data.get('bricks_destroyed', 0),
-                            'remaining_bricks': render_data.get('remaining_bricks', 40)
-                        }
+                    visualization_state = self._visualization_state(env, config, state, next_state_info)
                     
                     # Yield update on every step for real-time visualization
-                    yield TrainingUpdate(
+                    t0 = timer.start()
+                    update = TrainingUpdate(
                         episode=episode + 1,
                         step=episode_steps,
                         reward=reward,
@@ -114,6 +99,8 @@ class TDLearning(RLAlgorithm):
                         value_function=None,
                         policy=None
                     )
+                    timer.lap("update_build", t0)
+                    yield update
                     
                     if done:
                         T = t + 1
@@ -127,6 +114,7 @@ class TDLearning(RLAlgorithm):
                 tau = t - n_step + 1  # Time whose estimate is being updated
                 
                 if tau >= 0:
+                    t0 = timer.start()
                     # Calculate n-step return
                     G = sum([config.discount_factor ** (i - tau - 1) * rewards[i - tau - 1] 
                             for i in range(tau + 1, min(tau + n_step, T) + 1)])
@@ -140,7 +128,11 @@ class TDLearning(RLAlgorithm):
                     # Update Q-value
                     s_tau = states[0] if len(states) > 0 else state
                     a_tau = actions[0] if len(actions) > 0 else action
-                    self.q_table[s_tau][a_tau] += config.learning_rate * (G - self.q_table[s_tau][a_tau])
+                    td_error = G - self.q_table[s_tau][a_tau]
+                    self.q_table[s_tau][a_tau] += config.learning_rate * td_error
+                    if adaptive:
+                        env.record_td_error(s_tau, td_error)
+                    timer.lap("learner_update", t0)
                 
                 if tau == T - 1:
                     break
@@ -148,9 +140,11 @@ class TDLearning(RLAlgorithm):
                 t += 1
             
             cumulative_reward += episode_reward
+            converged = self._end_episode(episode_reward, episode_steps)
             
             # Yield value function and policy at episode end
-            if episode % 50 == 0:
+            if converged or episode % 50 == 0:
+                value_function, policy = self._snapshot(True)
                 yield TrainingUpdate(
                     episode=episode + 1,
                     step=episode_steps,
@@ -158,22 +152,17 @@ class TDLearning(RLAlgorithm):
                     cumulative_reward=cumulative_reward,
                     state=state,
                     action=0,
-                    value_function=self.get_value_function(),
-                    policy=self.get_policy()
+                    value_function=value_function,
+                    policy=policy
                 )
+            if converged:
+                break
     
     def get_value_function(self) -> Dict[str, float]:
-        return {str(i): float(np.max(self.q_table[i])) for i in range(self.n_states)}
+        return self._q_value_function()
     
     def get_policy(self) -> Dict[str, Any]:
-        # Break ties randomly when Q-values are equal
-        policy = {}
-        for i in range(self.n_states):
-            q_values = self.q_table[i]
-            max_q = np.max(q_values)
-            best_actions = np.where(q_values == max_q)[0]
-            policy[str(i)] = int(np.random.choice(best_actions))
-        return policy
+        return self._q_policy()
     
     def select_action(self, state: Union[int, tuple]) -> int:
         if isinstance(state, tuple):
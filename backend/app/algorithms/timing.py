@@ -0,0 +1,45 @@
+import time
+from typing import Dict
+from app.models.schemas import PhaseTiming
+
+_now_ns = time.perf_counter_ns  # monotonic
+
+class PhaseTimer:
+    """
+    Accumulates wall time per named phase of the training pipeline.
+    
+    Usage: t0 = timer.start(); ...; t0 = timer.lap("env_step", t0); ...
+    A disabled timer skips the clock reads entirely.
+    """
+    
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.totals_ns: Dict[str, int] = {}
+        self.counts: Dict[str, int] = {}
+    
+    def start(self) -> int:
+        return _now_ns() if self.enabled else 0
+    
+    def lap(self, phase: str, started_ns: int) -> int:
+        """Charge the time since started_ns to phase and return the current time"""
+        if not self.enabled:
+            return 0
+        now = _now_ns()
+        self.totals_ns[phase] = self.totals_ns.get(phase, 0) + now - started_ns
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+        return now
+    
+    def summary(self) -> Dict[str, PhaseTiming]:
+        total = sum(self.totals_ns.values()) or 1
+        return {
+            phase: PhaseTiming(
+                total_ms=ns / 1e6,
+                count=self.counts[phase],
+                mean_us=ns / 1e3 / self.counts[phase],
+                share=ns / total
+            )
+            for phase, ns in sorted(self.totals_ns.items(), key=lambda item: -item[1])
+        }
+
+# Shared no-op timer used when timing is not requested
+NULL_TIMER = PhaseTimer(enabled=False)
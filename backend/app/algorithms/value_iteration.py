@@ -1,62 +1,82 @@
 import numpy as np
 from typing import Generator, Dict, Any, Union
+from app.algorithms import dp
 from app.algorithms.base import RLAlgorithm
+from app.algorithms.model_learning import EmpiricalMDP, train_on_learned_model
 from app.models.schemas import TrainingConfig, TrainingUpdate
 
 class ValueIteration(RLAlgorithm):
     """Value Iteration: Model-based DP algorithm"""
     
+    state_attributes = ("value_function", "policy")
+    
     def __init__(self):
         self.value_function = {}
         self.policy = {}
         self.n_states = 0
         self.n_actions = 0
+        self.n_sweeps = 0  # Full passes over the state space in the last train()
     
     def train(self, env, config: TrainingConfig) -> Generator[TrainingUpdate, None, None]:
         if not env.is_model_based():
-            raise ValueError("Value Iteration requires a model-based environment")
+            # Certainty equivalence: solve a model estimated from collected transitions
+            if not EmpiricalMDP.supports(config, env):
+                raise ValueError("Value Iteration requires a model-based environment, or cartpole/mountaincar without adaptive_discretization")
+            yield from train_on_learned_model(self, env, config)
+            return
         
         state_space = env.get_state_space()
         action_space = env.get_action_space()
         self.n_states = state_space['n']
         self.n_actions = action_space['n']
         
-        # Initialize value function
-        V = np.zeros(self.n_states)
+        # Initialize value function (forked sessions continue from the loaded solution)
+        if self.warm_start and isinstance(self.value_function, np.ndarray) and len(self.value_function) == self.n_states:
+            V = np.array(self.value_function, dtype=np.float64)
+        else:
+            V = np.zeros(self.n_states)
         
         theta = 1e-6  # Convergence threshold
         max_iterations = config.n_episodes
+        self.n_sweeps = 0
+        
+        # Grid environments expose the whole model as arrays: sweep all states at once
+        model = env.get_transition_arrays() if hasattr(env, 'get_transition_arrays') else None
+        timer = self.timer
         
         for iteration in range(max_iterations):
             delta = 0
+            self.n_sweeps += 1
+            t0 = timer.start()
             
-            for s in range(self.n_states):
-                v = V[s]
-                
-                # Calculate Q-values for all actions
-                action_values = np.zeros(self.n_actions)
-                for a in range(self.n_actions):
-                    transitions = env.get_transitions(s, a)
-                    action_values[a] = sum(prob * (reward + config.discount_factor * V[next_s] * (not done))
-                                           for prob, next_s, reward, done in transitions)
-                
-                # Bellman optimality update
-                V[s] = np.max(action_values)
-                delta = max(delta, abs(v - V[s]))
+            if model is not None:
+                V, delta = dp.value_sweep(model, V, config.discount_factor)
+            else:
+                for s in range(self.n_states):
+                    v = V[s]
+                    
+                    # Calculate Q-values for all actions
+                    action_values = self._action_values(env, s, V, config.discount_factor)
+                    
+                    # Bellman optimality update
+                    V[s] = np.max(action_values)
+                    delta = max(delta, abs(v - V[s]))
+            
+            t0 = timer.lap("dp_sweep", t0)
             
             # Extract policy from value function
-            policy = np.zeros(self.n_states, dtype=int)
-            for s in range(self.n_states):
-                action_values = np.zeros(self.n_actions)
-                for a in range(self.n_actions):
-                    transitions = env.get_transitions(s, a)
-                    action_values[a] = sum(prob * (reward + config.discount_factor * V[next_s] * (not done))
-                                           for prob, next_s, reward, done in transitions)
-                policy[s] = np.argmax(action_values)
+            if model is not None:
+                policy = dp.greedy_policy(model, V, config.discount_factor)
+            else:
+                policy = np.zeros(self.n_states, dtype=int)
+                for s in range(self.n_states):
+                    policy[s] = np.argmax(self._action_values(env, s, V, config.discount_factor))
+            timer.lap("policy_extraction", t0)
             
             # Yield update periodically
             if iteration % 10 == 0 or iteration == max_iterations - 1:
-                yield TrainingUpdate(
+                t0 = timer.start()
+                update = TrainingUpdate(
                     episode=iteration + 1,
                     step=0,
                     reward=0.0,
@@ -66,6 +86,8 @@ class ValueIteration(RLAlgorithm):
                     value_function={str(i): float(V[i]) for i in range(self.n_states)},
                     policy={str(i): int(policy[i]) for i in range(self.n_states)}
                 )
+                timer.lap("update_build", t0)
+                yield update
             
             # Check convergence
             if delta < theta:
@@ -74,6 +96,14 @@ class ValueIteration(RLAlgorithm):
         self.value_function = V
         self.policy = policy
     
+    def _action_values(self, env, s: int, V: np.ndarray, gamma: float) -> np.ndarray:
+        action_values = np.zeros(self.n_actions)
+        for a in range(self.n_actions):
+            transitions = env.get_transitions(s, a)
+            action_values[a] = sum(prob * (reward + gamma * V[next_s] * (not done))
+                                   for prob, next_s, reward, done in transitions)
+        return action_values
+    
     def get_value_function(self) -> Dict[str, float]:
         return {str(i): float(self.value_function[i]) for i in range(self.n_states)}
     
@@ -0,0 +1,70 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse, Response
+from app.config import settings
+from app.models.schemas import ProfileRequest, ProfileJobInfo
+from app.services.training import training_service
+from app.services.pbt import pbt_service
+from app.services.profiling import WORKER_PROCESS_MODES, profiler_service
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """Admin routes are closed unless ADMIN_TOKEN is configured and sent as X-Admin-Token"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API is disabled (ADMIN_TOKEN is not set)")
+    if x_admin_token != settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.post("/sessions/{session_id}/profile", response_model=ProfileJobInfo)
+async def profile_session(session_id: str, request: ProfileRequest):
+    """
+    Attach a profiler to one running session for request.duration_seconds.
+    Only work on the API process is seen: hogwild and actor_learner sessions and PBT
+    runs train in worker processes and are rejected. The trace_memory report diffs
+    process-wide tracemalloc snapshots, so it also counts other sessions' allocations.
+    """
+    if pbt_service.get_run(session_id):
+        raise HTTPException(status_code=400, detail="PBT members train in worker processes and cannot be profiled")
+    session = await training_service.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if session.config.parallel_mode in WORKER_PROCESS_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{session.config.parallel_mode.value} sessions train in worker processes and cannot be profiled"
+        )
+    try:
+        job = profiler_service.start(session, request)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return job.info()
+
+@router.get("/profiles/{profile_id}", response_model=ProfileJobInfo)
+async def get_profile(profile_id: str):
+    """Get status of a profiling job"""
+    job = profiler_service.get_job(profile_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return job.info()
+
+@router.get("/profiles/{profile_id}/result")
+async def download_profile(profile_id: str, format: Literal["pstats", "collapsed", "memory"] = "pstats"):
+    """Download a finished profile (pstats for deterministic, collapsed stacks for sampling mode)"""
+    job = profiler_service.get_job(profile_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail="Profile is still running")
+    
+    if format == "pstats" and job.pstats_data is not None:
+        return Response(
+            job.pstats_data,
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.pstats"'}
+        )
+    if format == "collapsed" and job.collapsed_data is not None:
+        return PlainTextResponse(job.collapsed_data)
+    if format == "memory" and job.memory_report is not None:
+        return PlainTextResponse(job.memory_report)
+    raise HTTPException(status_code=400, detail=f"Format '{format}' not available for this profile")
@@ -24,18 +24,18 @@ ALGORITHM_INFO = {
     AlgorithmType.POLICY_ITERATION: Algorithm(
         id="policy_iteration",
         name="Policy Iteration",
-        description="Model-based DP with policy evaluation and improvement steps.",
+        description="Model-based DP with policy evaluation and improvement steps. On CartPole/MountainCar it solves a model estimated from collected episodes.",
         requires_model=True,
-        compatible_environments=["gridworld", "frozenlake"],
-        parameters={"discount_factor": 0.99}
+        compatible_environments=["gridworld", "frozenlake", "cartpole", "mountaincar"],
+        parameters={"discount_factor": 0.99, "model_episodes": 500, "model_rounds": 3}
     ),
     AlgorithmType.VALUE_ITERATION: Algorithm(
         id="value_iteration",
         name="Value Iteration",
-        description="Model-based DP using Bellman optimality updates.",
+        description="Model-based DP using Bellman optimality updates. On CartPole/MountainCar it solves a model estimated from collected episodes.",
         requires_model=True,
-        compatible_environments=["gridworld", "frozenlake"],
-        parameters={"discount_factor": 0.99}
+        compatible_environments=["gridworld", "frozenlake", "cartpole", "mountaincar"],
+        parameters={"discount_factor": 0.99, "model_episodes": 500, "model_rounds": 3}
     ),
     AlgorithmType.MONTE_CARLO: Algorithm(
         id="monte_carlo",
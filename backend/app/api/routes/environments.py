@@ -1,6 +1,11 @@
-from fastapi import APIRouter
+import asyncio
+import time
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from app.environments.dam_scenarios import simulate_scenarios
 from app.models.enums import EnvironmentType
-from app.models.schemas import Environment, SpaceInfo
+from app.models.schemas import DamScenarioReport, DamScenarioRequest, Environment, SpaceInfo
+from app.services.training import training_service
 
 router = APIRouter()
 
@@ -9,7 +14,7 @@ ENVIRONMENT_INFO = {
         id="gridworld",
         name="GridWorld",
         description="Navigate a grid to reach the goal while avoiding holes",
-        state_space=SpaceInfo(type="discrete", n=25, shape=[5, 5]),
+        state_space=SpaceInfo(type="discrete", n=25, shape=[5, 5], dimensions=["row", "col"]),
         action_space=SpaceInfo(type="discrete", n=4),
         max_episode_steps=100
     ),
@@ -17,7 +22,7 @@ ENVIRONMENT_INFO = {
         id="frozenlake",
         name="FrozenLake",
         description="Navigate on slippery ice to reach the goal without falling into holes",
-        state_space=SpaceInfo(type="discrete", n=25, shape=[5, 5]),
+        state_space=SpaceInfo(type="discrete", n=25, shape=[5, 5], dimensions=["row", "col"]),
         action_space=SpaceInfo(type="discrete", n=4),
         max_episode_steps=100
     ),
@@ -25,7 +30,10 @@ ENVIRONMENT_INFO = {
         id="cartpole",
         name="CartPole",
         description="Balance a pole on a moving cart",
-        state_space=SpaceInfo(type="discrete", n=14641),  # 11^4 discretized states
+        state_space=SpaceInfo(
+            type="discrete", n=14641, shape=[11, 11, 11, 11],  # 11^4 discretized states
+            dimensions=["cart_position", "cart_velocity", "pole_angle", "pole_angular_velocity"]
+        ),
         action_space=SpaceInfo(type="discrete", n=2),
         max_episode_steps=500
     ),
@@ -33,7 +41,7 @@ ENVIRONMENT_INFO = {
         id="mountaincar",
         name="MountainCar",
         description="Drive an underpowered car up a steep hill",
-        state_space=SpaceInfo(type="discrete", n=441),  # 20x20 discretization
+        state_space=SpaceInfo(type="discrete", n=441, shape=[21, 21], dimensions=["position", "velocity"]),  # 20 bins per axis
         action_space=SpaceInfo(type="discrete", n=3),
         max_episode_steps=200
     ),
@@ -41,7 +49,7 @@ ENVIRONMENT_INFO = {
         id="breakout",
         name="Breakout",
         description="Classic Atari game - control a paddle to bounce a ball and break bricks",
-        state_space=SpaceInfo(type="discrete", n=1000),  # 10x10x10 discretization
+        state_space=SpaceInfo(type="discrete", n=1000, shape=[10, 10, 10], dimensions=["paddle_x", "ball_x", "ball_y"]),
         action_space=SpaceInfo(type="discrete", n=4),
         max_episode_steps=1000
     ),
@@ -49,7 +57,7 @@ ENVIRONMENT_INFO = {
         id="gym4real_dam",
         name="Gym4ReaL Dam",
         description="Real-world dam management - balance flood prevention and power generation",
-        state_space=SpaceInfo(type="discrete", n=400),  # 20x20 discretization
+        state_space=SpaceInfo(type="discrete", n=400, shape=[20, 20], dimensions=["water_level", "inflow"]),
         action_space=SpaceInfo(type="discrete", n=3),
         max_episode_steps=200
     )
@@ -60,6 +68,53 @@ def get_environments():
     """Get list of all available environments"""
     return list(ENVIRONMENT_INFO.values())
 
+async def _scenario_policy(request: DamScenarioRequest) -> np.ndarray:
+    """Action per discrete dam state from the request's policy source"""
+    n_states = request.n_bins ** 2
+    if request.session_id is not None:
+        session = await training_service.get_session(request.session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+        if session.config.environment != EnvironmentType.GYM4REAL_DAM:
+            raise HTTPException(status_code=400, detail="Session is not training on gym4real_dam")
+        if session.algorithm.n_states != n_states:
+            raise HTTPException(status_code=400, detail=f"Session policy has {session.algorithm.n_states} states, expected {n_states}")
+        # Hashed Q-tables only report visited states; the others take action 0
+        policy = session.algorithm.get_policy()
+        return np.array([int(policy.get(str(s), 0)) for s in range(n_states)])
+    if request.policy is not None:
+        if len(request.policy) != n_states:
+            raise HTTPException(status_code=400, detail=f"Policy must have one action per state ({n_states})")
+        return np.clip(np.asarray(request.policy), 0, 2)
+    if request.action is not None:
+        return np.full(n_states, request.action)
+    raise HTTPException(status_code=400, detail="One of session_id, policy or action is required")
+
+@router.post("/gym4real_dam/scenarios", response_model=DamScenarioReport)
+async def simulate_dam_scenarios(request: DamScenarioRequest):
+    """Roll a policy out over many stochastic inflow scenarios of the dam model (risk estimates)"""
+    policy = await _scenario_policy(request)
+    started = time.perf_counter()
+    # Off the event loop: large scenario batches take a noticeable fraction of a second
+    result = await asyncio.to_thread(
+        simulate_scenarios, policy, request.n_scenarios, request.horizon,
+        request.n_bins, request.percentiles, request.seed
+    )
+    return DamScenarioReport(
+        n_scenarios=request.n_scenarios,
+        horizon=request.horizon,
+        flood_probability=result["flood_probability"],
+        empty_probability=result["empty_probability"],
+        flood_probability_over_time=result["flood_probability_over_time"].tolist(),
+        empty_probability_over_time=result["empty_probability_over_time"].tolist(),
+        level_percentiles={key: values.tolist() for key, values in result["level_percentiles"].items()},
+        power_mean=result["power_mean"],
+        power_std=result["power_std"],
+        power_percentiles=result["power_percentiles"],
+        return_mean=result["return_mean"],
+        elapsed_ms=(time.perf_counter() - started) * 1000.0
+    )
+
 @router.get("/{env_id}", response_model=Environment)
 def get_environment(env_id: str):
     """Get details for a specific environment"""
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.services.metrics import registry
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus scrape endpoint (pre-aggregated; does not walk the session table)"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException
+from app.models.schemas import PBTConfig, PBTStatus
+from app.services.pbt import pbt_service
+
+router = APIRouter()
+
+@router.post("/start", response_model=PBTStatus)
+async def start_pbt_run(config: PBTConfig):
+    """Start a population of members training in parallel worker processes"""
+    try:
+        run = pbt_service.start(config)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return run.get_status()
+
+@router.get("/{run_id}", response_model=PBTStatus)
+async def get_pbt_run(run_id: str):
+    """Population state: per-member scores and hyperparameters, best member, recent exploit steps"""
+    run = pbt_service.get_run(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="PBT run not found")
+    return run.get_status()
+
+@router.post("/{run_id}/stop", response_model=PBTStatus)
+async def stop_pbt_run(run_id: str):
+    """Stop the members; the last population state stays available"""
+    run = pbt_service.get_run(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="PBT run not found")
+    await pbt_service.stop(run_id)
+    return run.get_status()
+
+@router.delete("/{run_id}")
+async def delete_pbt_run(run_id: str):
+    """Stop and forget a PBT run"""
+    if not pbt_service.get_run(run_id):
+        raise HTTPException(status_code=404, detail="PBT run not found")
+    await pbt_service.delete(run_id)
+    return {"status": "deleted"}
@@ -0,0 +1,23 @@
+import asyncio
+from fastapi import APIRouter, HTTPException
+from app.models.schemas import BatchSolveRequest, BatchSolveResult, ResolveRequest, ResolveResult
+from app.services import planning
+
+router = APIRouter()
+
+@router.post("/batch", response_model=BatchSolveResult)
+async def solve_batch(request: BatchSolveRequest):
+    """Value iteration for many discount factor / slip / map variants in one vectorized loop"""
+    try:
+        # Off the event loop: large batches take a while
+        return await asyncio.to_thread(planning.solve_batch, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/resolve", response_model=ResolveResult)
+async def resolve(request: ResolveRequest):
+    """Re-solve a (slightly edited) map starting from a previous solution, with convergence bounds"""
+    try:
+        return await asyncio.to_thread(planning.resolve, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
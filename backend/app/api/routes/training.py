@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException
-from app.models.schemas import TrainingConfig, TrainingStatus
+from fastapi import APIRouter, HTTPException, Query
+from app.models.enums import CurveDownsampling
+from pydantic import ValidationError
+from app.models.schemas import SessionForkRequest, TrainingConfig, TrainingMetrics, TrainingStatus
 from app.services.training import training_service
 
 router = APIRouter()
@@ -8,7 +10,7 @@ router = APIRouter()
 async def start_training_session(config: TrainingConfig):
     """Start a new training session"""
     try:
-        session_id = training_service.create_session(config)
+        session_id = await training_service.create_session(config)
         # Auto-start training
         await training_service.start_training(session_id)
         return {"session_id": session_id, "status": "started"}
@@ -18,25 +20,52 @@ async def start_training_session(config: TrainingConfig):
 @router.post("/{session_id}/stop")
 async def stop_training_session(session_id: str):
     """Stop a running training session"""
-    session = training_service.get_session(session_id)
+    session = training_service.find_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
     await training_service.stop_training(session_id)
     return {"status": "stopped"}
 
+@router.post("/{session_id}/fork")
+async def fork_training_session(session_id: str, request: SessionForkRequest):
+    """Branch a session: a new session continuing from its current tables with config overrides"""
+    try:
+        fork_id = await training_service.fork_session(session_id, request.overrides)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Session not found")
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if request.start:
+        await training_service.start_training(fork_id)
+    return {"session_id": fork_id, "forked_from": session_id, "status": "started" if request.start else "created"}
+
 @router.get("/{session_id}/status", response_model=TrainingStatus)
 async def get_training_status(session_id: str):
     """Get status of a training session"""
-    session = training_service.get_session(session_id)
+    session = training_service.find_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     return session.get_status()
 
+@router.get("/{session_id}/metrics", response_model=TrainingMetrics)
+async def get_training_metrics(
+    session_id: str,
+    points: int = Query(default=1000, ge=2, le=20000),
+    method: CurveDownsampling = CurveDownsampling.LTTB,
+):
+    """Per-episode reward/length curves, downsampled server-side to about `points` episodes"""
+    session = await training_service.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session.get_metrics(points, method)
+
 @router.delete("/{session_id}")
 async def delete_training_session(session_id: str):
     """Delete a training session"""
-    session = training_service.get_session(session_id)
+    session = training_service.find_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
@@ -1,8 +1,13 @@
 from fastapi import APIRouter, WebSocket, Depends, HTTPException
 from app.services.training import training_service
+from app.services.pbt import pbt_service
 
 router = APIRouter()
 
 @router.websocket("/ws/training/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     await training_service.connect_websocket(session_id, websocket)
+
+@router.websocket("/ws/pbt/{run_id}")
+async def pbt_dashboard_endpoint(websocket: WebSocket, run_id: str):
+    await pbt_service.stream(run_id, websocket)
@@ -1,11 +1,26 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     CORS_ORIGINS: List[str] = ["http://localhost:5173", "http://localhost:3000"]
     MAX_SESSIONS: int = 100
     SESSION_TTL: int = 3600
     LOG_LEVEL: str = "INFO"
+    # Required as X-Admin-Token on /api/v1/admin routes; they answer 403 while unset
+    ADMIN_TOKEN: Optional[str] = None
+    # Import + startup time above which a warning is logged
+    COLD_START_BUDGET_MS: int = 1000
+    # Memory management: idle sessions are hibernated to disk (LRU) once the
+    # resident sessions exceed the budget
+    MEMORY_BUDGET_MB: int = 1024
+    REAPER_INTERVAL: float = 30.0
+    HIBERNATION_DIR: str = "/tmp/rl_sessions"
+    # Prewarmed environment instances per type (slow-to-create environments only);
+    # set to {} on workers that only serve GridWorld/FrozenLake to skip Gymnasium entirely
+    ENV_POOL_SIZES: Dict[str, int] = {"cartpole": 2, "mountaincar": 2, "breakout": 1}
+    # Compile the Numba kernels at startup instead of when the first use_jit session is
+    # created (costs a core for a few seconds at boot on every worker)
+    JIT_WARMUP: bool = False
 
     class Config:
         env_file = ".env"
@@ -1,26 +1,99 @@
-from app.environments.gridworld import GridWorld
-from app.environments.frozenlake import FrozenLake
-from app.environments.cartpole import CartPole
-from app.environments.mountaincar import MountainCar
-from app.environments.breakout import Breakout
-from app.environments.gym4real_dam import Gym4RealDam
+import importlib
+from typing import Any, Dict, Tuple, Type
 from app.environments.base import RLEnvironment
-from app.models.enums import EnvironmentType
-
-def create_environment(env_type: EnvironmentType) -> RLEnvironment:
-    """Factory function to create environments"""
-    if env_type == EnvironmentType.GRIDWORLD:
-        return GridWorld(size=5)
-    elif env_type == EnvironmentType.FROZENLAKE:
-        return FrozenLake(size=5, is_slippery=True)
-    elif env_type == EnvironmentType.CARTPOLE:
-        return CartPole(n_bins=10)
-    elif env_type == EnvironmentType.MOUNTAINCAR:
-        return MountainCar(n_bins=20)
-    elif env_type == EnvironmentType.BREAKOUT:
-        return Breakout(n_bins=10)
-    elif env_type == EnvironmentType.GYM4REAL_DAM:
-        return Gym4RealDam(n_bins=20)
-    else:
+from app.models.enums import AlgorithmType, EnvironmentType, ParallelMode, QTableBackend
+
+# Environment modules are imported on first use so that serving GridWorld (or only
+# the metadata routes) never pays for importing Gymnasium, ALE or gym4real.
+# EnvironmentType -> (module, class name, default constructor arguments)
+ENVIRONMENT_REGISTRY: Dict[EnvironmentType, Tuple[str, str, Dict[str, Any]]] = {
+    EnvironmentType.GRIDWORLD: ("app.environments.gridworld", "GridWorld", {"size": 5}),
+    EnvironmentType.FROZENLAKE: ("app.environments.frozenlake", "FrozenLake", {"size": 5, "is_slippery": True}),
+    EnvironmentType.CARTPOLE: ("app.environments.cartpole", "CartPole", {"n_bins": 10}),
+    EnvironmentType.MOUNTAINCAR: ("app.environments.mountaincar", "MountainCar", {"n_bins": 20}),
+    EnvironmentType.BREAKOUT: ("app.environments.breakout", "Breakout", {"n_bins": 10, "obs_type": "ram", "frame_skip": 4}),
+    EnvironmentType.GYM4REAL_DAM: ("app.environments.gym4real_dam", "Gym4RealDam", {"n_bins": 20}),
+}
+
+# Batched variants (K copies stepped in worker processes) for ParallelMode.VECTORIZED
+BATCHED_ENVIRONMENT_REGISTRY: Dict[EnvironmentType, Tuple[str, str]] = {
+    EnvironmentType.BREAKOUT: ("app.environments.breakout_vec", "BatchedBreakout"),
+}
+
+# Discretized environments whose constructor takes n_bins (bins per state dimension)
+BINNED_ENVIRONMENTS = (
+    EnvironmentType.CARTPOLE, EnvironmentType.MOUNTAINCAR, EnvironmentType.BREAKOUT, EnvironmentType.GYM4REAL_DAM,
+)
+
+# Learners with a batched training path
+BATCHED_ALGORITHMS = (AlgorithmType.Q_LEARNING,)
+# Learners that can consume transitions from actor processes (ParallelMode.ACTOR_LEARNER)
+ACTOR_LEARNER_ALGORITHMS = (AlgorithmType.Q_LEARNING, AlgorithmType.MONTE_CARLO)
+
+_CLASS_MODULES = {class_name: module for module, class_name, _ in ENVIRONMENT_REGISTRY.values()}
+_CLASS_MODULES.update({class_name: module for module, class_name in BATCHED_ENVIRONMENT_REGISTRY.values()})
+
+def get_environment_class(env_type: EnvironmentType) -> Type[RLEnvironment]:
+    """Import (on first use) and return the class implementing an environment type"""
+    if env_type not in ENVIRONMENT_REGISTRY:
         raise ValueError(f"Unknown environment type: {env_type}")
+    module, class_name, _ = ENVIRONMENT_REGISTRY[env_type]
+    return getattr(importlib.import_module(module), class_name)
+
+def create_environment(env_type: EnvironmentType, **options: Any) -> RLEnvironment:
+    """Factory function to create environments; options override the registry defaults.
+    An n_envs option selects the batched variant of the environment."""
+    env_class = get_environment_class(env_type)
+    _, _, kwargs = ENVIRONMENT_REGISTRY[env_type]
+    if "n_envs" in options:
+        if env_type not in BATCHED_ENVIRONMENT_REGISTRY:
+            raise ValueError(f"No batched version of environment: {env_type}")
+        module, class_name = BATCHED_ENVIRONMENT_REGISTRY[env_type]
+        env_class = getattr(importlib.import_module(module), class_name)
+    return env_class(**{**kwargs, **options})
+
+def environment_options(config) -> Dict[str, Any]:
+    """Constructor overrides requested by a TrainingConfig (empty means registry defaults)"""
+    options: Dict[str, Any] = {}
+    if config.environment == EnvironmentType.BREAKOUT and config.frame_skip is not None:
+        options["frame_skip"] = config.frame_skip
+    if config.environment in (EnvironmentType.GRIDWORLD, EnvironmentType.FROZENLAKE):
+        if config.map_size is not None:
+            options["size"] = config.map_size
+        if config.hole_fraction is not None:
+            options["hole_fraction"] = config.hole_fraction
+            options["map_seed"] = config.map_seed
+    if config.n_bins is not None and config.environment in BINNED_ENVIRONMENTS:
+        options["n_bins"] = config.n_bins
+    if config.environment in (EnvironmentType.CARTPOLE, EnvironmentType.MOUNTAINCAR) and config.adaptive_discretization:
+        options["adaptive"] = True
+    if config.parallel_mode == ParallelMode.VECTORIZED:
+        if config.environment not in BATCHED_ENVIRONMENT_REGISTRY:
+            raise ValueError(f"Vectorized training is not available for {config.environment.value}")
+        if config.algorithm not in BATCHED_ALGORITHMS:
+            raise ValueError(f"Vectorized training is not available for {config.algorithm.value}")
+        options["n_envs"] = config.n_workers
+        options["max_steps"] = config.max_steps
+    if config.parallel_mode == ParallelMode.HOGWILD and config.algorithm != AlgorithmType.Q_LEARNING:
+        raise ValueError("Hogwild training is only available for q_learning")
+    if config.parallel_mode == ParallelMode.ACTOR_LEARNER and config.algorithm not in ACTOR_LEARNER_ALGORITHMS:
+        raise ValueError(f"Actor/learner training is not available for {config.algorithm.value}")
+    if config.parallel_mode in (ParallelMode.HOGWILD, ParallelMode.ACTOR_LEARNER):
+        # Workers build their own environments and stream discrete states
+        if config.environment == EnvironmentType.BREAKOUT:
+            raise ValueError(f"{config.parallel_mode.value} training is not available for breakout (use vectorized)")
+        if config.adaptive_discretization:
+            raise ValueError(f"{config.parallel_mode.value} training needs a fixed state space (adaptive_discretization is off)")
+    if config.q_table_backend == QTableBackend.HASHED:
+        # Shared-memory workers and compiled kernels index one dense array
+        if config.parallel_mode in (ParallelMode.HOGWILD, ParallelMode.ACTOR_LEARNER):
+            raise ValueError(f"{config.parallel_mode.value} training needs a dense Q-table (q_table_backend=dense)")
+        if config.use_jit:
+            raise ValueError("Compiled kernels need a dense Q-table (use_jit needs q_table_backend=dense)")
+    return options
 
+def __getattr__(name: str):
+    # Keeps `from app.environments import CartPole` working without eager imports
+    if name in _CLASS_MODULES:
+        return getattr(importlib.import_module(_CLASS_MODULES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
+import numpy as np
 from typing import Dict, Any, Tuple, List
 from app.models.schemas import EnvironmentState
 
 class RLEnvironment(ABC):
+    # AdaptiveDiscretizer when the environment refines its state space while training
+    discretizer = None
+    
     @abstractmethod
     def reset(self) -> EnvironmentState:
         pass
@@ -26,6 +30,35 @@ class RLEnvironment(ABC):
         """Returns rendering data (not pixels, but state info for frontend)"""
         pass
     
+    def close(self):
+        """Releases any resources held by the environment"""
+        pass
+    
+    def estimate_memory(self) -> int:
+        """Approximate number of bytes held by the environment instance"""
+        return 64 * 1024
+    
+    def is_adaptive(self) -> bool:
+        """True if the number of discrete states can grow between episodes"""
+        return self.discretizer is not None
+    
+    def record_td_error(self, state: int, td_error: float):
+        """Feedback from the learner that drives where an adaptive state space is refined"""
+        if self.discretizer is not None:
+            self.discretizer.record_td_error(state, td_error)
+    
+    def take_splits(self) -> List[Tuple[int, int]]:
+        """(parent, new state) pairs created by refinement since the last call"""
+        return self.discretizer.take_splits() if self.discretizer is not None else []
+    
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Learned environment-side structure to persist with a session (empty for most envs)"""
+        return self.discretizer.get_state() if self.discretizer is not None else {}
+    
+    def load_state(self, state: Dict[str, np.ndarray]):
+        if self.discretizer is not None and state:
+            self.discretizer.load_state(state)
+    
     def is_model_based(self) -> bool:
         """Returns True if environment dynamics are known (for PI/VI)"""
         return False
@@ -0,0 +1,169 @@
+import functools
+import gymnasium as gym
+import numpy as np
+from typing import Dict, Any, Tuple
+from gymnasium.vector import AsyncVectorEnv, AutoresetMode
+from app.environments.base import RLEnvironment
+from app.environments.breakout import (
+    BALL_X_RAM, BALL_Y_RAM, PADDLE_X_RAM, _register_atari, discretize_positions
+)
+from app.models.schemas import EnvironmentState
+
+def _make_ram_env(frame_skip: int, repeat_action_probability: float, max_episode_steps: int):
+    """Runs in the worker process: one RAM-observation Breakout emulator"""
+    _register_atari()
+    return gym.make(
+        'ALE/Breakout-v5',
+        obs_type="ram",
+        frameskip=frame_skip,
+        repeat_action_probability=repeat_action_probability,
+        max_episode_steps=max_episode_steps,
+    )
+
+class BatchedBreakout(RLEnvironment):
+    """
+    K Breakout emulators stepped in lock-step, each in its own worker process.
+    RAM observations (128 bytes per lane) come back through a shared-memory
+    buffer, and lanes reset themselves in the step that ends their episode.
+
+    Batch-aware learners use reset_batch()/step_batch(); the single-env
+    reset()/step() interface exposes lane 0 (all lanes take the given action)
+    so the generic render path keeps working. ALE's native vector env is not
+    used because it only produces image observations.
+    """
+
+    def __init__(self, n_envs: int = 4, n_bins: int = 10, frame_skip: int = 4,
+                 repeat_action_probability: float = 0.25, max_steps: int = 1000, obs_type: str = "ram"):
+        if obs_type != "ram":
+            raise ValueError("Batched Breakout only supports RAM observations")
+        make_env = functools.partial(_make_ram_env, frame_skip, repeat_action_probability, max_steps)
+        # spawn: forking the server process (event loop, threads) is not safe
+        self.env = AsyncVectorEnv(
+            [make_env] * n_envs,
+            shared_memory=True,
+            context="spawn",
+            autoreset_mode=AutoresetMode.SAME_STEP,
+        )
+        self.n_envs = n_envs
+        self.n_bins = n_bins
+        self.frame_skip = frame_skip
+        self.max_steps = max_steps
+        self.ram = None  # (n_envs, 128) RAM of the last reset/step
+        self.steps = np.zeros(n_envs, dtype=np.int64)
+        self.lives = np.full(n_envs, 5, dtype=np.int64)
+        self.bricks_destroyed = np.zeros(n_envs, dtype=np.int64)
+        self.last_ball = None
+        self.ball_vel_x = 0
+        self.ball_vel_y = 0
+
+    def discretize(self, ram: np.ndarray) -> np.ndarray:
+        """Vectorized Breakout._discretize_ram: one discrete state per row of RAM"""
+        return discretize_positions(ram[:, PADDLE_X_RAM], ram[:, BALL_X_RAM], ram[:, BALL_Y_RAM], self.n_bins)
+
+    def reset_batch(self) -> np.ndarray:
+        obs, info = self.env.reset()
+        self.ram = obs
+        self.steps[:] = 0
+        self.lives[:] = info.get('lives', 5)
+        self.bricks_destroyed[:] = 0
+        self.last_ball = None
+        self.ball_vel_x = 0
+        self.ball_vel_y = 0
+        return self.discretize(obs)
+
+    def step_batch(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Step every lane. Returns (states, rewards, dones); for lanes that finished,
+        states already belong to the next episode.
+        """
+        obs, rewards, terminated, truncated, info = self.env.step(actions)
+        dones = terminated | truncated
+        self.ram = obs
+
+        self.steps += 1
+        self.bricks_destroyed += np.where(rewards > 0, np.maximum(1, rewards.astype(np.int64)), 0)
+        self.lives = np.asarray(info.get('lives', self.lives))
+
+        # Lane 0 drives the visualization
+        ball = (int(obs[0, BALL_X_RAM]), int(obs[0, BALL_Y_RAM]))
+        if self.last_ball is not None and not dones[0]:
+            self.ball_vel_x = ball[0] - self.last_ball[0]
+            self.ball_vel_y = ball[1] - self.last_ball[1]
+        else:
+            self.ball_vel_x = 0
+            self.ball_vel_y = 0
+        self.last_ball = ball
+
+        self.steps[dones] = 0
+        self.bricks_destroyed[dones] = 0
+        return self.discretize(obs), rewards.astype(np.float64), dones
+
+    def reset(self) -> EnvironmentState:
+        states = self.reset_batch()
+        return EnvironmentState(
+            observation=int(states[0]),
+            reward=0.0,
+            done=False,
+            info={"lives": int(self.lives[0]), "n_envs": self.n_envs}
+        )
+
+    def step(self, action: int) -> EnvironmentState:
+        states, rewards, dones = self.step_batch(np.full(self.n_envs, action, dtype=np.int64))
+        return EnvironmentState(
+            observation=int(states[0]),
+            reward=float(rewards[0]),
+            done=bool(dones[0]),
+            info={"lives": int(self.lives[0]), "n_envs": self.n_envs}
+        )
+
+    def get_state_space(self) -> Dict[str, Any]:
+        return {
+            "type": "discrete",
+            "n": self.n_bins ** 3,  # paddle_x * ball_x * ball_y bins
+            "shape": (self.n_bins,) * 3,
+            "dimensions": ["paddle_x", "ball_x", "ball_y"],
+            "description": "Discretized (Paddle X, Ball X, Ball Y)"
+        }
+
+    def get_action_space(self) -> Dict[str, Any]:
+        return {
+            "type": "discrete",
+            "n": 4,
+            "actions": ["NOOP", "FIRE", "RIGHT", "LEFT"]
+        }
+
+    def render(self) -> Dict[str, Any]:
+        """Render data for lane 0"""
+        if self.ram is None:
+            return {
+                "paddle_x": 80,
+                "ball_x": 80,
+                "ball_y": 100,
+                "ball_vel_x": 0,
+                "ball_vel_y": 0,
+                "lives": 5,
+                "score": 0
+            }
+        ram = self.ram[0]
+        bricks_destroyed = int(self.bricks_destroyed[0])
+        return {
+            "paddle_x": int(ram[PADDLE_X_RAM]),
+            "ball_x": int(ram[BALL_X_RAM]),
+            "ball_y": int(ram[BALL_Y_RAM]),
+            "ball_vel_x": self.ball_vel_x,
+            "ball_vel_y": self.ball_vel_y,
+            "lives": int(self.lives[0]),
+            "score": int(self.steps[0]),
+            "bricks_destroyed": bricks_destroyed,
+            "remaining_bricks": max(0, 40 - bricks_destroyed)
+        }
+
+    def is_model_based(self) -> bool:
+        return False
+
+    def estimate_memory(self) -> int:
+        # One emulator per worker process
+        return self.n_envs * 48 * 1024 * 1024
+
+    def close(self):
+        self.env.close()
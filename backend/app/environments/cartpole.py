@@ -2,21 +2,23 @@ import gymnasium as gym
 import numpy as np
 from typing import Dict, Any, List, Tuple
 from app.environments.base import RLEnvironment
+from app.environments.discretization import AdaptiveDiscretizer
 from app.models.schemas import EnvironmentState
 
 class CartPole(RLEnvironment):
     """CartPole-v1 wrapper using Gymnasium with state discretization for Q-learning"""
     
-    def __init__(self, n_bins: int = 10):
+    LOW = [-2.4, -3.0, -0.25, -3.0]  # Cart position, cart velocity, pole angle (radians), pole angular velocity
+    HIGH = [2.4, 3.0, 0.25, 3.0]
+    
+    def __init__(self, n_bins: int = 10, adaptive: bool = False, max_cells: int = 4096):
         self.env = gym.make('CartPole-v1')
         self.n_bins = n_bins
         
-        self.bins = [
-            np.linspace(-2.4, 2.4, n_bins),      # Cart position
-            np.linspace(-3.0, 3.0, n_bins),      # Cart velocity
-            np.linspace(-0.25, 0.25, n_bins),    # Pole angle (radians)
-            np.linspace(-3.0, 3.0, n_bins),      # Pole angular velocity
-        ]
+        self.bins = [np.linspace(low, high, n_bins) for low, high in zip(self.LOW, self.HIGH)]
+        # Adaptive mode: start coarse and split cells where the learner needs resolution
+        if adaptive:
+            self.discretizer = AdaptiveDiscretizer(self.LOW, self.HIGH, max_cells=max_cells)
         
         self.current_state = None
         self.current_discrete_state = None
@@ -25,6 +27,8 @@ class CartPole(RLEnvironment):
     
     def _discretize_state(self, state: np.ndarray) -> int:
         """Convert continuous 4D state to single discrete index"""
+        if self.discretizer is not None:
+            return self.discretizer.discretize(state)
         discrete_indices = []
         for i, val in enumerate(state):
             idx = np.digitize(val, self.bins[i])
@@ -40,6 +44,8 @@ class CartPole(RLEnvironment):
         return int(discrete_state)
     
     def reset(self) -> EnvironmentState:
+        if self.discretizer is not None:
+            self.discretizer.refine()  # between episodes; learners pick the splits up after reset
         obs, info = self.env.reset()
         self.current_state = obs
         self.current_discrete_state = self._discretize_state(obs)
@@ -75,10 +81,19 @@ class CartPole(RLEnvironment):
         )
     
     def get_state_space(self) -> Dict[str, Any]:
+        if self.discretizer is not None:
+            return {
+                "type": "discrete",
+                "n": self.discretizer.n_states,
+                "adaptive": True,
+                "description": "Adaptively refined cells over (Cart Position, Cart Velocity, Pole Angle, Pole Angular Velocity)"
+            }
         n = self.n_bins + 1
         return {
             "type": "discrete",
             "n": n ** 4,  # 4 dimensions discretized
+            "shape": (n, n, n, n),
+            "dimensions": ["cart_position", "cart_velocity", "pole_angle", "pole_angular_velocity"],
             "description": "Discretized (Cart Position, Cart Velocity, Pole Angle, Pole Angular Velocity)"
         }
     
@@ -103,5 +118,12 @@ class CartPole(RLEnvironment):
     def is_model_based(self) -> bool:
         return False  # Physics-based, continuous state
     
+    def estimate_memory(self) -> int:
+        # Gymnasium env plus classic-control renderer state
+        size = 2 * 1024 * 1024
+        if self.discretizer is not None:
+            size += self.discretizer.estimate_memory()
+        return size
+    
     def close(self):
         self.env.close()
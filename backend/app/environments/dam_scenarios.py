@@ -0,0 +1,95 @@
+import numpy as np
+from typing import Dict, Any, Optional, Sequence
+
+# Fallback dam model shared with Gym4RealDam.step
+RELEASE_RATES = np.array([2.0, 5.0, 10.0])  # Actions: 0=Low, 1=Medium, 2=High release
+POWER_PER_RELEASE = 0.5
+MAX_LEVEL = 100.0
+MAX_INFLOW = 20.0  # Upper edge of the inflow discretization
+FLOOD_REWARD = -50.0
+EMPTY_REWARD = -20.0
+
+def discretize_dam_state(water_level, inflow, n_bins: int):
+    """Gym4RealDam._discretize_state for scalars or arrays of scenarios"""
+    level_bin = np.minimum((np.asarray(water_level) / MAX_LEVEL * n_bins).astype(np.int64), n_bins - 1)
+    inflow_bin = np.minimum((np.asarray(inflow) / MAX_INFLOW * n_bins).astype(np.int64), n_bins - 1)
+    return level_bin * n_bins + inflow_bin
+
+def level_penalty(water_level):
+    """Flood-risk penalty above 90, low-level penalty below 20 (0 in between)"""
+    return np.where(
+        water_level > 90, -10 * (water_level - 90) / 10,
+        np.where(water_level < 20, -5 * (20 - water_level) / 20, 0.0)
+    )
+
+def simulate_scenarios(
+    policy: np.ndarray,
+    n_scenarios: int = 1000,
+    horizon: int = 200,
+    n_bins: int = 20,
+    percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Roll a deterministic policy (action per discrete state) out over many
+    stochastic inflow trajectories of the fallback dam model at once.
+
+    Scenarios that flood or empty stop there and keep their terminal level,
+    so level percentiles at step t describe every scenario.
+    """
+    rng = np.random.default_rng(seed)
+    policy = np.asarray(policy, dtype=np.int64)
+    q = np.asarray(percentiles, dtype=np.float64)
+
+    # Same initial conditions as Gym4RealDam.reset
+    level = 50.0 + rng.uniform(-10, 10, n_scenarios)
+    inflow = 5.0 + rng.uniform(-2, 2, n_scenarios)
+    alive = np.ones(n_scenarios, dtype=bool)
+    flooded = np.zeros(n_scenarios, dtype=bool)
+    emptied = np.zeros(n_scenarios, dtype=bool)
+    total_power = np.zeros(n_scenarios)
+    returns = np.zeros(n_scenarios)
+
+    level_history = np.empty((horizon, len(q)))
+    flood_history = np.empty(horizon)
+    empty_history = np.empty(horizon)
+
+    for t in range(horizon):
+        actions = policy[discretize_dam_state(level, inflow, n_bins)]
+        release = RELEASE_RATES[np.minimum(actions, len(RELEASE_RATES) - 1)]
+
+        new_inflow = np.maximum(0, inflow + rng.uniform(-1, 1, n_scenarios))
+        new_level = np.clip(level + new_inflow - release, 0, MAX_LEVEL)
+        inflow = np.where(alive, new_inflow, inflow)
+        level = np.where(alive, new_level, level)
+
+        power = np.where(alive, release * POWER_PER_RELEASE, 0.0)
+        total_power += power
+        reward = power + level_penalty(level)
+
+        flood_now = alive & (level >= MAX_LEVEL)
+        empty_now = alive & (level <= 0) & ~flood_now
+        reward = np.where(flood_now, FLOOD_REWARD, np.where(empty_now, EMPTY_REWARD, reward))
+        returns += np.where(alive, reward, 0.0)
+        flooded |= flood_now
+        emptied |= empty_now
+        alive &= ~(flood_now | empty_now)
+
+        level_history[t] = np.percentile(level, q)
+        flood_history[t] = flooded.mean()
+        empty_history[t] = emptied.mean()
+
+    # End-of-horizon bonus for scenarios that survived (as in the environment)
+    returns += np.where(alive, total_power * 0.1, 0.0)
+
+    return {
+        "flood_probability": float(flooded.mean()),
+        "empty_probability": float(emptied.mean()),
+        "flood_probability_over_time": flood_history,
+        "empty_probability_over_time": empty_history,
+        "level_percentiles": {f"p{p:g}": level_history[:, i] for i, p in enumerate(q)},
+        "power_mean": float(total_power.mean()),
+        "power_std": float(total_power.std()),
+        "power_percentiles": {f"p{p:g}": float(v) for p, v in zip(q, np.percentile(total_power, q))},
+        "return_mean": float(returns.mean()),
+    }
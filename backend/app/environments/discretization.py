@@ -0,0 +1,184 @@
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+
+class AdaptiveDiscretizer:
+    """
+    Variable-resolution state aggregation for continuous observations.
+
+    Cells are the leaves of a k-d tree over the observation box. It starts as a
+    coarse uniform grid; at episode boundaries, cells that have been visited
+    often and whose TD errors vary a lot (the value is not constant inside
+    the cell) are split in two along the dimension where visited points are
+    most spread out, at their mean. A split keeps the parent's state index
+    for one half and appends a new index for the other, so learners grow
+    their tables by copying the parent's row (see RLAlgorithm._refine_tables).
+    """
+
+    def __init__(
+        self,
+        low: Sequence[float],
+        high: Sequence[float],
+        initial_bins: int = 3,
+        max_cells: int = 4096,
+        min_visits: int = 50,
+        min_td_variance: float = 1e-3,
+        max_splits_per_episode: int = 4,
+    ):
+        self.low = np.asarray(low, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.n_dims = len(self.low)
+        self.max_cells = max_cells
+        self.min_visits = min_visits
+        self.min_td_variance = min_td_variance
+        self.max_splits_per_episode = max_splits_per_episode
+
+        # Tree nodes: split_dim -1 marks a leaf, whose state index is node_state
+        max_nodes = 2 * max_cells
+        self.split_dim = np.full(max_nodes, -1, dtype=np.int16)
+        self.split_value = np.zeros(max_nodes)
+        self.children = np.zeros((max_nodes, 2), dtype=np.int32)
+        self.node_state = np.zeros(max_nodes, dtype=np.int32)
+        self.node_low = np.zeros((max_nodes, self.n_dims))
+        self.node_high = np.zeros((max_nodes, self.n_dims))
+        self.node_low[0] = self.low
+        self.node_high[0] = self.high
+        self.state_node = np.zeros(max_cells, dtype=np.int32)
+        self.n_nodes = 1
+        self.n_cells = 1
+
+        # Per-cell statistics since the cell was created
+        self.visits = np.zeros(max_cells, dtype=np.int64)
+        self.obs_sum = np.zeros((max_cells, self.n_dims))
+        self.obs_sq_sum = np.zeros((max_cells, self.n_dims))
+        self.td_count = np.zeros(max_cells, dtype=np.int64)
+        self.td_sum = np.zeros(max_cells)
+        self.td_sq_sum = np.zeros(max_cells)
+
+        self._pending_splits: List[Tuple[int, int]] = []
+
+        # Coarse uniform start: split the box at the interior grid lines
+        for dim in range(self.n_dims):
+            for edge in np.linspace(self.low[dim], self.high[dim], initial_bins + 1)[1:-1]:
+                for state in range(self.n_cells):
+                    node = self.state_node[state]
+                    if self.node_low[node, dim] < edge < self.node_high[node, dim]:
+                        self._split(node, dim, edge)
+        self._pending_splits = []
+
+    @property
+    def n_states(self) -> int:
+        return self.n_cells
+
+    def _split(self, node: int, dim: int, value: float) -> int:
+        """Split a leaf; returns the new state index (the left half keeps the old one)"""
+        state = self.node_state[node]
+        left, right = self.n_nodes, self.n_nodes + 1
+        self.n_nodes += 2
+        new_state = self.n_cells
+        self.n_cells += 1
+
+        self.split_dim[node] = dim
+        self.split_value[node] = value
+        self.children[node] = (left, right)
+        self.node_state[left] = state
+        self.node_state[right] = new_state
+        self.node_low[left] = self.node_low[right] = self.node_low[node]
+        self.node_high[left] = self.node_high[right] = self.node_high[node]
+        self.node_high[left, dim] = value
+        self.node_low[right, dim] = value
+        self.state_node[state] = left
+        self.state_node[new_state] = right
+
+        for cell in (state, new_state):
+            self.visits[cell] = 0
+            self.obs_sum[cell] = 0.0
+            self.obs_sq_sum[cell] = 0.0
+            self.td_count[cell] = 0
+            self.td_sum[cell] = 0.0
+            self.td_sq_sum[cell] = 0.0
+        self._pending_splits.append((int(state), int(new_state)))
+        return new_state
+
+    def discretize(self, obs: np.ndarray) -> int:
+        """Cell index of an observation (and record the visit)"""
+        node = 0
+        split_dim = self.split_dim
+        while split_dim[node] >= 0:
+            node = self.children[node, 0 if obs[split_dim[node]] < self.split_value[node] else 1]
+        state = int(self.node_state[node])
+        self.visits[state] += 1
+        self.obs_sum[state] += obs
+        self.obs_sq_sum[state] += np.square(obs)
+        return state
+
+    def record_td_error(self, state: int, td_error: float):
+        self.td_count[state] += 1
+        self.td_sum[state] += td_error
+        self.td_sq_sum[state] += td_error * td_error
+
+    def refine(self) -> int:
+        """Split the most promising cells (call between episodes); returns the number of splits"""
+        capacity = self.max_cells - self.n_cells
+        if capacity <= 0:
+            return 0
+        n = self.n_cells
+        counts = np.maximum(self.td_count[:n], 1)
+        td_mean = self.td_sum[:n] / counts
+        td_variance = self.td_sq_sum[:n] / counts - td_mean ** 2
+        eligible = (self.visits[:n] >= self.min_visits) & (self.td_count[:n] >= self.min_visits) \
+            & (td_variance >= self.min_td_variance)
+        candidates = np.flatnonzero(eligible)
+        if len(candidates) == 0:
+            return 0
+        # Most visited, most inconsistent cells first
+        score = td_variance[candidates] * self.visits[candidates]
+        chosen = candidates[np.argsort(-score)[:min(self.max_splits_per_episode, capacity)]]
+
+        for state in chosen:
+            visits = self.visits[state]
+            mean = self.obs_sum[state] / visits
+            spread = self.obs_sq_sum[state] / visits - mean ** 2
+            node = self.state_node[state]
+            lo, hi = self.node_low[node], self.node_high[node]
+            # Normalize so dimensions with large ranges do not always win
+            dim = int(np.argmax(spread / np.square(self.high - self.low)))
+            value = float(np.clip(mean[dim], lo[dim], hi[dim]))
+            if not lo[dim] < value < hi[dim]:
+                value = float((lo[dim] + hi[dim]) / 2)
+            self._split(node, dim, value)
+        return len(chosen)
+
+    def take_splits(self) -> List[Tuple[int, int]]:
+        """(parent, child) state pairs created since the last call, in creation order"""
+        splits, self._pending_splits = self._pending_splits, []
+        return splits
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Tree arrays for hibernation (statistics are not kept)"""
+        return {
+            "split_dim": self.split_dim[:self.n_nodes],
+            "split_value": self.split_value[:self.n_nodes],
+            "children": self.children[:self.n_nodes],
+            "node_state": self.node_state[:self.n_nodes],
+            "node_low": self.node_low[:self.n_nodes],
+            "node_high": self.node_high[:self.n_nodes],
+            "state_node": self.state_node[:self.n_cells],
+        }
+
+    def load_state(self, state: Dict[str, np.ndarray]):
+        self.n_nodes = len(state["split_dim"])
+        self.n_cells = len(state["state_node"])
+        self.split_dim[:self.n_nodes] = state["split_dim"]
+        self.split_value[:self.n_nodes] = state["split_value"]
+        self.children[:self.n_nodes] = state["children"]
+        self.node_state[:self.n_nodes] = state["node_state"]
+        self.node_low[:self.n_nodes] = state["node_low"]
+        self.node_high[:self.n_nodes] = state["node_high"]
+        self.state_node[:self.n_cells] = state["state_node"]
+        self._pending_splits = []
+
+    def estimate_memory(self) -> int:
+        arrays = (self.split_dim, self.split_value, self.children, self.node_state, self.state_node,
+                  self.node_low, self.node_high,
+                  self.visits, self.obs_sum, self.obs_sq_sum, self.td_count, self.td_sum, self.td_sq_sum)
+        return sum(array.nbytes for array in arrays)
@@ -1,6 +1,10 @@
 import numpy as np
-from typing import Dict, Any, Tuple, List
+from typing import Dict, Any, Tuple, List, Optional
 from app.environments.base import RLEnvironment
+from app.environments.maps import (
+    FROZENLAKE_MAPS, GOAL, HOLE, START, generate_map, grid_transition_arrays,
+    map_from_desc, map_to_desc, next_state_table
+)
 from app.models.schemas import EnvironmentState
 
 class FrozenLake(RLEnvironment):
@@ -9,62 +13,41 @@ class FrozenLake(RLEnvironment):
     S: Start, F: Frozen (safe), H: Hole (terminal), G: Goal (terminal)
     """
     
-    def __init__(self, size: int = 5, is_slippery: bool = True):
-        self.size = size
-        self.is_slippery = is_slippery
+    DEFAULT_HOLE_FRACTION = 0.2
+    
+    def __init__(self, size: int = 5, is_slippery: bool = True, hole_fraction: Optional[float] = None,
+                 map_seed: Optional[int] = None, desc: Optional[List[str]] = None):
+        # Hand-made maps for sizes 4, 5 and 8; other sizes (or a hole_fraction) get a
+        # seeded random solvable map
+        if desc is not None:
+            grid = map_from_desc(desc)
+        elif hole_fraction is None and size in FROZENLAKE_MAPS:
+            grid = map_from_desc(FROZENLAKE_MAPS[size])
+        else:
+            grid = generate_map(size, self.DEFAULT_HOLE_FRACTION if hole_fraction is None else hole_fraction, map_seed)
         
-        # 5x5 map (default) - matches the pixel art layout
-        if size == 5:
-            self.desc = [
-                "SFFFF",
-                "FHFFF",
-                "FFHFF",
-                "FHHFF",
-                "FFFFG"
-            ]
-        elif size == 4:
-            self.desc = [
-                "SFFF",
-                "FHFH",
-                "FFFH",
-                "HFFG"
-            ]
-        else:  # 8x8 map
-            self.desc = [
-                "SFFFFFFF",
-                "FFFFFFFF",
-                "FFFHFFFF",
-                "FFFFFHFF",
-                "FFFHFFFF",
-                "FHHFFFHF",
-                "FHFFHFHF",
-                "FFFHFFFG"
-            ]
+        self.grid = grid
+        self.size = size = grid.shape[0]
+        self.is_slippery = is_slippery
+        self.desc = map_to_desc(grid)
         
         self.n_states = size * size
         self.n_actions = 4  # LEFT, DOWN, RIGHT, UP
         self.actions = [0, 1, 2, 3]
         self.action_names = ["LEFT", "DOWN", "RIGHT", "UP"]
+        self.next_state = next_state_table(size, [(0, -1), (1, 0), (0, 1), (-1, 0)])
         
         # Parse map
-        self.start_state = None
-        self.goal_state = None
-        self.holes = []
-        
-        for i in range(size):
-            for j in range(size):
-                idx = i * size + j
-                cell = self.desc[i][j]
-                if cell == 'S':
-                    self.start_state = idx
-                elif cell == 'G':
-                    self.goal_state = idx
-                elif cell == 'H':
-                    self.holes.append(idx)
+        flat = grid.ravel()
+        self.start_state = int(np.flatnonzero(flat == START)[0])
+        self.goal_state = int(np.flatnonzero(flat == GOAL)[0])
+        self.is_hole = flat == HOLE
+        self.holes = np.flatnonzero(self.is_hole).tolist()
+        self._transition_arrays = None
         
         self.current_state = self.start_state
         self.steps = 0
-        self.max_steps = 100
+        self.max_steps = max(100, 4 * size)  # large maps need longer episodes to reach the goal
     
     def reset(self) -> EnvironmentState:
         self.current_state = self.start_state
@@ -101,7 +84,8 @@ class FrozenLake(RLEnvironment):
         return {
             "type": "discrete",
             "n": self.n_states,
-            "shape": (self.size, self.size)
+            "shape": (self.size, self.size),
+            "dimensions": ["row", "col"]
         }
     
     def get_action_space(self) -> Dict[str, Any]:
@@ -125,13 +109,29 @@ class FrozenLake(RLEnvironment):
     def is_model_based(self) -> bool:
         return True
     
+    def estimate_memory(self) -> int:
+        size = self.grid.nbytes + self.is_hole.nbytes + self.next_state.nbytes
+        if self._transition_arrays is not None:
+            size += sum(array.nbytes for array in self._transition_arrays)
+        return max(size, 64 * 1024)
+    
+    def get_transition_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """get_transitions for every (state, action) at once, as (S, A, K) arrays (built on first use)"""
+        if self._transition_arrays is None:
+            outcomes = [(0, 1.0 / 3.0), (-1, 1.0 / 3.0), (1, 1.0 / 3.0)] if self.is_slippery else [(0, 1.0)]
+            self._transition_arrays = grid_transition_arrays(
+                self.grid, self.next_state, outcomes,
+                step_reward=0.0, goal_reward=1.0, hole_reward=0.0, absorbing_terminals=True
+            )
+        return self._transition_arrays
+    
     def get_transitions(self, state: int, action: int) -> List[Tuple[float, int, float, bool]]:
         """
         Returns [(probability, next_state, reward, done)]
         If slippery, agent moves in intended direction with prob 1/3,
         and perpendicular directions with prob 1/3 each.
         """
-        if state in self.holes or state == self.goal_state:
+        if self.is_hole[state] or state == self.goal_state:
             # Terminal states
             return [(1.0, state, 0.0, True)]
         
@@ -160,25 +160,13 @@ class FrozenLake(RLEnvironment):
     
     def _get_next_state(self, state: int, action: int) -> int:
         """Calculate next state from action (respecting boundaries)"""
-        row, col = self._index_to_coords(state)
-        
-        # LEFT, DOWN, RIGHT, UP
-        if action == 0:  # LEFT
-            col = max(0, col - 1)
-        elif action == 1:  # DOWN
-            row = min(self.size - 1, row + 1)
-        elif action == 2:  # RIGHT
-            col = min(self.size - 1, col + 1)
-        elif action == 3:  # UP
-            row = max(0, row - 1)
-        
-        return self._coords_to_index(row, col)
+        return int(self.next_state[state, action])
     
     def _get_reward_done(self, state: int) -> Tuple[float, bool]:
         """Get reward and done flag for a state"""
         if state == self.goal_state:
             return 1.0, True
-        elif state in self.holes:
+        elif self.is_hole[state]:
             return 0.0, True
         else:
             return 0.0, False
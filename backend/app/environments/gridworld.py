@@ -1,22 +1,49 @@
 import numpy as np
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, List, Optional
 from app.environments.base import RLEnvironment
+from app.environments.maps import (
+    GOAL, HOLE, START, empty_map, generate_map, grid_transition_arrays, map_from_desc, map_to_desc, next_state_table
+)
 from app.models.schemas import EnvironmentState
 
 class GridWorld(RLEnvironment):
-    def __init__(self, size: int = 4):
-        self.size = size
+    """
+    Grid navigation with deterministic moves. Without hole_fraction the map is
+    the size-4 preset (no holes for other sizes); with it, a seeded random
+    solvable map of any size is generated. desc (rows of S/F/H/G) gives the map explicitly.
+    """
+    
+    def __init__(self, size: int = 4, hole_fraction: Optional[float] = None, map_seed: Optional[int] = None,
+                 desc: Optional[List[str]] = None):
+        if desc is not None:
+            self.grid = map_from_desc(desc)
+        elif hole_fraction is None:
+            self.grid = empty_map(size, [(1, 1), (1, 3), (2, 3), (3, 0)] if size == 4 else [])  # Simple preset
+        else:
+            self.grid = generate_map(size, hole_fraction, map_seed)
+        self.size = size = self.grid.shape[0]
         self.shape = (size, size)
-        self.start_state = (0, 0)
-        self.goal_state = (size - 1, size - 1)
-        self.holes = [(1, 1), (1, 3), (2, 3), (3, 0)] if size == 4 else [] # Simple preset
+        self.desc = map_to_desc(self.grid)
+        self.start_state = self._index_to_state(int(np.flatnonzero(self.grid.ravel() == START)[0]))
+        self.goal_state = self._index_to_state(int(np.flatnonzero(self.grid.ravel() == GOAL)[0]))
+        self.is_hole = (self.grid == HOLE).ravel()
+        self.goal_index = self._state_to_index(self.goal_state)
+        self._holes: Optional[List[Tuple[int, int]]] = None
+        self._transition_arrays = None
         self.current_state = self.start_state
-        self.max_steps = 100
+        self.max_steps = max(100, 4 * size)  # large maps need longer episodes to reach the goal
         self.steps = 0
         
         # Actions: 0: UP, 1: RIGHT, 2: DOWN, 3: LEFT
         self.action_space_size = 4
         self.moves = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+        self.next_state = next_state_table(size, self.moves)
+    
+    @property
+    def holes(self) -> List[Tuple[int, int]]:
+        if self._holes is None:
+            self._holes = [self._index_to_state(int(i)) for i in np.flatnonzero(self.is_hole)]
+        return self._holes
 
     def reset(self) -> EnvironmentState:
         self.current_state = self.start_state
@@ -30,20 +57,16 @@ class GridWorld(RLEnvironment):
 
     def step(self, action: int) -> EnvironmentState:
         self.steps += 1
-        row, col = self.current_state
-        dr, dc = self.moves[action]
-        
-        new_row = max(0, min(self.size - 1, row + dr))
-        new_col = max(0, min(self.size - 1, col + dc))
-        new_state = (new_row, new_col)
+        new_index = int(self.next_state[self._state_to_index(self.current_state), action])
+        new_state = self._index_to_state(new_index)
         
         reward = -0.01
         done = False
         
-        if new_state == self.goal_state:
+        if new_index == self.goal_index:
             reward = 1.0
             done = True
-        elif new_state in self.holes:
+        elif self.is_hole[new_index]:
             reward = -1.0
             done = True
         elif self.steps >= self.max_steps:
@@ -62,7 +85,8 @@ class GridWorld(RLEnvironment):
         return {
             "type": "discrete",
             "n": self.size * self.size,
-            "shape": self.shape
+            "shape": self.shape,
+            "dimensions": ["row", "col"]
         }
 
     def get_action_space(self) -> Dict[str, Any]:
@@ -89,27 +113,35 @@ class GridWorld(RLEnvironment):
     def is_model_based(self) -> bool:
         return True
     
+    def estimate_memory(self) -> int:
+        size = self.grid.nbytes + self.is_hole.nbytes + self.next_state.nbytes
+        if self._transition_arrays is not None:
+            size += sum(array.nbytes for array in self._transition_arrays)
+        return max(size, 64 * 1024)
+    
     def get_transitions(self, state: int, action: int) -> list:
         """Returns [(probability, next_state, reward, done)]"""
-        state_coords = self._index_to_state(state)
-        row, col = state_coords
-        dr, dc = self.moves[action]
-        
-        new_row = max(0, min(self.size - 1, row + dr))
-        new_col = max(0, min(self.size - 1, col + dc))
-        new_state = (new_row, new_col)
-        new_state_idx = self._state_to_index(new_state)
+        new_state_idx = int(self.next_state[state, action])
         
         reward = -0.01
         done = False
         
-        if new_state == self.goal_state:
+        if new_state_idx == self.goal_index:
             reward = 1.0
             done = True
-        elif new_state in self.holes:
+        elif self.is_hole[new_state_idx]:
             reward = -1.0
             done = True
         
         # Deterministic transitions
         return [(1.0, new_state_idx, reward, done)]
+    
+    def get_transition_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """get_transitions for every (state, action) at once, as (S, A, 1) arrays (built on first use)"""
+        if self._transition_arrays is None:
+            self._transition_arrays = grid_transition_arrays(
+                self.grid, self.next_state, [(0, 1.0)],
+                step_reward=-0.01, goal_reward=1.0, hole_reward=-1.0, absorbing_terminals=False
+            )
+        return self._transition_arrays
 
@@ -1,13 +1,18 @@
 import numpy as np
 from typing import Dict, Any, List, Tuple
 from app.environments.base import RLEnvironment
+from app.environments.dam_scenarios import (
+    EMPTY_REWARD, FLOOD_REWARD, POWER_PER_RELEASE, RELEASE_RATES, discretize_dam_state, level_penalty
+)
 from app.models.schemas import EnvironmentState
 
-try:
-    from gym4real.envs import DamEnv as Gym4RealDamEnv
-    GYM4REAL_AVAILABLE = True
-except ImportError:
-    GYM4REAL_AVAILABLE = False
+def _load_gym4real():
+    """Probe for gym4real on first use (returns the DamEnv class or None)"""
+    try:
+        from gym4real.envs import DamEnv
+        return DamEnv
+    except ImportError:
+        return None
 
 class Gym4RealDam(RLEnvironment):
     """
@@ -23,7 +28,8 @@ class Gym4RealDam(RLEnvironment):
     
     def __init__(self, n_bins: int = 20):
         self.n_bins = n_bins
-        self.use_real_env = GYM4REAL_AVAILABLE
+        Gym4RealDamEnv = _load_gym4real()
+        self.use_real_env = Gym4RealDamEnv is not None
         
         if self.use_real_env:
             try:
@@ -45,9 +51,7 @@ class Gym4RealDam(RLEnvironment):
         
     def _discretize_state(self, water_level: float, inflow: float) -> int:
         """Convert continuous state to discrete"""
-        level_bin = min(int((water_level / self.max_level) * self.n_bins), self.n_bins - 1)
-        inflow_bin = min(int((inflow / 20.0) * self.n_bins), self.n_bins - 1)
-        return level_bin * self.n_bins + inflow_bin
+        return int(discretize_dam_state(water_level, inflow, self.n_bins))
     
     def reset(self) -> EnvironmentState:
         self.steps = 0
@@ -110,8 +114,8 @@ class Gym4RealDam(RLEnvironment):
         
         # Fallback simulation
         # Actions: 0=Low release, 1=Medium release, 2=High release
-        release_rates = [2.0, 5.0, 10.0]
-        release = release_rates[min(action, 2)]
+        # (the model lives in dam_scenarios, which also simulates it in batch)
+        release = float(RELEASE_RATES[min(action, 2)])
         
         # Update water level
         self.inflow_rate = max(0, self.inflow_rate + np.random.uniform(-1, 1))
@@ -119,26 +123,20 @@ class Gym4RealDam(RLEnvironment):
         self.water_level = np.clip(self.water_level, 0, self.max_level)
         
         # Calculate reward
-        power_generated = release * 0.5  # Power proportional to release
+        power_generated = release * POWER_PER_RELEASE  # Power proportional to release
         self.total_power += power_generated
         
-        # Penalties for extreme levels
-        level_penalty = 0
-        if self.water_level > 90:
-            level_penalty = -10 * (self.water_level - 90) / 10  # Flood risk
-        elif self.water_level < 20:
-            level_penalty = -5 * (20 - self.water_level) / 20   # Too low
-        
-        reward = power_generated + level_penalty
+        # Penalties for extreme levels (flood risk above 90, too low below 20)
+        reward = power_generated + float(level_penalty(self.water_level))
         
         # Check termination
         done = False
         if self.water_level >= self.max_level:
             done = True
-            reward = -50  # Dam overflow
+            reward = FLOOD_REWARD  # Dam overflow
         elif self.water_level <= 0:
             done = True
-            reward = -20  # Dam empty
+            reward = EMPTY_REWARD  # Dam empty
         elif self.steps >= self.max_steps:
             done = True
             reward += self.total_power * 0.1  # Bonus for total power
@@ -162,6 +160,8 @@ class Gym4RealDam(RLEnvironment):
         return {
             "type": "discrete",
             "n": self.n_bins ** 2,
+            "shape": (self.n_bins, self.n_bins),
+            "dimensions": ["water_level", "inflow"],
             "description": "Discretized (Water Level, Inflow Rate)"
         }
     
@@ -0,0 +1,145 @@
+import numpy as np
+from collections import deque
+from typing import List, Optional, Sequence, Tuple
+
+# Cell codes for int8 map grids
+FROZEN = 0  # Free cell
+HOLE = 1
+START = 2
+GOAL = 3
+
+_CELL_CHARS = "FHSG"
+
+# Hand-made FrozenLake layouts (S: Start, F: Frozen, H: Hole, G: Goal)
+FROZENLAKE_MAPS = {
+    4: [
+        "SFFF",
+        "FHFH",
+        "FFFH",
+        "HFFG"
+    ],
+    # matches the pixel art layout
+    5: [
+        "SFFFF",
+        "FHFFF",
+        "FFHFF",
+        "FHHFF",
+        "FFFFG"
+    ],
+    8: [
+        "SFFFFFFF",
+        "FFFFFFFF",
+        "FFFHFFFF",
+        "FFFFFHFF",
+        "FFFHFFFF",
+        "FHHFFFHF",
+        "FHFFHFHF",
+        "FFFHFFFG"
+    ],
+}
+
+def empty_map(size: int, holes: Sequence[Tuple[int, int]] = ()) -> np.ndarray:
+    """size x size grid with the start top-left, the goal bottom-right and the given holes"""
+    grid = np.full((size, size), FROZEN, dtype=np.int8)
+    for row, col in holes:
+        grid[row, col] = HOLE
+    grid[0, 0] = START
+    grid[size - 1, size - 1] = GOAL
+    return grid
+
+def map_from_desc(desc: Sequence[str]) -> np.ndarray:
+    """Parse rows of S/F/H/G characters into an int8 grid"""
+    rows = [row.upper() for row in desc]
+    if not rows or any(len(row) != len(rows) for row in rows):
+        raise ValueError("Map description must be a non-empty square of S/F/H/G characters")
+    try:
+        grid = np.array([[_CELL_CHARS.index(c) for c in row] for row in rows], dtype=np.int8)
+    except ValueError:
+        raise ValueError("Map description may only contain S, F, H and G")
+    if (grid == START).sum() != 1 or (grid == GOAL).sum() != 1:
+        raise ValueError("Map description needs exactly one S and one G")
+    return grid
+
+def map_to_desc(grid: np.ndarray) -> List[str]:
+    chars = np.array(list(_CELL_CHARS))[grid]
+    return ["".join(row) for row in chars]
+
+def next_state_table(size: int, moves: Sequence[Tuple[int, int]]) -> np.ndarray:
+    """(size*size, n_actions) next state index for each move, staying in place at the walls"""
+    rows, cols = np.divmod(np.arange(size * size), size)
+    table = np.empty((size * size, len(moves)), dtype=np.int32)
+    for action, (dr, dc) in enumerate(moves):
+        table[:, action] = np.clip(rows + dr, 0, size - 1) * size + np.clip(cols + dc, 0, size - 1)
+    return table
+
+def is_solvable(grid: np.ndarray, next_state: np.ndarray) -> bool:
+    """Breadth-first search from the start to the goal through non-hole cells"""
+    flat = grid.ravel()
+    start = int(np.flatnonzero(flat == START)[0])
+    goal = int(np.flatnonzero(flat == GOAL)[0])
+    blocked = (flat == HOLE).tolist()
+    neighbours = next_state.tolist()
+    seen = bytearray(len(blocked))
+    seen[start] = 1
+    queue = deque([start])
+    while queue:
+        state = queue.popleft()
+        if state == goal:
+            return True
+        for nxt in neighbours[state]:
+            if not seen[nxt] and not blocked[nxt]:
+                seen[nxt] = 1
+                queue.append(nxt)
+    return False
+
+def generate_map(size: int, hole_fraction: float, seed: Optional[int] = None) -> np.ndarray:
+    """
+    Random size x size map with roughly hole_fraction of the cells as holes.
+    A random right/down path from start to goal is kept free of holes first,
+    so every map is solvable without redrawing (seeded, so the same seed
+    always yields the same map).
+    """
+    rng = np.random.default_rng(seed)
+    grid = np.where(rng.random((size, size)) < hole_fraction, HOLE, FROZEN).astype(np.int8)
+    # 2 * (size - 1) moves, size - 1 of them down, in random order
+    down = rng.permutation(np.arange(2 * (size - 1)) < size - 1)
+    rows = np.concatenate(([0], np.cumsum(down)))
+    cols = np.concatenate(([0], np.cumsum(~down)))
+    grid[rows, cols] = FROZEN
+    grid[0, 0] = START
+    grid[size - 1, size - 1] = GOAL
+    return grid
+
+def grid_transition_arrays(
+    grid: np.ndarray,
+    next_state: np.ndarray,
+    outcomes: Sequence[Tuple[int, float]],
+    step_reward: float,
+    goal_reward: float,
+    hole_reward: float,
+    absorbing_terminals: bool,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Full model as (next_states, probs, rewards, dones), each (n_states, n_actions, K).
+    outcomes lists (action offset, probability) pairs, e.g. [(0, 1/3), (-1, 1/3), (1, 1/3)]
+    for slipping to either side; the reward and done flag depend on the cell entered.
+    With absorbing_terminals, holes and the goal loop on themselves with reward 0.
+    """
+    flat = grid.ravel()
+    n_states, n_actions = next_state.shape
+    actions = np.arange(n_actions)
+    next_states = np.stack([next_state[:, (actions + offset) % n_actions] for offset, _ in outcomes], axis=-1)
+    probs = np.broadcast_to(np.array([p for _, p in outcomes]), next_states.shape).copy()
+
+    cells = flat[next_states]
+    rewards = np.where(cells == GOAL, goal_reward, np.where(cells == HOLE, hole_reward, step_reward))
+    dones = (cells == GOAL) | (cells == HOLE)
+
+    if absorbing_terminals:
+        terminal = (flat == GOAL) | (flat == HOLE)
+        next_states[terminal] = np.flatnonzero(terminal)[:, None, None]
+        probs[terminal] = 0.0
+        probs[terminal, :, 0] = 1.0
+        rewards[terminal] = 0.0
+        dones[terminal] = True
+    return next_states, probs, rewards, dones
@@ -2,18 +2,22 @@ import gymnasium as gym
 import numpy as np
 from typing import Dict, Any, List, Tuple
 from app.environments.base import RLEnvironment
+from app.environments.discretization import AdaptiveDiscretizer
 from app.models.schemas import EnvironmentState
 
 class MountainCar(RLEnvironment):
     """MountainCar-v0 wrapper using Gymnasium with discretization"""
     
-    def __init__(self, n_bins: int = 20):
+    def __init__(self, n_bins: int = 20, adaptive: bool = False, max_cells: int = 4096):
         self.env = gym.make('MountainCar-v0')
         self.n_bins = n_bins
         
         # Discretization bins
         self.position_bins = np.linspace(-1.2, 0.6, n_bins)
         self.velocity_bins = np.linspace(-0.07, 0.07, n_bins)
+        # Adaptive mode: start coarse and split cells where the learner needs resolution
+        if adaptive:
+            self.discretizer = AdaptiveDiscretizer([-1.2, -0.07], [0.6, 0.07], max_cells=max_cells)
         
         self.current_state = None
         self.current_discrete_state = None
@@ -22,6 +26,8 @@ class MountainCar(RLEnvironment):
     
     def _discretize_state(self, state):
         """Convert continuous state to discrete"""
+        if self.discretizer is not None:
+            return self.discretizer.discretize(state)
         position, velocity = state
         pos_idx = np.digitize(position, self.position_bins)
         vel_idx = np.digitize(velocity, self.velocity_bins)
@@ -31,6 +37,8 @@ class MountainCar(RLEnvironment):
         return discrete
     
     def reset(self) -> EnvironmentState:
+        if self.discretizer is not None:
+            self.discretizer.refine()  # between episodes; learners pick the splits up after reset
         obs, info = self.env.reset()
         self.current_state = obs
         self.current_discrete_state = self._discretize_state(obs)
@@ -59,9 +67,20 @@ class MountainCar(RLEnvironment):
         )
     
     def get_state_space(self) -> Dict[str, Any]:
+        if self.discretizer is not None:
+            return {
+                "type": "discrete",
+                "n": self.discretizer.n_states,
+                "adaptive": True,
+                "description": "Adaptively refined cells over (Position, Velocity)",
+                "continuous_low": [-1.2, -0.07],
+                "continuous_high": [0.6, 0.07]
+            }
         return {
             "type": "discrete",
             "n": (self.n_bins + 1) ** 2,
+            "shape": (self.n_bins + 1, self.n_bins + 1),
+            "dimensions": ["position", "velocity"],
             "description": "Discretized (Position, Velocity)",
             "continuous_low": [-1.2, -0.07],
             "continuous_high": [0.6, 0.07]
@@ -87,5 +106,12 @@ class MountainCar(RLEnvironment):
     def is_model_based(self) -> bool:
         return False  # Physics simulation
     
+    def estimate_memory(self) -> int:
+        # Gymnasium env plus classic-control renderer state
+        size = 2 * 1024 * 1024
+        if self.discretizer is not None:
+            size += self.discretizer.estimate_memory()
+        return size
+    
     def close(self):
         self.env.close()
@@ -1,8 +1,19 @@
+import time
+_import_started = time.perf_counter()
+
+import asyncio
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.api.routes import environments, algorithms, training
+from app.api.routes import environments, algorithms, training, metrics, admin, pbt, planning
 from app.api import websocket
+from app.services.training import training_service
+from app.services.pbt import pbt_service
+from app.services.metrics import monitor_event_loop
+
+logging.basicConfig(level=settings.LOG_LEVEL)
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="RL Interactive Learning Tool API")
 
@@ -19,7 +30,38 @@ app.add_middleware(
 app.include_router(environments.router, prefix="/api/v1/environments", tags=["environments"])
 app.include_router(algorithms.router, prefix="/api/v1/algorithms", tags=["algorithms"])
 app.include_router(training.router, prefix="/api/v1/training", tags=["training"])
+app.include_router(pbt.router, prefix="/api/v1/pbt", tags=["pbt"])
+app.include_router(planning.router, prefix="/api/v1/planning", tags=["planning"])
 app.include_router(websocket.router, tags=["websocket"])
+app.include_router(metrics.router, tags=["metrics"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["admin"])
+
+def _warm_jit_kernels():
+    from app.algorithms import kernels  # Numba is imported here, not at cold start
+    kernels.warm_up()
+
+@app.on_event("startup")
+async def startup():
+    training_service.start_reaper()
+    app.state.loop_monitor_task = asyncio.create_task(monitor_event_loop())
+    # Prewarm environments in a worker thread so startup is not blocked on gym.make()
+    app.state.prewarm_task = asyncio.create_task(training_service.env_pool.prewarm_async())
+    if settings.JIT_WARMUP:
+        # Otherwise the first use_jit session compiles them (in its worker thread)
+        app.state.jit_warmup_task = asyncio.create_task(asyncio.to_thread(_warm_jit_kernels))
+    
+    app.state.cold_start_ms = (time.perf_counter() - _import_started) * 1000
+    if app.state.cold_start_ms > settings.COLD_START_BUDGET_MS:
+        logger.warning("Cold start took %.0f ms (budget %d ms)", app.state.cold_start_ms, settings.COLD_START_BUDGET_MS)
+    else:
+        logger.info("Cold start took %.0f ms", app.state.cold_start_ms)
+
+@app.on_event("shutdown")
+async def shutdown():
+    await training_service.stop_reaper()
+    await pbt_service.close()
+    app.state.loop_monitor_task.cancel()
+    training_service.env_pool.close()
 
 @app.get("/")
 async def root():
@@ -16,3 +16,22 @@ class AlgorithmType(str, Enum):
     MONTE_CARLO = "monte_carlo"
     TD_LEARNING = "td_learning"
     N_STEP_TD = "n_step_td"
+
+class CurveDownsampling(str, Enum):
+    LTTB = "lttb"  # Largest-Triangle-Three-Buckets: keeps the visual shape
+    MINMAX = "minmax"  # min and max per bucket: keeps every spike
+    NONE = "none"  # every episode
+
+class ParallelMode(str, Enum):
+    NONE = "none"
+    VECTORIZED = "vectorized"  # K environment copies in worker processes, one batched learner
+    HOGWILD = "hogwild"  # K worker processes updating one shared Q-table without locks
+    ACTOR_LEARNER = "actor_learner"  # K actor processes feeding transitions to one learner
+
+class QTableBackend(str, Enum):
+    DENSE = "dense"  # one (states, actions) array
+    HASHED = "hashed"  # rows allocated on first visit (large discretizations)
+
+class QTableDtype(str, Enum):
+    FLOAT64 = "float64"
+    FLOAT32 = "float32"  # half the memory; plenty for tabular values
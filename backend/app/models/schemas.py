@@ -1,8 +1,24 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import List, Dict, Union, Optional, Any
-from .enums import EnvironmentType, AlgorithmType
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import List, Dict, Union, Optional, Any, Literal, Tuple
+from .enums import EnvironmentType, AlgorithmType, CurveDownsampling, ParallelMode, QTableBackend, QTableDtype
 
 # --- Training Configuration ---
+class ConvergenceConfig(BaseModel):
+    # Early stopping for model-free learners: training ends when any enabled criterion holds
+    check_every: int = Field(default=10, ge=1, le=10000)  # episodes between policy/Q checks
+    min_episodes: int = Field(default=0, ge=0)  # never stop before this many episodes
+    policy_stable_episodes: Optional[int] = Field(default=None, ge=1)  # greedy policy unchanged this long
+    return_window: Optional[int] = Field(default=None, ge=1, le=100000)  # plateau: mean return of last window vs the one before
+    return_tolerance: float = Field(default=0.01, ge=0.0)  # relative plateau tolerance (absolute while |mean| < 1)
+    q_change_threshold: Optional[float] = Field(default=None, gt=0.0)  # max |Q change| between checks
+    patience: int = Field(default=3, ge=1)  # consecutive checks below q_change_threshold
+
+    @model_validator(mode="after")
+    def require_criterion(self):
+        if self.policy_stable_episodes is None and self.return_window is None and self.q_change_threshold is None:
+            raise ValueError("Enable at least one of policy_stable_episodes, return_window, q_change_threshold")
+        return self
+
 class TrainingConfig(BaseModel):
     environment: EnvironmentType
     algorithm: AlgorithmType
@@ -13,6 +29,25 @@ class TrainingConfig(BaseModel):
     max_steps: int = Field(default=500, gt=0)
     n_step: int = Field(default=1, gt=0)  # for n-step TD
     step_delay_ms: int = Field(default=200, ge=1, le=1000)  # visualization speed
+    stream_batch_ms: int = Field(default=0, ge=0, le=1000)  # send updates of this window as one frame (0 = per update)
+    collect_timings: bool = False  # per-phase timing breakdown in the status endpoint
+    frame_skip: Optional[int] = Field(default=None, ge=1, le=16)  # Breakout action repeat (None = env default)
+    map_size: Optional[int] = Field(default=None, ge=2, le=512)  # GridWorld/FrozenLake grid size
+    hole_fraction: Optional[float] = Field(default=None, ge=0.0, le=0.8)  # random map instead of the preset
+    map_seed: Optional[int] = None
+    n_bins: Optional[int] = Field(default=None, ge=2, le=100)  # bins per dimension (CartPole, MountainCar, Breakout, dam)
+    use_jit: bool = False  # compiled whole-episode kernels (Numba, grid environments); per-episode updates
+    adaptive_discretization: bool = False  # CartPole/MountainCar: refine state cells while training
+    parallel_mode: ParallelMode = ParallelMode.NONE
+    n_workers: int = Field(default=4, ge=1, le=64)  # environment copies / worker processes when parallel
+    policy_sync_interval: int = Field(default=10, ge=1, le=10000)  # actor/learner: episodes between policy pulls
+    q_table_backend: QTableBackend = QTableBackend.DENSE  # model-free tables; hashed for large n_bins
+    q_table_dtype: QTableDtype = QTableDtype.FLOAT64
+    convergence: Optional[ConvergenceConfig] = None  # stop early once converged (model-free algorithms)
+    # PI/VI on environments without a known model: solve a model estimated from collected episodes
+    model_episodes: int = Field(default=500, ge=1, le=1000000)  # episodes collected per round
+    model_rounds: int = Field(default=3, ge=1, le=100)  # collect/solve rounds (later ones explore around the policy)
+    model_workers: int = Field(default=1, ge=1, le=64)  # collection processes
 
 # --- Data Transfer Objects ---
 class EnvironmentState(BaseModel):
@@ -30,10 +65,24 @@ class TrainingUpdate(BaseModel):
     action: int
     value_function: Optional[Dict[str, float]] = None
     policy: Optional[Dict[str, Any]] = None
+    projection: Optional[Dict[str, Any]] = None  # set when value_function/policy are projected
+
+class EpisodeStats(BaseModel):
+    count: int
+    mean_reward: float
+    std_reward: float
+    min_reward: float
+    max_reward: float
+    recent_mean_reward: float  # last 100 episodes
+    mean_length: float
 
 class TrainingMetrics(BaseModel):
     episode_rewards: List[float]
     episode_lengths: List[int]
+    episodes: List[int] = []  # episode number (1-based) of each point of the downsampled curves
+    total_episodes: int = 0
+    method: CurveDownsampling = CurveDownsampling.NONE
+    stats: Optional[EpisodeStats] = None
 
 class InferenceConfig(BaseModel):
     environment: EnvironmentType
@@ -48,6 +97,7 @@ class SpaceInfo(BaseModel):
     low: Optional[List[float]] = None
     high: Optional[List[float]] = None
     n: Optional[int] = None  # for discrete spaces
+    dimensions: Optional[List[str]] = None  # names of the shape's axes (projection dimensions)
 
 class Environment(BaseModel):
     id: str
@@ -67,6 +117,12 @@ class Algorithm(BaseModel):
     parameters: Dict[str, Any]
 
 # --- Training Status ---
+class PhaseTiming(BaseModel):
+    total_ms: float
+    count: int
+    mean_us: float
+    share: float  # fraction of all timed work
+
 class TrainingStatus(BaseModel):
     session_id: str
     is_running: bool
@@ -74,6 +130,194 @@ class TrainingStatus(BaseModel):
     total_episodes: int
     elapsed_time: float
     config: TrainingConfig
+    phase_timings: Optional[Dict[str, PhaseTiming]] = None  # when config.collect_timings
+    forked_from: Optional[str] = None  # parent session of a fork
+    convergence_reason: Optional[str] = None  # criterion that stopped training early
+
+class SessionForkRequest(BaseModel):
+    # TrainingConfig fields to change for the branch (e.g. epsilon, learning_rate, n_episodes)
+    overrides: Dict[str, Any] = Field(default_factory=dict)
+    start: bool = True  # start training the branch right away
+
+# --- Profiling ---
+class ProfileRequest(BaseModel):
+    duration_seconds: float = Field(default=10.0, gt=0.0, le=300.0)
+    mode: Literal["sampling", "deterministic"] = "sampling"  # collapsed stacks vs pstats
+    trace_memory: bool = False  # also diff tracemalloc snapshots over the window (process-wide, all sessions)
+    sample_interval_ms: float = Field(default=5.0, ge=1.0, le=1000.0)
+
+class ProfileJobInfo(BaseModel):
+    profile_id: str
+    session_id: str
+    mode: str
+    status: str  # "running", "completed", "failed"
+    duration_seconds: float
+    started_at: float
+    finished_at: Optional[float] = None
+    available_formats: List[str]
+    n_samples: int
+
+# --- Population-Based Training ---
+class PBTConfig(BaseModel):
+    base: TrainingConfig  # environment, algorithm and fixed hyperparameters shared by every member
+    population_size: int = Field(default=8, ge=2, le=32)  # one worker process per member
+    generations: int = Field(default=20, ge=1, le=10000)
+    episodes_per_generation: int = Field(default=50, ge=1, le=100000)  # training between exploit/explore steps
+    exploit_fraction: float = Field(default=0.25, gt=0.0, le=0.5)  # bottom share copies from the top share
+    perturb_factors: Tuple[float, float] = (0.8, 1.2)  # explore: learning_rate/epsilon times one of these
+    learning_rate_range: Tuple[float, float] = (0.01, 0.5)  # initial samples and perturbation bounds
+    epsilon_range: Tuple[float, float] = (0.01, 0.3)
+    seed: Optional[int] = None
+
+    @field_validator("perturb_factors")
+    @classmethod
+    def check_factors(cls, value: Tuple[float, float]) -> Tuple[float, float]:
+        if not 0.0 < value[0] <= value[1]:
+            raise ValueError("expected 0 < low <= high")
+        return value
+
+    @field_validator("learning_rate_range", "epsilon_range")
+    @classmethod
+    def check_range(cls, value: Tuple[float, float]) -> Tuple[float, float]:
+        if not 0.0 <= value[0] <= value[1] <= 1.0:
+            raise ValueError("expected 0 <= low <= high <= 1")
+        return value
+
+class PBTMember(BaseModel):
+    member: int
+    generation: int  # generations finished
+    episodes: int
+    score: float  # mean episode reward over the member's last generation
+    learning_rate: float
+    epsilon: float
+    copied_from: Optional[int] = None  # member whose Q-table it took at the last exploit step
+
+class PBTEvent(BaseModel):
+    generation: int
+    member: int
+    source: int
+    learning_rate: float
+    epsilon: float
+
+class PBTStatus(BaseModel):
+    run_id: str
+    status: str  # "running", "completed", "stopped", "failed"
+    generation: int  # last generation released by the coordinator
+    generations: int
+    elapsed_time: float
+    members: List[PBTMember]
+    best: Optional[PBTMember] = None
+    events: List[PBTEvent] = []  # most recent exploit/explore steps
+
+# --- Planning ---
+class BatchSolveRequest(BaseModel):
+    # Variants are every combination of map_seeds x is_slippery x discount_factors
+    environment: EnvironmentType  # gridworld or frozenlake
+    map_size: Optional[int] = Field(default=None, ge=2, le=512)
+    hole_fraction: Optional[float] = Field(default=None, ge=0.0, le=0.8)  # random maps instead of the preset
+    map_seeds: List[Optional[int]] = Field(default=[None], min_length=1)  # one random map per seed
+    is_slippery: List[bool] = Field(default=[True], min_length=1)  # FrozenLake slip settings
+    discount_factors: List[float] = Field(default=[0.99], min_length=1)
+    theta: float = Field(default=1e-6, gt=0.0)  # per-variant convergence threshold (max |V change|)
+    max_sweeps: int = Field(default=1000, ge=1, le=100000)
+
+    @field_validator("discount_factors")
+    @classmethod
+    def check_discount_factors(cls, value: List[float]) -> List[float]:
+        if any(gamma < 0 or gamma > 1 for gamma in value):
+            raise ValueError("discount factors must be in [0, 1]")
+        return value
+
+class PlanningSolution(BaseModel):
+    discount_factor: float
+    is_slippery: Optional[bool] = None  # FrozenLake only
+    map_seed: Optional[int] = None
+    sweeps: int
+    converged: bool
+    max_change: float  # max |V change| of the last sweep
+    value_function: List[float]  # per state
+    policy: List[int]
+
+class BatchSolveResult(BaseModel):
+    environment: EnvironmentType
+    n_states: int
+    n_actions: int
+    solutions: List[PlanningSolution]
+    elapsed_ms: float
+
+class PreviousSolution(BaseModel):
+    # A solution returned by /planning/resolve (or /planning/batch) to start from
+    value_function: List[float]
+    discount_factor: float = Field(ge=0.0, le=1.0)
+    desc: Optional[List[str]] = None  # map it was solved on (None: the request's map)
+    is_slippery: Optional[bool] = None  # None: the request's setting
+
+class ResolveRequest(BaseModel):
+    environment: EnvironmentType  # gridworld or frozenlake
+    algorithm: AlgorithmType = AlgorithmType.VALUE_ITERATION  # or policy_iteration
+    desc: Optional[List[str]] = None  # edited map as rows of S/F/H/G (overrides the map fields below)
+    map_size: Optional[int] = Field(default=None, ge=2, le=512)
+    hole_fraction: Optional[float] = Field(default=None, ge=0.0, le=0.8)
+    map_seed: Optional[int] = None
+    is_slippery: bool = True  # FrozenLake
+    discount_factor: float = Field(default=0.99, ge=0.0, le=1.0)
+    theta: float = Field(default=1e-6, gt=0.0)
+    max_sweeps: int = Field(default=10000, ge=1, le=1000000)
+    previous: Optional[PreviousSolution] = None  # warm start; None solves from V = 0
+
+class ResolveResult(BaseModel):
+    environment: EnvironmentType
+    algorithm: AlgorithmType
+    n_states: int
+    n_actions: int
+    desc: List[str]  # solved map, to send back as previous.desc after the next edit
+    discount_factor: float
+    value_function: List[float]
+    policy: List[int]
+    warm_started: bool
+    converged: bool  # False when max_sweeps ran out first
+    changed_states: int  # states whose transitions differ from the previous model
+    sweeps: int
+    backups: int  # single-state Bellman backups performed
+    full_sweep_equivalent: float  # backups / n_states
+    initial_residual: float  # max |T V - V| of the starting values under the new model
+    residual: float  # max |T V - V| at the end
+    value_error_bound: Optional[float] = None  # max |V - V*| <= residual / (1 - gamma)
+    policy_loss_bound: Optional[float] = None  # greedy policy within 2 gamma residual / (1 - gamma) of optimal
+    elapsed_ms: float
+
+# --- Dam Scenarios ---
+class DamScenarioRequest(BaseModel):
+    # Policy source: a training session's greedy policy, an action per discrete state, or one fixed action
+    session_id: Optional[str] = None
+    policy: Optional[List[int]] = None
+    action: Optional[int] = Field(default=None, ge=0, le=2)
+    n_bins: int = Field(default=20, ge=2, le=100)
+    n_scenarios: int = Field(default=1000, ge=1, le=100000)
+    horizon: int = Field(default=200, ge=1, le=1000)
+    percentiles: List[float] = Field(default=[5, 25, 50, 75, 95])
+    seed: Optional[int] = None
+
+    @field_validator("percentiles")
+    @classmethod
+    def check_percentiles(cls, value: List[float]) -> List[float]:
+        if not value or any(p < 0 or p > 100 for p in value):
+            raise ValueError("percentiles must be a non-empty list of values in [0, 100]")
+        return value
+
+class DamScenarioReport(BaseModel):
+    n_scenarios: int
+    horizon: int
+    flood_probability: float  # flooded at any point within the horizon
+    empty_probability: float
+    flood_probability_over_time: List[float]  # cumulative, per step
+    empty_probability_over_time: List[float]
+    level_percentiles: Dict[str, List[float]]  # "p50" -> level per step
+    power_mean: float
+    power_std: float
+    power_percentiles: Dict[str, float]
+    return_mean: float
+    elapsed_ms: float
 
 # --- Inference Result ---
 class InferenceResult(BaseModel):
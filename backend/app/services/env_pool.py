@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from app.environments import create_environment
+from app.environments.base import RLEnvironment
+from app.models.enums import EnvironmentType
+
+logger = logging.getLogger(__name__)
+
+class EnvironmentPool:
+    """
+    Keeps prewarmed environment instances per EnvironmentType so that session
+    creation does not pay for gym.make() / ALE ROM loading in the request handler.
+    Instances are reset and returned to the pool when a session releases them.
+    """
+    
+    def __init__(self, sizes: Dict[EnvironmentType, int]):
+        self.sizes = sizes
+        self._idle: Dict[EnvironmentType, Deque[RLEnvironment]] = {env_type: deque() for env_type in sizes}
+        self._pending: Dict[EnvironmentType, int] = {env_type: 0 for env_type in sizes}
+        self._lock = threading.Lock()
+    
+    def _fill(self, env_type: EnvironmentType):
+        target = self.sizes.get(env_type, 0)
+        while True:
+            with self._lock:
+                if len(self._idle[env_type]) + self._pending[env_type] >= target:
+                    return
+                self._pending[env_type] += 1
+            try:
+                env = create_environment(env_type)
+                env.reset()
+            except Exception as e:
+                logger.warning("Could not prewarm %s environment: %s", env_type.value, e)
+                return
+            finally:
+                with self._lock:
+                    self._pending[env_type] -= 1
+            with self._lock:
+                self._idle[env_type].append(env)
+    
+    def prewarm(self):
+        """Create instances until every pooled type reaches its configured size"""
+        for env_type in self.sizes:
+            self._fill(env_type)
+    
+    async def prewarm_async(self):
+        await asyncio.to_thread(self.prewarm)
+    
+    def acquire(self, env_type: EnvironmentType, options: Optional[Dict[str, Any]] = None) -> RLEnvironment:
+        """Hand out a prewarmed instance, creating one on the spot if the pool is empty.
+        Pooled instances use registry defaults, so non-default options bypass the pool."""
+        if options:
+            return create_environment(env_type, **options)
+        env = None
+        with self._lock:
+            idle = self._idle.get(env_type)
+            if idle:
+                env = idle.popleft()
+        if env is None:
+            return create_environment(env_type)
+        
+        # Top the pool back up off the request path
+        if env_type in self.sizes:
+            threading.Thread(target=self._fill, args=(env_type,), daemon=True).start()
+        return env
+    
+    def release(self, env_type: EnvironmentType, env: RLEnvironment, options: Optional[Dict[str, Any]] = None):
+        """Return an instance to the pool (closed instead when the pool is full)"""
+        if options:
+            env.close()
+            return
+        with self._lock:
+            idle = self._idle.get(env_type)
+            keep = idle is not None and len(idle) < self.sizes[env_type]
+        if keep:
+            try:
+                env.reset()
+            except Exception:
+                keep = False
+        if not keep:
+            env.close()
+            return
+        with self._lock:
+            self._idle[env_type].append(env)
+    
+    def available(self, env_type: EnvironmentType) -> int:
+        with self._lock:
+            return len(self._idle.get(env_type, ()))
+    
+    def close(self):
+        with self._lock:
+            envs = [env for idle in self._idle.values() for env in idle]
+            for idle in self._idle.values():
+                idle.clear()
+        for env in envs:
+            env.close()
@@ -0,0 +1,131 @@
+import numpy as np
+from typing import Dict, Tuple
+
+INITIAL_CAPACITY = 1024
+RECENT_WINDOW = 100  # episodes in the "recent" mean
+
+class EpisodeLog:
+    """
+    Per-session episode history: reward (float32) and length (int32) per episode in
+    preallocated arrays that double when full, plus running statistics
+    (Welford mean/variance, min, max) so status queries never scan the arrays.
+    """
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.lengths = np.zeros(capacity, dtype=np.int32)
+        self.count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min = np.inf
+        self._max = -np.inf
+        self._length_sum = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _grow(self, needed: int):
+        capacity = len(self.rewards)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("rewards", "lengths"):
+            old = getattr(self, name)
+            grown = np.zeros(capacity, dtype=old.dtype)
+            grown[:self.count] = old[:self.count]
+            setattr(self, name, grown)
+
+    def append(self, reward: float, length: int):
+        # Statistics use the stored (float32) value so they survive a save/load unchanged
+        reward = float(np.float32(reward))
+        self._grow(self.count + 1)
+        self.rewards[self.count] = reward
+        self.lengths[self.count] = length
+        self.count += 1
+        delta = reward - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (reward - self._mean)
+        self._min = min(self._min, reward)
+        self._max = max(self._max, reward)
+        self._length_sum += int(length)
+
+    def stats(self) -> Dict[str, float]:
+        if self.count == 0:
+            return {"count": 0, "mean_reward": 0.0, "std_reward": 0.0, "min_reward": 0.0,
+                    "max_reward": 0.0, "recent_mean_reward": 0.0, "mean_length": 0.0}
+        recent = self.rewards[max(0, self.count - RECENT_WINDOW):self.count]
+        return {
+            "count": self.count,
+            "mean_reward": float(self._mean),
+            "std_reward": float(np.sqrt(self._m2 / self.count)),
+            "min_reward": float(self._min),
+            "max_reward": float(self._max),
+            "recent_mean_reward": float(recent.mean()),
+            "mean_length": self._length_sum / self.count,
+        }
+
+    def curve(self, points: int, method: str = "lttb") -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(episode indices, rewards, lengths) downsampled to about `points` entries"""
+        rewards = self.rewards[:self.count]
+        if method == "lttb":
+            indices = lttb_indices(rewards, points)
+        elif method == "minmax":
+            indices = minmax_indices(rewards, points)
+        else:
+            indices = np.arange(self.count)
+        return indices, rewards[indices], self.lengths[:self.count][indices]
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Episode arrays for hibernation (statistics are rebuilt on load)"""
+        return {"rewards": self.rewards[:self.count], "lengths": self.lengths[:self.count]}
+
+    def load_state(self, state: Dict[str, np.ndarray]):
+        self.__init__(max(INITIAL_CAPACITY, len(state["rewards"])))
+        for reward, length in zip(state["rewards"].tolist(), state["lengths"].tolist()):
+            self.append(reward, length)
+
+    def estimate_memory(self) -> int:
+        return self.rewards.nbytes + self.lengths.nbytes
+
+def lttb_indices(y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: keeps the first and last point and, in each of
+    points - 2 buckets, the point forming the largest triangle with the previous
+    kept point and the mean of the next bucket. Preserves the visual shape.
+    """
+    n = len(y)
+    if points >= n:
+        return np.arange(n)
+    if points < 3:
+        return np.linspace(0, n - 1, max(points, 1)).astype(np.int64)
+    y = y.astype(np.float64)
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)  # buckets over the interior points
+    indices = np.empty(points, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    previous = 0
+    for b in range(points - 2):
+        start, end = edges[b], edges[b + 1]
+        next_start, next_end = end, edges[b + 2] if b + 2 < len(edges) else n
+        next_x = (next_start + next_end - 1) / 2.0
+        next_y = y[next_start:next_end].mean()
+        xs = np.arange(start, end)
+        # Twice the triangle area (previous kept point, candidate, next bucket mean)
+        area = np.abs((previous - next_x) * (y[start:end] - y[previous]) - (previous - xs) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        indices[b + 1] = previous
+    return indices
+
+def minmax_indices(y: np.ndarray, points: int) -> np.ndarray:
+    """Minimum and maximum of each of points // 2 equal buckets (keeps every spike)"""
+    n = len(y)
+    if points >= n:
+        return np.arange(n)
+    n_buckets = max(1, points // 2)
+    bucket = np.arange(n) * n_buckets // n
+    # Sorted by (bucket, value): a bucket's first entry is its minimum, its last its maximum
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket[order], np.arange(n_buckets))
+    ends = np.append(starts[1:], n) - 1
+    return np.unique(np.concatenate([order[starts], order[ends]]))
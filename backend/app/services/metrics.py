@@ -0,0 +1,229 @@
+import asyncio
+import bisect
+import os
+import resource
+import sys
+import threading
+import time
+from typing import Dict, List, Sequence, Tuple
+
+class _Metric:
+    """Base for pre-aggregated metrics; values are keyed by label-value tuples"""
+    
+    type_name = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+    
+    def _new_child(self):
+        raise NotImplementedError
+    
+    def labels(self, *values: str):
+        """Return the child for these label values (cache it in hot paths)"""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+    
+    def remove(self, *values: str):
+        with self._lock:
+            self._children.pop(tuple(str(v) for v in values), None)
+    
+    def _format_labels(self, key: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{value}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+    
+    def _samples(self, key: Tuple[str, ...], child) -> List[str]:
+        return [f"{self.name}{self._format_labels(key)} {child.value}"]
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            children = list(self._children.items())
+        for key, child in children:
+            lines.extend(self._samples(key, child))
+        return lines
+
+class _Value:
+    __slots__ = ("value",)
+    
+    def __init__(self):
+        self.value = 0.0
+    
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+    
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+    
+    def set(self, value: float):
+        self.value = value
+
+class Counter(_Metric):
+    type_name = "counter"
+    
+    def _new_child(self):
+        return _Value()
+    
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+class Gauge(_Metric):
+    type_name = "gauge"
+    
+    def _new_child(self):
+        return _Value()
+    
+    def set(self, value: float):
+        self.labels().set(value)
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count")
+    
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Histogram(_Metric):
+    type_name = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+    
+    def observe(self, value: float):
+        self.labels().observe(value)
+    
+    def _samples(self, key: Tuple[str, ...], child) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            labels = self._format_labels(key, 'le="%s"' % le)
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        lines.append(f"{self.name}_sum{self._format_labels(key)} {child.sum}")
+        lines.append(f"{self.name}_count{self._format_labels(key)} {child.count}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+    
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+    
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        process_memory.set(get_process_memory())
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+def get_process_memory() -> int:
+    """Resident set size in bytes (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+registry = MetricsRegistry()
+
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Per-session series (removed when the session is deleted)
+env_steps = registry.register(Counter("rl_session_env_steps_total", "Environment steps taken by the session", ["session_id"]))
+env_steps_rate = registry.register(Gauge("rl_session_env_steps_per_second", "Recent environment steps per second", ["session_id"]))
+updates_streamed = registry.register(Counter("rl_session_updates_streamed_total", "Training updates sent over the WebSocket", ["session_id"]))
+bytes_sent = registry.register(Counter("rl_session_websocket_bytes_sent_total", "Bytes sent over the session WebSocket", ["session_id"]))
+queue_depth = registry.register(Gauge("rl_session_stream_queue_depth", "Updates produced but not yet sent", ["session_id"]))
+dropped_frames = registry.register(Counter("rl_session_dropped_frames_total", "Updates not delivered (no subscriber or send failure)", ["session_id"]))
+
+# Aggregates (survive session deletion)
+env_steps_all = registry.register(Counter("rl_env_steps_total", "Environment steps across all sessions"))
+updates_streamed_all = registry.register(Counter("rl_updates_streamed_total", "Training updates sent across all sessions"))
+bytes_sent_all = registry.register(Counter("rl_websocket_bytes_sent_total", "WebSocket bytes sent across all sessions"))
+dropped_frames_all = registry.register(Counter("rl_dropped_frames_total", "Updates not delivered across all sessions"))
+frame_bytes = registry.register(Histogram("rl_websocket_frame_bytes", "Size of WebSocket frames", buckets=SIZE_BUCKETS))
+send_seconds = registry.register(Histogram("rl_websocket_send_seconds", "Time spent in WebSocket send", buckets=LATENCY_BUCKETS))
+sessions_by_state = registry.register(Gauge("rl_sessions", "Training sessions by state", ["state"]))
+event_loop_lag = registry.register(Histogram("rl_event_loop_lag_seconds", "Event loop scheduling delay", buckets=LATENCY_BUCKETS))
+process_memory = registry.register(Gauge("rl_process_resident_memory_bytes", "Resident memory of the API process"))
+
+class SessionMetrics:
+    """Cached metric children for one session so the training loop only does attribute increments"""
+    
+    RATE_WINDOW = 1.0  # seconds between steps/sec gauge updates
+    
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.env_steps = env_steps.labels(session_id)
+        self.env_steps_rate = env_steps_rate.labels(session_id)
+        self.updates_streamed = updates_streamed.labels(session_id)
+        self.bytes_sent = bytes_sent.labels(session_id)
+        self.queue_depth = queue_depth.labels(session_id)
+        self.dropped_frames = dropped_frames.labels(session_id)
+        self._window_start = time.monotonic()
+        self._window_steps = 0
+    
+    def record_step(self, n_steps: int = 1):
+        self.env_steps.inc(n_steps)
+        env_steps_all.inc(n_steps)
+        self._window_steps += n_steps
+        now = time.monotonic()
+        if now - self._window_start >= self.RATE_WINDOW:
+            self.env_steps_rate.set(self._window_steps / (now - self._window_start))
+            self._window_start = now
+            self._window_steps = 0
+    
+    def record_sent(self, n_bytes: int, seconds: float, n_updates: int = 1):
+        self.updates_streamed.inc(n_updates)
+        updates_streamed_all.inc(n_updates)
+        self.bytes_sent.inc(n_bytes)
+        bytes_sent_all.inc(n_bytes)
+        frame_bytes.observe(n_bytes)
+        send_seconds.observe(seconds)
+    
+    def record_dropped(self, n_updates: int = 1):
+        self.dropped_frames.inc(n_updates)
+        dropped_frames_all.inc(n_updates)
+    
+    def reset_rate(self):
+        self.env_steps_rate.set(0)
+        self._window_start = time.monotonic()
+        self._window_steps = 0
+    
+    def remove(self):
+        for metric in (env_steps, env_steps_rate, updates_streamed, bytes_sent, queue_depth, dropped_frames):
+            metric.remove(self.session_id)
+
+async def monitor_event_loop(interval: float = 0.5):
+    """Measure how late the event loop wakes up from a fixed sleep"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        event_loop_lag.observe(max(0.0, loop.time() - start - interval))
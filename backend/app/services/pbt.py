@@ -0,0 +1,306 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+import uuid
+import numpy as np
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional
+from fastapi import WebSocket
+from app.algorithms import create_algorithm
+from app.algorithms.shared import SharedArray
+from app.environments import create_environment, environment_options
+from app.models.enums import AlgorithmType, ParallelMode, QTableBackend
+from app.models.schemas import PBTConfig, PBTEvent, PBTMember, PBTStatus, TrainingConfig
+from app.services.learning_curves import EpisodeLog
+
+logger = logging.getLogger(__name__)
+
+# Status row per member: generations finished, episodes, score, current hyperparameters,
+# member copied at the last exploit step (-1 for none). Members write the first three,
+# the coordinator the rest.
+GENERATION, EPISODES, SCORE, LEARNING_RATE, EPSILON, SOURCE = range(6)
+STATUS_COLUMNS = 6
+POLL_SECONDS = 0.05  # coordinator and member wait interval
+DASHBOARD_INTERVAL = 0.5  # seconds between dashboard frames
+MAX_EVENTS = 50  # exploit/explore steps kept for the dashboard
+MODEL_FREE_ALGORITHMS = (
+    AlgorithmType.Q_LEARNING, AlgorithmType.SARSA, AlgorithmType.MONTE_CARLO,
+    AlgorithmType.TD_LEARNING, AlgorithmType.N_STEP_TD,
+)
+
+def _join_members(processes: List[multiprocessing.Process]):
+    """Give each member up to 5 s to exit after the stop event, then terminate it"""
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+
+def _member_worker(member: int, tables_spec, status_spec, release_spec, stop, config_data: Dict[str, Any],
+                   env_options: Dict[str, Any], generations: int, seed: int):
+    """
+    Member process: trains one algorithm instance generation by generation with the
+    hyperparameters in its status row. After each generation it publishes its Q-table
+    and score and waits for the coordinator to release the next generation; if it was
+    exploited, its shared table slot now holds the copied table and it continues from it.
+    """
+    np.random.seed(seed)
+    base = TrainingConfig.model_validate(config_data)
+    env = create_environment(base.environment, **env_options)
+    algorithm = create_algorithm(base.algorithm)
+    algorithm.episode_log = EpisodeLog()
+    tables_shared = SharedArray.attach(tables_spec)
+    status_shared = SharedArray.attach(status_spec)
+    release_shared = SharedArray.attach(release_spec)
+    table = tables_shared.array[member]
+    row = status_shared.array[member]
+    release = release_shared.array
+    try:
+        for generation in range(generations):
+            config = base.model_copy(update={"learning_rate": float(row[LEARNING_RATE]), "epsilon": float(row[EPSILON])})
+            start = len(algorithm.episode_log)
+            for _ in algorithm.train(env, config):
+                if stop.is_set():
+                    return
+            algorithm.warm_start = True
+            rewards = algorithm.episode_log.rewards[start:len(algorithm.episode_log)]
+            table[...] = algorithm.q_table
+            row[SCORE] = float(rewards.mean()) if len(rewards) else 0.0
+            row[EPISODES] = len(algorithm.episode_log)
+            # Published last: the coordinator reads the table and score once this moves
+            row[GENERATION] = generation + 1
+            if generation + 1 == generations:
+                break
+            while release[0] <= generation:
+                if stop.is_set():
+                    return
+                time.sleep(POLL_SECONDS)
+            if row[SOURCE] >= 0:
+                np.copyto(algorithm.q_table, table)
+    finally:
+        env.close()
+        tables_shared.close()
+        status_shared.close()
+        release_shared.close()
+
+class PopulationRun:
+    """
+    One PBT run: population_size member processes for the same environment and a
+    coordinator task. Q-tables live in one shared (members, states, actions) array,
+    so an exploit step is a row copy between slots in the coordinator process.
+    Generations are synchronous: the coordinator ranks the members once all of them
+    have finished a generation, then releases the next one.
+    """
+
+    def __init__(self, config: PBTConfig, n_states: int, n_actions: int):
+        self.id = str(uuid.uuid4())
+        self.config = config
+        self.rng = np.random.default_rng(config.seed)
+        size = config.population_size
+        self.tables = SharedArray((size, n_states, n_actions))
+        self.status = SharedArray((size, STATUS_COLUMNS))
+        self.release = SharedArray((1,), np.int64)
+        self.release.array[...] = 0
+        rows = self.status.array
+        rows[...] = 0.0
+        rows[:, LEARNING_RATE] = self.rng.uniform(*config.learning_rate_range, size)
+        rows[:, EPSILON] = self.rng.uniform(*config.epsilon_range, size)
+        rows[:, SOURCE] = -1
+        self.rows = rows  # replaced by a private copy once the shared memory is released
+        self.events: deque = deque(maxlen=MAX_EVENTS)
+        self.state = "running"
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        # spawn: forking the server process (event loop, threads) is not safe
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self.processes: List[multiprocessing.Process] = []
+
+    def start(self):
+        base = self.config.base.model_copy(update={"n_episodes": self.config.episodes_per_generation})
+        config_data = base.model_dump(mode="json")
+        options = environment_options(base)
+        seeds = self.rng.integers(2 ** 31, size=self.config.population_size)
+        for member in range(self.config.population_size):
+            process = self._context.Process(
+                target=_member_worker,
+                args=(member, self.tables.spec(), self.status.spec(), self.release.spec(), self._stop,
+                      config_data, options, self.config.generations, int(seeds[member])),
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+
+    @property
+    def generation(self) -> int:
+        return int(self.release.array[0]) if self.state == "running" else int(self.rows[:, GENERATION].min())
+
+    def exploit_and_explore(self):
+        """Truncation selection: the bottom members copy a random top member's table and perturb its hyperparameters"""
+        config = self.config
+        rows = self.rows
+        generation = int(self.release.array[0]) + 1
+        order = np.argsort(rows[:, SCORE])
+        n_exploit = max(1, int(len(order) * config.exploit_fraction))
+        bottom, top = order[:n_exploit], order[-n_exploit:]
+        rows[:, SOURCE] = -1
+        for member in bottom.tolist():
+            source = int(self.rng.choice(top))
+            self.tables.array[member] = self.tables.array[source]
+            rows[member, LEARNING_RATE] = np.clip(
+                rows[source, LEARNING_RATE] * self.rng.choice(config.perturb_factors), *config.learning_rate_range)
+            rows[member, EPSILON] = np.clip(
+                rows[source, EPSILON] * self.rng.choice(config.perturb_factors), *config.epsilon_range)
+            rows[member, SOURCE] = source
+            self.events.append(PBTEvent(
+                generation=generation, member=member, source=source,
+                learning_rate=float(rows[member, LEARNING_RATE]), epsilon=float(rows[member, EPSILON])
+            ))
+        # Published last: members read their rows and tables once this moves
+        self.release.array[0] = generation
+
+    async def coordinate(self):
+        try:
+            while self.state == "running":
+                await asyncio.sleep(POLL_SECONDS)
+                if self.state != "running":
+                    break  # stopped meanwhile
+                finished = self.rows[:, GENERATION]
+                if finished.min() >= self.config.generations:
+                    await self.finish("completed")
+                elif any(not process.is_alive() and finished[member] < self.config.generations
+                         for member, process in enumerate(self.processes)):
+                    await self.finish("failed")
+                elif finished.min() > self.release.array[0]:
+                    self.exploit_and_explore()
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            logger.exception("PBT coordinator failed for run %s", self.id)
+            await self.finish("failed")
+
+    async def finish(self, state: str):
+        """Stop the members, keep a copy of the status rows and free the shared memory"""
+        if self.state != "running":
+            return
+        self.state = state
+        self.finished_at = time.time()
+        self._stop.set()
+        processes, self.processes = self.processes, []
+        try:
+            # Joining blocks for up to 5 s per member; shielded so a cancelled caller still frees the memory below
+            await asyncio.shield(asyncio.to_thread(_join_members, processes))
+        finally:
+            self.rows = np.array(self.rows)
+            self.tables.close()
+            self.status.close()
+            self.release.close()
+
+    def _member(self, member: int) -> PBTMember:
+        row = self.rows[member]
+        return PBTMember(
+            member=member,
+            generation=int(row[GENERATION]),
+            episodes=int(row[EPISODES]),
+            score=float(row[SCORE]),
+            learning_rate=float(row[LEARNING_RATE]),
+            epsilon=float(row[EPSILON]),
+            copied_from=int(row[SOURCE]) if row[SOURCE] >= 0 else None
+        )
+
+    def get_status(self) -> PBTStatus:
+        members = [self._member(member) for member in range(self.config.population_size)]
+        reported = [member for member in members if member.generation > 0]
+        return PBTStatus(
+            run_id=self.id,
+            status=self.state,
+            generation=self.generation,
+            generations=self.config.generations,
+            elapsed_time=(self.finished_at or time.time()) - self.started_at,
+            members=members,
+            best=max(reported, key=lambda member: member.score) if reported else None,
+            events=list(self.events)
+        )
+
+class PBTService:
+    def __init__(self, max_runs: int = 4, max_finished: int = 20):
+        self.runs: "OrderedDict[str, PopulationRun]" = OrderedDict()
+        self.max_runs = max_runs
+        self.max_finished = max_finished
+
+    def start(self, config: PBTConfig) -> PopulationRun:
+        """Validate the config, allocate the shared tables and start the members and coordinator"""
+        base = config.base
+        if base.algorithm not in MODEL_FREE_ALGORITHMS:
+            raise ValueError(f"Population-based training is not available for {base.algorithm.value}")
+        if base.parallel_mode != ParallelMode.NONE:
+            raise ValueError("Population members are worker processes already (parallel_mode must be none)")
+        if base.adaptive_discretization:
+            raise ValueError("Population-based training needs a fixed state space (adaptive_discretization is off)")
+        if base.q_table_backend != QTableBackend.DENSE:
+            raise ValueError("Population members share dense Q-tables (q_table_backend must be dense)")
+        if sum(run.state == "running" for run in self.runs.values()) >= self.max_runs:
+            raise ValueError(f"At most {self.max_runs} PBT runs can be active")
+        # Table shape from a throwaway environment (members build their own)
+        env = create_environment(base.environment, **environment_options(base))
+        try:
+            n_states = env.get_state_space()['n']
+            n_actions = env.get_action_space()['n']
+        finally:
+            env.close()
+        run = PopulationRun(config, n_states, n_actions)
+        run.start()
+        run.task = asyncio.create_task(run.coordinate())
+        self.runs[run.id] = run
+        self._trim()
+        return run
+
+    def _trim(self):
+        finished = [run_id for run_id, run in self.runs.items() if run.state != "running"]
+        for run_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.runs[run_id]
+
+    def get_run(self, run_id: str) -> Optional[PopulationRun]:
+        return self.runs.get(run_id)
+
+    async def stop(self, run_id: str):
+        run = self.runs.get(run_id)
+        if run is None:
+            return
+        await run.finish("stopped")
+        if run.task:
+            run.task.cancel()
+            try:
+                await run.task
+            except asyncio.CancelledError:
+                pass
+            run.task = None
+
+    async def delete(self, run_id: str):
+        await self.stop(run_id)
+        self.runs.pop(run_id, None)
+
+    async def close(self):
+        for run_id in list(self.runs):
+            await self.stop(run_id)
+
+    async def stream(self, run_id: str, websocket: WebSocket):
+        """Dashboard: the population status every DASHBOARD_INTERVAL until the run ends"""
+        run = self.get_run(run_id)
+        if not run:
+            await websocket.close(code=4004, reason="PBT run not found")
+            return
+        await websocket.accept()
+        try:
+            while True:
+                await websocket.send_text(run.get_status().model_dump_json())
+                if run.state != "running":
+                    break
+                await asyncio.sleep(DASHBOARD_INTERVAL)
+            await websocket.close()
+        except Exception as e:
+            logger.info("PBT dashboard disconnected: %s", e)
+
+# Singleton instance
+pbt_service = PBTService()
@@ -0,0 +1,183 @@
+import itertools
+import time
+import numpy as np
+from typing import Any, Dict, List, Tuple
+from app.algorithms import dp
+from app.environments import create_environment
+from app.models.enums import AlgorithmType, EnvironmentType
+from app.models.schemas import BatchSolveRequest, BatchSolveResult, PlanningSolution, ResolveRequest, ResolveResult
+
+PLANNING_ENVIRONMENTS = (EnvironmentType.GRIDWORLD, EnvironmentType.FROZENLAKE)
+MAX_VARIANTS = 256
+# Stacked (variants, states, actions, outcomes) entries per batch (~16 bytes each)
+MAX_BATCH_ENTRIES = 1 << 24
+
+def _map_options(environment: EnvironmentType, map_size, hole_fraction, map_seed, is_slippery) -> Dict[str, Any]:
+    options: Dict[str, Any] = {}
+    if map_size is not None:
+        options["size"] = map_size
+    if hole_fraction is not None:
+        options["hole_fraction"] = hole_fraction
+        options["map_seed"] = map_seed
+    if environment == EnvironmentType.FROZENLAKE:
+        options["is_slippery"] = is_slippery
+    return options
+
+def _model(environment: EnvironmentType, options: Dict[str, Any]) -> Tuple[dp.TransitionArrays, int, int]:
+    env = create_environment(environment, **options)
+    try:
+        return env.get_transition_arrays(), env.get_state_space()['n'], env.get_action_space()['n']
+    finally:
+        env.close()
+
+def _desc_options(environment: EnvironmentType, desc: List[str], is_slippery: bool) -> Dict[str, Any]:
+    options: Dict[str, Any] = {"desc": desc}
+    if environment == EnvironmentType.FROZENLAKE:
+        options["is_slippery"] = is_slippery
+    return options
+
+def solve_batch(request: BatchSolveRequest) -> BatchSolveResult:
+    """Value iteration for every variant of the request in one stacked loop"""
+    if request.environment not in PLANNING_ENVIRONMENTS:
+        raise ValueError(f"Planning needs a tabular model ({', '.join(e.value for e in PLANNING_ENVIRONMENTS)})")
+    # Slip settings only exist on FrozenLake; seeds only matter for random maps
+    slippery = request.is_slippery if request.environment == EnvironmentType.FROZENLAKE else [None]
+    seeds = request.map_seeds if request.hole_fraction is not None else [None]
+    maps = list(itertools.product(seeds, slippery))
+    n_variants = len(maps) * len(request.discount_factors)
+    if n_variants > MAX_VARIANTS:
+        raise ValueError(f"At most {MAX_VARIANTS} variants per batch (got {n_variants})")
+    
+    started = time.perf_counter()
+    # One model per map variant, shared by all of its discount factors
+    models: List[dp.TransitionArrays] = []
+    n_states = n_actions = 0
+    for map_seed, is_slippery in maps:
+        model, n_states, n_actions = _model(request.environment, _map_options(
+            request.environment, request.map_size, request.hole_fraction, map_seed, is_slippery))
+        models.append(model)
+    n_outcomes = max(model[0].shape[-1] for model in models)
+    if n_variants * n_states * n_actions * n_outcomes > MAX_BATCH_ENTRIES:
+        raise ValueError("Batch too large: reduce the variants or the map size")
+    
+    variants = [(model, gamma, map_seed, is_slippery)
+                for model, (map_seed, is_slippery) in zip(models, maps)
+                for gamma in request.discount_factors]
+    batch = dp.stack_models([v[0] for v in variants], [v[1] for v in variants])
+    V, policy, sweeps, deltas = dp.batch_value_iteration(batch, request.theta, request.max_sweeps)
+    
+    solutions = [
+        PlanningSolution(
+            discount_factor=gamma,
+            is_slippery=is_slippery,
+            map_seed=map_seed,
+            sweeps=int(sweeps[b]),
+            converged=bool(deltas[b] < request.theta),
+            max_change=float(deltas[b]),
+            value_function=V[b].tolist(),
+            policy=policy[b].tolist()
+        )
+        for b, (_, gamma, map_seed, is_slippery) in enumerate(variants)
+    ]
+    return BatchSolveResult(
+        environment=request.environment,
+        n_states=n_states,
+        n_actions=n_actions,
+        solutions=solutions,
+        elapsed_ms=(time.perf_counter() - started) * 1000
+    )
+
+def resolve(request: ResolveRequest) -> ResolveResult:
+    """
+    Solve one map, warm-started from a previous solution when given. Value iteration
+    only backs up the states whose transitions changed and, transitively, the states
+    that read a value that moved (dp.frontier_value_iteration); a discount change
+    touches every state. Policy iteration starts from the previous greedy policy and
+    values and evaluates incrementally the same way: first from the changed states,
+    then from the states whose action the last improvement step changed. Both stop
+    after max_sweeps sweeps (converged is False then).
+    """
+    if request.environment not in PLANNING_ENVIRONMENTS:
+        raise ValueError(f"Planning needs a tabular model ({', '.join(e.value for e in PLANNING_ENVIRONMENTS)})")
+    if request.algorithm not in (AlgorithmType.VALUE_ITERATION, AlgorithmType.POLICY_ITERATION):
+        raise ValueError("Re-solving is available for value_iteration and policy_iteration")
+    if request.algorithm == AlgorithmType.POLICY_ITERATION and request.discount_factor >= 1.0:
+        # An improper policy (one that never ends the episode) has no finite value at gamma = 1
+        raise ValueError("policy_iteration needs discount_factor < 1")
+    
+    started = time.perf_counter()
+    if request.desc is not None:
+        options = _desc_options(request.environment, request.desc, request.is_slippery)
+    else:
+        options = _map_options(request.environment, request.map_size, request.hole_fraction,
+                               request.map_seed, request.is_slippery)
+    env = create_environment(request.environment, **options)
+    try:
+        model = env.get_transition_arrays()
+        desc = env.desc
+        n_states, n_actions = env.get_state_space()['n'], env.get_action_space()['n']
+    finally:
+        env.close()
+    gamma = request.discount_factor
+    
+    previous = request.previous
+    if previous is not None:
+        if len(previous.value_function) != n_states:
+            raise ValueError(f"Previous solution has {len(previous.value_function)} states, the map has {n_states}")
+        V = np.array(previous.value_function, dtype=np.float64)
+        slippery = request.is_slippery if previous.is_slippery is None else previous.is_slippery
+        old_desc = desc if previous.desc is None else previous.desc
+        if old_desc == desc and slippery == request.is_slippery:
+            changed = np.empty(0, dtype=np.int64)
+        else:
+            old_model, _, _ = _model(request.environment, _desc_options(request.environment, old_desc, slippery))
+            changed = dp.changed_states(old_model, model)
+        frontier = np.arange(n_states) if previous.discount_factor != gamma else changed
+    else:
+        V = np.zeros(n_states)
+        changed = frontier = np.arange(n_states)
+    initial_residual = float(dp.bellman_residual(model, V, gamma).max()) if n_states else 0.0
+    
+    if request.algorithm == AlgorithmType.VALUE_ITERATION:
+        V, sweeps, backups, residual = dp.frontier_value_iteration(
+            model, V, gamma, request.theta, frontier, request.max_sweeps)
+        policy = dp.greedy_policy(model, V, gamma)
+        converged = residual < request.theta
+    else:
+        policy = dp.greedy_policy(model, V, gamma) if previous is not None else np.zeros(n_states, dtype=int)
+        sweeps = backups = 0
+        converged = False
+        while sweeps < request.max_sweeps:
+            V, evaluation_sweeps, evaluation_backups, evaluation_residual = dp.frontier_policy_evaluation(
+                model, policy, V, gamma, request.theta, frontier, request.max_sweeps - sweeps)
+            sweeps += evaluation_sweeps + 1
+            backups += evaluation_backups + n_states
+            improved, stable = dp.improve_policy(model, V, policy, gamma)
+            frontier = np.flatnonzero(improved != policy)
+            policy = improved
+            if stable:
+                converged = evaluation_residual < request.theta
+                break
+        residual = float(dp.bellman_residual(model, V, gamma).max()) if n_states else 0.0
+    
+    return ResolveResult(
+        environment=request.environment,
+        algorithm=request.algorithm,
+        n_states=n_states,
+        n_actions=n_actions,
+        desc=desc,
+        discount_factor=gamma,
+        value_function=V.tolist(),
+        policy=policy.tolist(),
+        warm_started=previous is not None,
+        converged=converged,
+        changed_states=len(changed),
+        sweeps=sweeps,
+        backups=backups,
+        full_sweep_equivalent=backups / max(n_states, 1),
+        initial_residual=initial_residual,
+        residual=residual,
+        value_error_bound=residual / (1 - gamma) if gamma < 1 else None,
+        policy_loss_bound=2 * gamma * residual / (1 - gamma) if gamma < 1 else None,
+        elapsed_ms=(time.perf_counter() - started) * 1000
+    )
@@ -0,0 +1,192 @@
+import asyncio
+import cProfile
+import io
+import logging
+import marshal
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from typing import Optional
+from app.models.enums import ParallelMode
+from app.models.schemas import ProfileRequest, ProfileJobInfo
+
+logger = logging.getLogger(__name__)
+
+# Frames above this function belong to the event loop, not the session
+SESSION_ROOT_FRAME = "_training_loop"
+# Parallel modes whose training runs in worker processes the profiler cannot reach
+WORKER_PROCESS_MODES = (ParallelMode.HOGWILD, ParallelMode.ACTOR_LEARNER)
+
+class ProfileJob:
+    """
+    Profiles one training session for a fixed time window.
+    
+    The training loop brackets the synchronous work it does for the session
+    (advancing the algorithm generator, serializing updates) with enter()/exit(),
+    so only that session's work is recorded even though all sessions share the
+    event loop thread. The memory report is the exception: tracemalloc traces the
+    whole process, so it includes whatever other sessions allocated meanwhile.
+    """
+    
+    def __init__(self, session_id: str, request: ProfileRequest):
+        self.id = str(uuid.uuid4())
+        self.session_id = session_id
+        self.request = request
+        self.status = "running"
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.active = False
+        self.pstats_data: Optional[bytes] = None
+        self.collapsed_data: Optional[str] = None
+        self.memory_report: Optional[str] = None
+        
+        self._profiler: Optional[cProfile.Profile] = None
+        self._samples: Counter = Counter()
+        self._thread_id = threading.get_ident()
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._memory_start: Optional[tracemalloc.Snapshot] = None
+        
+        if request.mode == "deterministic":
+            self._profiler = cProfile.Profile()
+        else:
+            self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+            self._sampler.start()
+        
+        if request.trace_memory:
+            # ProfilerService keeps tracemalloc running while any memory-tracing job is
+            self._memory_start = tracemalloc.take_snapshot()
+    
+    def enter(self):
+        self.active = True
+        if self._profiler is not None:
+            self._profiler.enable()
+    
+    def exit(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+        self.active = False
+    
+    def _sample_loop(self):
+        interval = self.request.sample_interval_ms / 1000.0
+        while not self._stop.wait(interval):
+            if not self.active:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                if code.co_name == SESSION_ROOT_FRAME:
+                    break
+                frame = frame.f_back
+            if stack:
+                self._samples[";".join(reversed(stack))] += 1
+    
+    def finish(self):
+        """Stop collecting and materialize the results (call on the event loop thread)"""
+        if self.status != "running":
+            return
+        self.active = False
+        if self._profiler is not None:
+            self._profiler.create_stats()
+            self.pstats_data = marshal.dumps(self._profiler.stats)
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self.collapsed_data = "".join(f"{stack} {count}\n" for stack, count in self._samples.most_common())
+        if self._memory_start is not None:
+            snapshot = tracemalloc.take_snapshot()
+            # tracemalloc is process-wide; keep the report to application code
+            app_filter = [tracemalloc.Filter(True, f"*{os.sep}app{os.sep}*")]
+            stats = snapshot.filter_traces(app_filter).compare_to(
+                self._memory_start.filter_traces(app_filter), "lineno"
+            )
+            out = io.StringIO()
+            for stat in stats[:50]:
+                out.write(f"{stat}\n")
+            self.memory_report = out.getvalue()
+        self.status = "completed"
+        self.finished_at = time.time()
+    
+    def info(self) -> ProfileJobInfo:
+        formats = []
+        if self.pstats_data is not None:
+            formats.append("pstats")
+        if self.collapsed_data is not None:
+            formats.append("collapsed")
+        if self.memory_report is not None:
+            formats.append("memory")
+        return ProfileJobInfo(
+            profile_id=self.id,
+            session_id=self.session_id,
+            mode=self.request.mode,
+            status=self.status,
+            duration_seconds=self.request.duration_seconds,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            available_formats=formats,
+            n_samples=sum(self._samples.values()),
+        )
+
+class ProfilerService:
+    def __init__(self, max_jobs: int = 20):
+        self.jobs: "OrderedDict[str, ProfileJob]" = OrderedDict()
+        self.max_jobs = max_jobs
+        # tracemalloc is process-wide: started for the first memory-tracing job, stopped after the last
+        self._memory_jobs = 0
+        self._started_tracemalloc = False
+    
+    def start(self, session, request: ProfileRequest) -> ProfileJob:
+        """Attach a profiler to a session; must be called from the event loop thread"""
+        if session.profile_job is not None:
+            raise ValueError(f"Session {session.id} is already being profiled")
+        if request.trace_memory:
+            if self._memory_jobs == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            self._memory_jobs += 1
+        try:
+            job = ProfileJob(session.id, request)
+        except Exception:
+            if request.trace_memory:
+                self._release_tracemalloc()
+            raise
+        session.profile_job = job
+        self.jobs[job.id] = job
+        while len(self.jobs) > self.max_jobs:
+            self.jobs.popitem(last=False)
+        asyncio.create_task(self._finish_after(session, job))
+        return job
+    
+    async def _finish_after(self, session, job: ProfileJob):
+        try:
+            await asyncio.sleep(job.request.duration_seconds)
+        finally:
+            if session.profile_job is job:
+                session.profile_job = None
+            try:
+                job.finish()
+            except Exception as e:
+                logger.exception("Profile %s failed: %s", job.id, e)
+                job.status = "failed"
+                job.finished_at = time.time()
+            finally:
+                if job.request.trace_memory:
+                    self._release_tracemalloc()
+    
+    def _release_tracemalloc(self):
+        self._memory_jobs -= 1
+        if self._memory_jobs == 0 and self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+    
+    def get_job(self, profile_id: str) -> Optional[ProfileJob]:
+        return self.jobs.get(profile_id)
+
+# Singleton instance
+profiler_service = ProfilerService()
@@ -1,31 +1,216 @@
+import os
+import json
 import uuid
+import shutil
 import asyncio
+import logging
 import time
-from typing import Dict, Any, Optional
+import numpy as np
+from typing import Dict, Any, List, Optional
 from fastapi import WebSocket
-from app.models.schemas import TrainingConfig, TrainingUpdate, TrainingStatus
-from app.models.enums import AlgorithmType, EnvironmentType
-from app.environments import create_environment
+from app.config import settings
+from app.models.schemas import EpisodeStats, TrainingConfig, TrainingMetrics, TrainingUpdate, TrainingStatus
+from app.models.enums import AlgorithmType, CurveDownsampling, EnvironmentType
 from app.algorithms import create_algorithm
+from app.environments import environment_options
+from app.algorithms.convergence import ConvergenceMonitor
+from app.algorithms.projections import Projection
+from app.algorithms.timing import NULL_TIMER, PhaseTimer
+from app.services.env_pool import EnvironmentPool
+from app.services.learning_curves import EpisodeLog
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+# Forks share tables at least this large copy-on-write (private file mapping) instead of copying
+COW_MIN_BYTES = 8 * 1024 * 1024
+# Config fields that define the state space and table layout; a fork must keep them to reuse the parent's tables
+FORK_FIXED_FIELDS = (
+    "environment", "map_size", "hole_fraction", "map_seed", "n_bins", "adaptive_discretization",
+    "q_table_backend", "q_table_dtype",
+)
+
+def encode_batch(updates: List[TrainingUpdate]) -> str:
+    """
+    One WebSocket frame for several updates, one array per field:
+    {"type": "batch", "n", "episode", "step", "reward", "cumulative_reward", "state", "action",
+     "snapshots": [{"index", "value_function", "policy", "projection"}, ...]}
+    Snapshots are listed only for the updates that carry one. Clients expand the
+    frame back into the individual updates, in order.
+    """
+    return json.dumps({
+        "type": "batch",
+        "n": len(updates),
+        "episode": [update.episode for update in updates],
+        "step": [update.step for update in updates],
+        "reward": [update.reward for update in updates],
+        "cumulative_reward": [update.cumulative_reward for update in updates],
+        "state": [update.state for update in updates],
+        "action": [update.action for update in updates],
+        "snapshots": [
+            {"index": i, "value_function": update.value_function, "policy": update.policy,
+             "projection": update.projection}
+            for i, update in enumerate(updates)
+            if update.value_function is not None or update.policy is not None
+        ],
+    }, separators=(",", ":"))
+
+def _fork_tables(tables: Dict[str, np.ndarray], path: str) -> Dict[str, np.ndarray]:
+    """
+    Clones of learned tables for a forked session: a plain copy for small tables; large
+    ones are saved once and mapped with mode 'c', so pages stay shared (page cache)
+    until the branch writes them.
+    """
+    forked = {}
+    for name, table in tables.items():
+        if table.nbytes < COW_MIN_BYTES:
+            forked[name] = np.array(table)
+            continue
+        os.makedirs(path, exist_ok=True)
+        file_path = os.path.join(path, f"{name}.npy")
+        np.save(file_path, table)
+        forked[name] = np.load(file_path, mmap_mode="c")
+    return forked
 
 class TrainingSession:
-    def __init__(self, config: TrainingConfig):
+    def __init__(self, config: TrainingConfig, env_pool: EnvironmentPool):
         self.id = str(uuid.uuid4())
         self.config = config
         self.is_running = False
-        self.env = create_environment(config.environment)
-        self.algorithm = create_algorithm(config.algorithm)
+        self.env_pool = env_pool
+        self.env_options = environment_options(config)
+        self.env = env_pool.acquire(config.environment, self.env_options)
+        if config.use_jit:
+            from app.algorithms import kernels  # Numba loads on first use
+            kernels.warm_up(config.q_table_dtype.value)  # sessions are built off the event loop
+        self.timer = PhaseTimer() if config.collect_timings else NULL_TIMER
+        self.episode_log = EpisodeLog()
+        self.projection: Optional[Projection] = None  # chosen by the connected subscriber
+        self.algorithm = self._create_algorithm()
         self.websocket: Optional[WebSocket] = None
         self.task: Optional[asyncio.Task] = None
         self.created_at = time.time()
+        self.last_accessed = self.created_at
         self.current_episode = 0
         self.start_time: Optional[float] = None
+        self.hibernation_path: Optional[str] = None
+        self.metrics = metrics.SessionMetrics(self.id)
+        self.reported_state: Optional[str] = None  # State last counted in the sessions gauge
+        self.forked_from: Optional[str] = None
+        self.convergence_reason: Optional[str] = None  # criterion that ended the last run early
+        self.fork_path: Optional[str] = None  # Backing files of copy-on-write tables
+        self.profile_job = None  # Attached by the profiler service (see app.services.profiling)
+        self.rehydrating = asyncio.Lock()  # one rehydration at a time (it runs in a worker thread)
+
+    @property
+    def is_hibernated(self) -> bool:
+        return self.hibernation_path is not None
+
+    @property
+    def state(self) -> str:
+        if self.is_hibernated:
+            return "hibernated"
+        return "running" if self.is_running else "idle"
+
+    def touch(self):
+        self.last_accessed = time.time()
+
+    def is_idle(self) -> bool:
+        return not self.is_running and self.websocket is None
+
+    def estimate_memory(self) -> int:
+        """Approximate resident size of the session in bytes (0 when hibernated)"""
+        if self.is_hibernated:
+            return 0
+        return self.env.estimate_memory() + self.algorithm.estimate_memory() + self.episode_log.estimate_memory()
+
+    def hibernate(self, directory: str):
+        """Persist learned tables to disk and release env/algorithm memory (the config stays in memory)"""
+        if self.is_hibernated:
+            return
+        path = os.path.join(directory, self.id)
+        os.makedirs(path, exist_ok=True)
+        np.savez(os.path.join(path, "state.npz"), **self.algorithm.get_state())
+        env_state = self.env.get_state()
+        if env_state:
+            np.savez(os.path.join(path, "env.npz"), **env_state)
+        np.savez(os.path.join(path, "curves.npz"), **self.episode_log.get_state())
+        
+        self.env_pool.release(self.config.environment, self.env, self.env_options)
+        self.env = None
+        self.algorithm = None
+        self.episode_log = None
+        self.hibernation_path = path
+
+    def rehydrate(self):
+        """Recreate env/algorithm and restore the tables saved by hibernate()"""
+        if not self.is_hibernated:
+            return
+        self.env = self.env_pool.acquire(self.config.environment, self.env_options)
+        env_path = os.path.join(self.hibernation_path, "env.npz")
+        if os.path.exists(env_path):
+            with np.load(env_path) as data:
+                self.env.load_state({key: data[key] for key in data.files})
+        self.episode_log = EpisodeLog()
+        with np.load(os.path.join(self.hibernation_path, "curves.npz")) as data:
+            self.episode_log.load_state({key: data[key] for key in data.files})
+        self.algorithm = self._create_algorithm()
+        with np.load(os.path.join(self.hibernation_path, "state.npz")) as data:
+            self.algorithm.load_state({key: data[key] for key in data.files})
+        
+        shutil.rmtree(self.hibernation_path, ignore_errors=True)
+        self.hibernation_path = None
+
+    def fork(self, child: "TrainingSession", directory: str) -> "TrainingSession":
+        """Continue child, a new session under the fork's config, from this one's learned tables (and history)"""
+        env_state = self.env.get_state()
+        if env_state:
+            child.env.load_state(env_state)
+        child.fork_path = os.path.join(directory, f"{child.id}.fork")
+        child.algorithm.load_state(_fork_tables(self.algorithm.get_state(), child.fork_path))
+        child.algorithm.warm_start = True
+        child.episode_log.load_state(self.episode_log.get_state())
+        child.forked_from = self.id
+        return child
+
+    def close(self):
+        if self.env is not None:
+            self.env_pool.release(self.config.environment, self.env, self.env_options)
+            self.env = None
+        if self.hibernation_path is not None:
+            shutil.rmtree(self.hibernation_path, ignore_errors=True)
+        if self.fork_path is not None:
+            shutil.rmtree(self.fork_path, ignore_errors=True)
+
+    def _create_algorithm(self):
+        algorithm = create_algorithm(self.config.algorithm)
+        algorithm.timer = self.timer
+        algorithm.episode_log = self.episode_log
+        algorithm.projection = self.projection
+        return algorithm
+    
+    def set_projection(self, keep: Optional[str], reduce: str = "max"):
+        """Project snapshots onto the dimensions in keep (e.g. 'pole_angle,pole_angular_velocity'); None for full snapshots"""
+        self.projection = Projection.for_state_space(self.env.get_state_space(), keep, reduce) if keep else None
+        self.algorithm.projection = self.projection
 
     def get_elapsed_time(self) -> float:
         if self.start_time is None:
             return 0.0
         return time.time() - self.start_time
     
+    def get_metrics(self, points: int, method: CurveDownsampling) -> TrainingMetrics:
+        """Learning curves downsampled to about `points` episodes, plus running statistics"""
+        episodes, rewards, lengths = self.episode_log.curve(points, method.value)
+        return TrainingMetrics(
+            episode_rewards=rewards.tolist(),
+            episode_lengths=lengths.tolist(),
+            episodes=(episodes + 1).tolist(),
+            total_episodes=len(self.episode_log),
+            method=method,
+            stats=EpisodeStats(**self.episode_log.stats())
+        )
+    
     def get_status(self) -> TrainingStatus:
         return TrainingStatus(
             session_id=self.id,
@@ -33,32 +218,132 @@ class TrainingSession:
             current_episode=self.current_episode,
             total_episodes=self.config.n_episodes,
             elapsed_time=self.get_elapsed_time(),
-            config=self.config
+            config=self.config,
+            phase_timings=self.timer.summary() if self.timer.enabled else None,
+            forked_from=self.forked_from,
+            convergence_reason=self.convergence_reason
         )
 
 class TrainingService:
-    def __init__(self, max_sessions: int = 100, session_ttl: int = 3600):
+    def __init__(
+        self,
+        max_sessions: int = 100,
+        session_ttl: int = 3600,
+        memory_budget: int = 1024 * 1024 * 1024,
+        reaper_interval: float = 30.0,
+        hibernation_dir: str = "/tmp/rl_sessions",
+        env_pool: Optional[EnvironmentPool] = None,
+    ):
         self.sessions: Dict[str, TrainingSession] = {}
         self.max_sessions = max_sessions
         self.session_ttl = session_ttl  # Time-to-live in seconds
+        self.memory_budget = memory_budget  # Bytes allowed for resident sessions
+        self.reaper_interval = reaper_interval
+        self.hibernation_dir = hibernation_dir
+        self.env_pool = env_pool or EnvironmentPool({})
+        self._reaper_task: Optional[asyncio.Task] = None
 
-    def create_session(self, config: TrainingConfig) -> str:
+    async def create_session(self, config: TrainingConfig) -> str:
         # Clean up expired sessions before creating new one
         self._cleanup_expired_sessions()
         
         if len(self.sessions) >= self.max_sessions:
             raise ValueError(f"Maximum number of sessions ({self.max_sessions}) reached")
         
-        session = TrainingSession(config)
+        # Off the event loop: large random maps and custom environments take a while to build
+        session = await asyncio.to_thread(TrainingSession, config, self.env_pool)
+        if len(self.sessions) >= self.max_sessions:
+            session.close()
+            session.metrics.remove()
+            raise ValueError(f"Maximum number of sessions ({self.max_sessions}) reached")
+        self.sessions[session.id] = session
+        self._track_state(session)
+        return session.id
+
+    async def fork_session(self, session_id: str, overrides: Dict[str, Any]) -> str:
+        """Branch a session into a new one with some config fields overridden"""
+        parent = self.find_session(session_id)
+        if parent is None:
+            raise KeyError(session_id)
+        changed = [name for name in FORK_FIXED_FIELDS if name in overrides
+                   and overrides[name] != getattr(parent.config, name)]
+        if changed:
+            raise ValueError(f"A fork keeps the parent's state space; cannot change: {', '.join(changed)}")
+        config = TrainingConfig.model_validate({**parent.config.model_dump(), **overrides})
+        
+        self._cleanup_expired_sessions()
+        if len(self.sessions) >= self.max_sessions:
+            raise ValueError(f"Maximum number of sessions ({self.max_sessions}) reached")
+        
+        # Build the child's environment off the event loop, then copy the parent's tables on it
+        # so they are not read halfway through a training step
+        session = await asyncio.to_thread(TrainingSession, config, self.env_pool)
+        parent = await self.get_session(session_id)
+        if parent is None or len(self.sessions) >= self.max_sessions:
+            session.close()
+            session.metrics.remove()
+            if parent is None:
+                raise KeyError(session_id)
+            raise ValueError(f"Maximum number of sessions ({self.max_sessions}) reached")
+        parent.fork(session, self.hibernation_dir)
         self.sessions[session.id] = session
+        self._track_state(session)
         return session.id
 
-    def get_session(self, session_id: str) -> Optional[TrainingSession]:
+    def find_session(self, session_id: str) -> Optional[TrainingSession]:
+        """Look a session up without rehydrating it (enough for its config, status or deletion)"""
+        session = self.sessions.get(session_id)
+        if session:
+            session.touch()
+        return session
+
+    async def get_session(self, session_id: str) -> Optional[TrainingSession]:
+        """Look a session up, rehydrating it if it was hibernated"""
+        session = self.sessions.get(session_id)
+        if session:
+            session.touch()
+            if session.is_hibernated or session.rehydrating.locked():
+                await self._rehydrate(session)
         return self.sessions.get(session_id)
 
+    async def _rehydrate(self, session: TrainingSession):
+        """Rehydrate in a worker thread: recreating the environment can take seconds (batched Breakout workers)"""
+        async with session.rehydrating:
+            if not session.is_hibernated:
+                return
+            try:
+                await asyncio.to_thread(session.rehydrate)
+            except Exception:
+                if self.sessions.get(session.id) is session:
+                    raise
+            if self.sessions.get(session.id) is not session:
+                # Deleted while rehydrating: release what the thread created
+                session.close()
+                return
+            self._track_state(session)
+
+    def _track_state(self, session: TrainingSession, removed: bool = False):
+        """Keep the sessions-by-state gauge current without scanning all sessions"""
+        state = None if removed else session.state
+        if state == session.reported_state:
+            return
+        if session.reported_state is not None:
+            metrics.sessions_by_state.labels(session.reported_state).dec()
+        if state is not None:
+            metrics.sessions_by_state.labels(state).inc()
+        session.reported_state = state
+
     def delete_session(self, session_id: str):
-        if session_id in self.sessions:
-            del self.sessions[session_id]
+        session = self.sessions.pop(session_id, None)
+        if session:
+            session.is_running = False
+            if session.task:
+                session.task.cancel()
+            # A rehydration or hibernation in progress closes the session once its thread is done
+            if not session.rehydrating.locked():
+                session.close()
+            self._track_state(session, removed=True)
+            session.metrics.remove()
 
     def _cleanup_expired_sessions(self):
         """Remove sessions older than TTL"""
@@ -68,10 +353,73 @@ class TrainingService:
             if current_time - session.created_at > self.session_ttl
         ]
         for sid in expired:
-            del self.sessions[sid]
+            self.delete_session(sid)
+
+    def get_memory_usage(self) -> int:
+        return sum(session.estimate_memory() for session in self.sessions.values())
+
+    async def reap(self):
+        """Drop expired sessions, then hibernate idle ones (least recently used first)
+        until resident sessions fit in the memory budget"""
+        self._cleanup_expired_sessions()
+        
+        usage = self.get_memory_usage()
+        if usage <= self.memory_budget:
+            return
+        
+        candidates = sorted(
+            (s for s in self.sessions.values() if s.is_idle() and not s.is_hibernated),
+            key=lambda s: s.last_accessed
+        )
+        for session in candidates:
+            if usage <= self.memory_budget:
+                break
+            if session.rehydrating.locked():
+                continue
+            # Held while the tables are written out in a worker thread, so lookups that
+            # need them wait for the hibernation and rehydrate (see get_session)
+            async with session.rehydrating:
+                if not session.is_idle() or self.sessions.get(session.id) is not session:
+                    continue
+                size = session.estimate_memory()
+                try:
+                    await asyncio.to_thread(session.hibernate, self.hibernation_dir)
+                except Exception:
+                    logger.exception("Failed to hibernate session %s", session.id)
+                    continue
+                finally:
+                    if self.sessions.get(session.id) is not session:
+                        # Deleted while hibernating: release what the thread left behind
+                        session.close()
+            if self.sessions.get(session.id) is not session:
+                continue
+            usage -= size
+            self._track_state(session)
+            logger.info("Hibernated idle session %s (%d bytes)", session.id, size)
+
+    async def _reaper_loop(self):
+        while True:
+            await asyncio.sleep(self.reaper_interval)
+            try:
+                await self.reap()
+            except Exception:
+                logger.exception("Session reaper failed")
+
+    def start_reaper(self):
+        if self._reaper_task is None:
+            self._reaper_task = asyncio.create_task(self._reaper_loop())
+
+    async def stop_reaper(self):
+        if self._reaper_task:
+            self._reaper_task.cancel()
+            try:
+                await self._reaper_task
+            except asyncio.CancelledError:
+                pass
+            self._reaper_task = None
 
     async def connect_websocket(self, session_id: str, websocket: WebSocket):
-        session = self.get_session(session_id)
+        session = await self.get_session(session_id)
         if not session:
             await websocket.close(code=4004, reason="Session not found")
             return
@@ -80,6 +428,10 @@ class TrainingService:
         session.websocket = websocket
         
         try:
+            # Snapshot projection for this subscriber: ?project=pole_angle,pole_angular_velocity&reduce=mean
+            if websocket.query_params.get("project"):
+                await self._set_projection(session, websocket, websocket.query_params["project"],
+                                           websocket.query_params.get("reduce", "max"))
             while True:
                 # Keep connection open, listen for control messages
                 data = await websocket.receive_text()
@@ -87,26 +439,41 @@ class TrainingService:
                     await self.stop_training(session_id)
                 elif data == "START":
                     await self.start_training(session_id)
+                elif data.startswith("PROJECT"):
+                    # "PROJECT <dim,dim> [max|mean]"; a bare "PROJECT" goes back to full snapshots
+                    args = data.split()[1:]
+                    await self._set_projection(session, websocket, args[0] if args else None,
+                                               args[1] if len(args) > 1 else "max")
         except Exception as e:
             print(f"WebSocket disconnected: {e}")
         finally:
             session.websocket = None
+            if session.algorithm is not None:
+                session.set_projection(None)
+
+    async def _set_projection(self, session: TrainingSession, websocket: WebSocket, keep: Optional[str], reduce: str):
+        try:
+            session.set_projection(keep, reduce)
+        except ValueError as e:
+            await websocket.send_text(json.dumps({"error": str(e)}))
 
     async def start_training(self, session_id: str):
-        session = self.get_session(session_id)
+        session = await self.get_session(session_id)
         if not session or session.is_running:
             return
 
         session.is_running = True
         session.start_time = time.time()
         session.task = asyncio.create_task(self._training_loop(session))
+        self._track_state(session)
 
     async def stop_training(self, session_id: str):
-        session = self.get_session(session_id)
+        session = self.find_session(session_id)
         if not session or not session.is_running:
             return
 
         session.is_running = False
+        self._track_state(session)
         if session.task:
             session.task.cancel()
             try:
@@ -115,31 +482,100 @@ class TrainingService:
                 pass
             session.task = None
 
+    async def _send_updates(self, session: TrainingSession, updates: List[TrainingUpdate]) -> bool:
+        """Send buffered updates as one frame (a plain update when there is one); False if the send failed"""
+        session.metrics.queue_depth.set(0)
+        if not session.websocket:
+            session.metrics.record_dropped(len(updates))
+            return True
+        timer = session.timer
+        profile_job = session.profile_job
+        if profile_job is not None:
+            profile_job.enter()
+        try:
+            t0 = timer.start()
+            payload = updates[0].model_dump_json() if len(updates) == 1 else encode_batch(updates)
+            timer.lap("serialize", t0)
+        finally:
+            if profile_job is not None:
+                profile_job.exit()
+        try:
+            sent_at = time.perf_counter()
+            t0 = timer.start()
+            await session.websocket.send_text(payload)
+            timer.lap("send", t0)
+            session.metrics.record_sent(len(payload), time.perf_counter() - sent_at, len(updates))
+        except Exception as e:
+            session.metrics.record_dropped(len(updates))
+            print(f"Error sending update: {e}")
+            return False
+        return True
+
     async def _training_loop(self, session: TrainingSession):
+        generator = None
         try:
+            convergence = session.config.convergence
+            session.algorithm.convergence = ConvergenceMonitor(convergence) if convergence else None
+            session.algorithm.convergence_reason = session.convergence_reason = None
             generator = session.algorithm.train(session.env, session.config)
-            for update in generator:
-                if not session.is_running:
+            timer = session.timer
+            config = session.config
+            # Updates produced within one stream_batch_ms window (timed from the first
+            # pending update) go out as a single frame; the throttle still paces every update
+            batch_window = config.stream_batch_ms / 1000.0
+            delay_seconds = config.step_delay_ms / 1000.0
+            pending: List[TrainingUpdate] = []
+            window_start = 0.0
+            while session.is_running:
+                # Bracket the session's synchronous work so a profiler can scope to it
+                profile_job = session.profile_job
+                if profile_job is not None:
+                    profile_job.enter()
+                try:
+                    update = next(generator, None)
+                    if update is not None and update.value_function is not None:
+                        update.projection = session.algorithm.snapshot_projection
+                finally:
+                    if profile_job is not None:
+                        profile_job.exit()
+                if update is None:
                     break
                 
                 session.current_episode = update.episode
+                env_steps = session.algorithm.update_env_steps
+                if env_steps is not None:
+                    session.metrics.record_step(env_steps)
+                elif update.step > 0:
+                    session.metrics.record_step(getattr(session.env, "n_envs", 1))
                 
-                if session.websocket:
-                    try:
-                        await session.websocket.send_text(update.model_dump_json())
-                    except Exception as e:
-                        print(f"Error sending update: {e}")
+                if not pending:
+                    window_start = time.monotonic()
+                pending.append(update)
+                if time.monotonic() - window_start < batch_window:
+                    session.metrics.queue_depth.set(len(pending))
+                else:
+                    sent = await self._send_updates(session, pending)
+                    pending = []
+                    if not sent:
                         break
                 
                 # Sleep to slow down visualization - use configurable delay
-                delay_seconds = session.config.step_delay_ms / 1000.0
+                t0 = timer.start()
                 await asyncio.sleep(delay_seconds)
+                timer.lap("throttle", t0)
+            
+            if pending:
+                await self._send_updates(session, pending)
+            session.convergence_reason = session.algorithm.convergence_reason
             
             # Send completion message when training finishes
             if session.websocket and session.is_running:
                 try:
                     import json
-                    await session.websocket.send_text(json.dumps({"status": "completed"}))
+                    message = {"status": "completed"}
+                    if session.convergence_reason:
+                        message["convergence_reason"] = session.convergence_reason
+                    await session.websocket.send_text(json.dumps(message))
                 except Exception as e:
                     print(f"Error sending completion message: {e}")
                 
@@ -153,8 +589,23 @@ class TrainingService:
                 except:
                     pass
         finally:
+            # Close now so parallel learners release their workers and shared memory
+            if generator is not None:
+                generator.close()
             session.is_running = False
+            session.metrics.reset_rate()
+            if session.id in self.sessions:
+                self._track_state(session)
 
 # Singleton instance
-training_service = TrainingService()
+training_service = TrainingService(
+    max_sessions=settings.MAX_SESSIONS,
+    session_ttl=settings.SESSION_TTL,
+    memory_budget=settings.MEMORY_BUDGET_MB * 1024 * 1024,
+    reaper_interval=settings.REAPER_INTERVAL,
+    hibernation_dir=settings.HIBERNATION_DIR,
+    env_pool=EnvironmentPool({
+        EnvironmentType(env_type): size for env_type, size in settings.ENV_POOL_SIZES.items()
+    }),
+)
 
@@ -0,0 +1,7 @@
+"""
+Microbenchmarks for environments, learners, DP and serialization.
+
+Run from the backend directory:
+    python -m benchmarks --output results.json
+    python -m benchmarks --baseline results.json   # compare against a stored run
+"""
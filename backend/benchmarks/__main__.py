@@ -0,0 +1,76 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import numpy as np
+from typing import Any, Dict
+from benchmarks import dp, environments, learners, serialization, startup
+
+SUITES = {
+    "environments": environments.run,
+    "learners": learners.run,
+    "dp": dp.run,
+    "serialization": serialization.run,
+    "startup": startup.run,
+}
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> int:
+    """Print a comparison table and return the number of regressions beyond tolerance"""
+    regressions = 0
+    print(f"\n{'benchmark':<60} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, entry in sorted(current["results"].items()):
+        base = baseline["results"].get(name)
+        if base is None or not base["value"]:
+            print(f"{name:<60} {'-':>12} {entry['value']:>12.1f} {'new':>8}")
+            continue
+        change = (entry["value"] - base["value"]) / base["value"]
+        worse = -change if entry["higher_is_better"] else change
+        flag = ""
+        if worse > tolerance:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{name:<60} {base['value']:>12.1f} {entry['value']:>12.1f} {change:>+7.1%}{flag}")
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="RL backend microbenchmarks")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES), help="suites to run (default: all)")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds to run each benchmark")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="compare against results previously written with --output")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown before flagging a regression")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    np.random.seed(args.seed)
+    results: Dict[str, Any] = {}
+    for name in args.suite or SUITES:
+        results.update(SUITES[name](args.min_time))
+    
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "min_time": args.min_time,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        print(f"\n{regressions} regression(s) beyond {args.tolerance:.0%}")
+        return 1 if regressions else 0
+    
+    print()
+    for name, entry in sorted(results.items()):
+        print(f"{name:<60} {entry['value']:>12.1f} {entry['unit']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
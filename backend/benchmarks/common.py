@@ -0,0 +1,39 @@
+import time
+from typing import Any, Callable, Dict, Optional
+
+class StepCounter:
+    """Wraps an environment and counts step() calls (learners don't expose update counts)"""
+    
+    def __init__(self, env):
+        self.env = env
+        self.steps = 0
+    
+    def step(self, action: int):
+        self.steps += 1
+        return self.env.step(action)
+    
+    def __getattr__(self, name: str):
+        return getattr(self.env, name)
+
+def result(value: float, unit: str, higher_is_better: bool = True, **extra: Any) -> Dict[str, Any]:
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better, **extra}
+
+def rate(fn: Callable[[], int], min_time: float) -> float:
+    """Call fn repeatedly for at least min_time seconds; fn returns the number of operations done.
+    One untimed call first keeps lazy setup (imports, JIT compilation, caches) out of the rate."""
+    fn()
+    ops = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        ops += fn()
+        elapsed = time.perf_counter() - start
+    return ops / elapsed
+
+def try_create(factory: Callable[[], Any]) -> Optional[Any]:
+    """Create an environment, returning None when it is unavailable (e.g. no Atari ROM)"""
+    try:
+        return factory()
+    except Exception as e:
+        print(f"  skipped: {e.__class__.__name__}: {str(e).splitlines()[0]}")
+        return None
@@ -0,0 +1,42 @@
+import time
+from typing import Any, Dict
+from app.algorithms import create_algorithm
+from app.environments.gridworld import GridWorld
+from app.environments.frozenlake import FrozenLake
+from app.models.enums import AlgorithmType, EnvironmentType
+from app.models.schemas import TrainingConfig
+from benchmarks.common import result
+
+MAP_SIZES = {
+    EnvironmentType.GRIDWORLD: [4, 5, 8, 64],
+    EnvironmentType.FROZENLAKE: [4, 5, 8, 64],
+}
+GENERATED_MIN_SIZE = 16  # sizes from here on use a seeded random map
+
+def _make(env_type: EnvironmentType, size: int):
+    options = {"hole_fraction": 0.2, "map_seed": 0} if size >= GENERATED_MIN_SIZE else {}
+    if env_type == EnvironmentType.GRIDWORLD:
+        return GridWorld(size=size, **options)
+    return FrozenLake(size=size, is_slippery=True, **options)
+
+def run(min_time: float) -> Dict[str, Any]:
+    """Sweeps (full passes over the state space) per second for the DP algorithms"""
+    results = {}
+    for algo_type in [AlgorithmType.VALUE_ITERATION, AlgorithmType.POLICY_ITERATION]:
+        for env_type, sizes in MAP_SIZES.items():
+            for size in sizes:
+                print(f"dp.{algo_type.value}.{env_type.value}.{size}x{size}")
+                env = _make(env_type, size)
+                config = TrainingConfig(environment=env_type, algorithm=algo_type, n_episodes=1000)
+                sweeps = 0
+                start = time.perf_counter()
+                while time.perf_counter() - start < min_time:
+                    algorithm = create_algorithm(algo_type)
+                    for _ in algorithm.train(env, config):
+                        pass
+                    sweeps += algorithm.n_sweeps
+                elapsed = time.perf_counter() - start
+                results[f"dp.{algo_type.value}.{env_type.value}.{size}x{size}.sweeps_per_sec"] = result(
+                    sweeps / elapsed, "sweeps/s", n_states=size * size
+                )
+    return results
@@ -0,0 +1,26 @@
+import numpy as np
+from typing import Any, Dict
+from app.environments import ENVIRONMENT_REGISTRY, create_environment
+from benchmarks.common import rate, result, try_create
+
+def run(min_time: float) -> Dict[str, Any]:
+    """Raw env.step() throughput with uniformly random actions"""
+    results = {}
+    for env_type in ENVIRONMENT_REGISTRY:
+        print(f"env.{env_type.value}")
+        env = try_create(lambda: create_environment(env_type))
+        if env is None:
+            continue
+        n_actions = env.get_action_space()['n']
+        actions = np.random.randint(n_actions, size=1000)
+        env.reset()
+        
+        def episode_chunk() -> int:
+            for i in range(len(actions)):
+                if env.step(int(actions[i])).done:
+                    env.reset()
+            return len(actions)
+        
+        results[f"env.{env_type.value}.steps_per_sec"] = result(rate(episode_chunk, min_time), "steps/s")
+        env.close()
+    return results
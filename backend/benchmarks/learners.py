@@ -0,0 +1,39 @@
+from typing import Any, Dict
+from app.algorithms import create_algorithm
+from app.environments import create_environment
+from app.models.enums import AlgorithmType, EnvironmentType
+from app.models.schemas import TrainingConfig
+from benchmarks.common import StepCounter, rate, result
+
+TABULAR_ALGORITHMS = [
+    AlgorithmType.Q_LEARNING,
+    AlgorithmType.SARSA,
+    AlgorithmType.MONTE_CARLO,
+    AlgorithmType.TD_LEARNING,
+    AlgorithmType.N_STEP_TD,
+]
+
+ENVIRONMENTS = [EnvironmentType.GRIDWORLD, EnvironmentType.FROZENLAKE]
+
+def run(min_time: float) -> Dict[str, Any]:
+    """Learner updates per second (one update per env step), including update construction"""
+    results = {}
+    for env_type in ENVIRONMENTS:
+        for algo_type in TABULAR_ALGORITHMS:
+            print(f"learner.{algo_type.value}.{env_type.value}")
+            env = StepCounter(create_environment(env_type))
+            config = TrainingConfig(
+                environment=env_type, algorithm=algo_type,
+                n_episodes=50, max_steps=100, n_step=3
+            )
+            
+            def train_chunk() -> int:
+                before = env.steps
+                for _ in create_algorithm(algo_type).train(env, config):
+                    pass
+                return env.steps - before
+            
+            results[f"learner.{algo_type.value}.{env_type.value}.updates_per_sec"] = result(
+                rate(train_chunk, min_time), "updates/s"
+            )
+    return results
@@ -0,0 +1,36 @@
+import numpy as np
+from typing import Any, Dict
+from app.models.schemas import TrainingUpdate
+from benchmarks.common import rate, result
+
+# State counts of the discretized environments (GridWorld 5x5, MountainCar 21^2, CartPole 11^4)
+SNAPSHOT_SIZES = [25, 441, 14641]
+
+def _update(n_states: int = 0) -> TrainingUpdate:
+    snapshot = n_states > 0
+    return TrainingUpdate(
+        episode=10,
+        step=42,
+        reward=1.0,
+        cumulative_reward=123.5,
+        state=[0.01, -0.2, 0.03, 0.4],
+        action=1,
+        value_function={str(i): float(v) for i, v in enumerate(np.random.randn(n_states))} if snapshot else None,
+        policy={str(i): int(a) for i, a in enumerate(np.random.randint(2, size=n_states))} if snapshot else None,
+    )
+
+def run(min_time: float) -> Dict[str, Any]:
+    """Cost of TrainingUpdate.model_dump_json() with and without value/policy snapshots"""
+    results = {}
+    cases = [("no_snapshot", _update())] + [(f"snapshot_{n}", _update(n)) for n in SNAPSHOT_SIZES]
+    for name, update in cases:
+        print(f"serialize.{name}")
+        
+        def dump() -> int:
+            update.model_dump_json()
+            return 1
+        
+        results[f"serialize.{name}.dumps_per_sec"] = result(
+            rate(dump, min_time), "dumps/s", payload_bytes=len(update.model_dump_json())
+        )
+    return results
@@ -0,0 +1,19 @@
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict
+from benchmarks.common import result
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run(min_time: float, repeats: int = 3) -> Dict[str, Any]:
+    """Cold import time of the API process (best of N fresh interpreters)"""
+    print("startup.import_app")
+    env = {**os.environ, "ENV_POOL_SIZES": "{}"}
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import app.main"], cwd=BACKEND_DIR, env=env, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"startup.import_app_ms": result(min(timings), "ms", higher_is_better=False)}
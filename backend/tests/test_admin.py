@@ -0,0 +1,29 @@
+import asyncio
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.main import app
+from app.models.schemas import TrainingConfig
+from app.services.training import training_service
+
+def test_admin_routes_are_closed_without_a_configured_token(monkeypatch):
+    client = TestClient(app)
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+    assert client.get("/api/v1/admin/profiles/missing").status_code == 403
+    assert client.get("/api/v1/admin/profiles/missing", headers={"X-Admin-Token": ""}).status_code == 403
+    
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    assert client.get("/api/v1/admin/profiles/missing", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get("/api/v1/admin/profiles/missing", headers={"X-Admin-Token": "secret"}).status_code == 404
+
+def test_sessions_training_in_worker_processes_are_not_profiled(monkeypatch):
+    client = TestClient(app)
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    config = TrainingConfig(environment="gridworld", algorithm="q_learning", parallel_mode="hogwild", n_workers=2)
+    session_id = asyncio.run(training_service.create_session(config))
+    try:
+        response = client.post(f"/api/v1/admin/sessions/{session_id}/profile", json={"duration_seconds": 1},
+                               headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 400
+        assert training_service.sessions[session_id].profile_job is None
+    finally:
+        training_service.delete_session(session_id)
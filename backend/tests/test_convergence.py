@@ -0,0 +1,50 @@
+import numpy as np
+from app.algorithms.convergence import ConvergenceMonitor
+from app.models.schemas import ConvergenceConfig, TrainingConfig
+
+def _first_stop(monitor, tables, returns):
+    """(episode, reason) of the first criterion met, or None"""
+    for episode, (q_table, episode_return) in enumerate(zip(tables, returns), start=1):
+        reason = monitor.update(q_table, episode_return)
+        if reason is not None:
+            return episode, reason
+    return None
+
+def test_stable_greedy_policy_stops_after_the_configured_episodes():
+    monitor = ConvergenceMonitor(ConvergenceConfig(check_every=5, policy_stable_episodes=10))
+    q_table = np.random.random((16, 4))
+    assert _first_stop(monitor, [q_table] * 100, [0.0] * 100) == (15, "policy_stable")
+
+def test_changing_greedy_policy_keeps_training():
+    monitor = ConvergenceMonitor(ConvergenceConfig(check_every=1, policy_stable_episodes=3))
+    tables = [np.eye(4)[np.arange(16) % 4 if episode % 2 else (np.arange(16) + 1) % 4] for episode in range(100)]
+    assert _first_stop(monitor, tables, [0.0] * 100) is None
+
+def test_small_q_changes_stop_after_patience_checks():
+    config = ConvergenceConfig(check_every=1, q_change_threshold=0.1, patience=2)
+    calm = [np.full((4, 2), 1.0 + 0.01 * episode) for episode in range(100)]
+    assert _first_stop(ConvergenceMonitor(config), calm, [0.0] * 100) == (3, "q_converged")
+    moving = [np.full((4, 2), float(episode)) for episode in range(100)]
+    assert _first_stop(ConvergenceMonitor(config), moving, [0.0] * 100) is None
+
+def test_return_plateau_compares_consecutive_windows():
+    config = ConvergenceConfig(check_every=1, return_window=5)
+    assert _first_stop(ConvergenceMonitor(config), [None] * 100, [3.0] * 100) == (10, "return_plateau")
+    assert _first_stop(ConvergenceMonitor(config), [None] * 100, [float(e) for e in range(100)]) is None
+
+def test_no_stop_before_min_episodes():
+    monitor = ConvergenceMonitor(ConvergenceConfig(check_every=1, min_episodes=20, policy_stable_episodes=1))
+    assert _first_stop(monitor, [np.eye(4)] * 100, [0.0] * 100) == (21, "policy_stable")
+
+def test_learner_ends_training_when_converged():
+    from app.algorithms import create_algorithm
+    from app.environments import create_environment
+    config = TrainingConfig(environment="gridworld", algorithm="q_learning", n_episodes=5000, step_delay_ms=1)
+    algorithm = create_algorithm(config.algorithm)
+    algorithm.convergence = ConvergenceMonitor(ConvergenceConfig(check_every=10, return_window=20,
+                                                                 return_tolerance=1e9))
+    env = create_environment(config.environment)
+    updates = list(algorithm.train(env, config))
+    env.close()
+    assert algorithm.convergence_reason == "return_plateau"
+    assert updates[-1].episode == 40 and updates[-1].value_function is not None
@@ -0,0 +1,81 @@
+import importlib
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+from app.algorithms import create_algorithm, kernels
+from app.environments import create_environment
+from app.models.schemas import TrainingConfig
+
+pytestmark = pytest.mark.skipif(not kernels.NUMBA_AVAILABLE, reason="Numba is not installed")
+
+class _UniformStream:
+    """
+    Stands in for np.random in a Python learner, replaying the per-episode uniforms
+    a compiled kernel draws (one row per action choice). With epsilon = 1 every
+    choice is random; choice() only breaks ties between equal Q-values.
+    """
+    
+    def __init__(self, n_rows: int):
+        self.n_rows = n_rows
+        self.rows = None
+        self.row = 0
+    
+    def next_episode(self):
+        self.rows = np.random.random((self.n_rows, 3))
+        self.row = 0
+    
+    def random(self):
+        return self.rows[self.row, 0]
+    
+    def randint(self, n):
+        action = min(int(self.rows[self.row, 1] * n), n - 1)
+        self.row += 1
+        return action
+    
+    def choice(self, options):
+        return options[0]
+
+class _NumpyWithStream:
+    def __init__(self, stream: _UniformStream):
+        self.random = stream
+    
+    def __getattr__(self, name):
+        return getattr(np, name)
+
+def _train(monkeypatch, algorithm: str, use_jit: bool, **fields) -> np.ndarray:
+    config = TrainingConfig(environment="gridworld", algorithm=algorithm, use_jit=use_jit, step_delay_ms=1,
+                            n_episodes=300, epsilon=1.0, learning_rate=0.1, discount_factor=0.9, **fields)
+    env = create_environment(config.environment)
+    learner = create_algorithm(config.algorithm)
+    if not use_jit:
+        # Same rows as _train_compiled draws: the kernel's step limit + 1
+        n_rows = (env.max_steps if algorithm == "n_step_td" else min(config.max_steps, env.max_steps)) + 1
+        stream = _UniformStream(n_rows)
+        monkeypatch.setattr(importlib.import_module(type(learner).__module__), "np", _NumpyWithStream(stream))
+        reset = env.reset
+        def reset_and_draw():
+            observation = reset()
+            stream.next_episode()
+            return observation
+        monkeypatch.setattr(env, "reset", reset_and_draw)
+    np.random.seed(0)
+    for _ in learner.train(env, config):
+        pass
+    return np.array([learner.q_table[state] for state in range(learner.n_states)])
+
+@pytest.mark.parametrize("algorithm,fields", [
+    ("q_learning", {}),
+    ("sarsa", {}),
+    ("n_step_td", {"n_step": 3}),
+])
+def test_kernels_match_python_learners(monkeypatch, algorithm, fields):
+    compiled = _train(monkeypatch, algorithm, True, **fields)
+    python = _train(monkeypatch, algorithm, False, **fields)
+    np.testing.assert_allclose(compiled, python, rtol=1e-9, atol=1e-12)
+
+def test_python_learners_do_not_load_numba():
+    code = ("import sys, app.algorithms.q_learning, app.algorithms.sarsa, app.algorithms.n_step_td; "
+            "assert 'numba' not in sys.modules")
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.dirname(os.path.dirname(__file__)))
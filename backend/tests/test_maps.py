@@ -0,0 +1,13 @@
+import time
+import numpy as np
+from app.environments.maps import generate_map, is_solvable, next_state_table
+
+def test_dense_random_maps_are_solvable_without_redraws():
+    # Past the percolation threshold (about 0.4) nearly every unconstrained layout is blocked
+    moves = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+    started = time.perf_counter()
+    grid = generate_map(512, 0.8, seed=0)
+    assert time.perf_counter() - started < 1
+    assert 0.75 < (grid != 0).mean() < 0.85
+    assert is_solvable(grid, next_state_table(512, moves))
+    np.testing.assert_array_equal(generate_map(512, 0.8, seed=0), grid)
@@ -0,0 +1,60 @@
+import re
+from app.services import metrics
+from app.services.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+SAMPLE = re.compile(r'^([a-z_]+)(\{[a-z_]+="[^"]*"(,[a-z_]+="[^"]*")*\})? (\S+)$')
+
+def test_registry_renders_the_prometheus_text_format():
+    registry = MetricsRegistry()
+    steps = registry.register(Counter("test_steps_total", "Steps taken", ["session_id"]))
+    depth = registry.register(Gauge("test_queue_depth", "Pending updates"))
+    latency = registry.register(Histogram("test_send_seconds", "Send time", buckets=(0.01, 0.1)))
+    steps.labels("a").inc(3)
+    steps.labels("b").inc()
+    depth.set(2)
+    for seconds in (0.005, 0.05, 0.05, 5.0):
+        latency.observe(seconds)
+    
+    text = registry.render()
+    assert text.endswith("\n")
+    assert text.splitlines() == [
+        "# HELP test_steps_total Steps taken",
+        "# TYPE test_steps_total counter",
+        'test_steps_total{session_id="a"} 3.0',
+        'test_steps_total{session_id="b"} 1.0',
+        "# HELP test_queue_depth Pending updates",
+        "# TYPE test_queue_depth gauge",
+        "test_queue_depth 2",
+        "# HELP test_send_seconds Send time",
+        "# TYPE test_send_seconds histogram",
+        'test_send_seconds_bucket{le="0.01"} 1',
+        'test_send_seconds_bucket{le="0.1"} 3',
+        'test_send_seconds_bucket{le="+Inf"} 4',
+        f"test_send_seconds_sum {0.005 + 0.05 + 0.05 + 5.0}",
+        "test_send_seconds_count 4",
+    ]
+    
+    steps.remove("a")
+    assert 'test_steps_total{session_id="a"}' not in registry.render()
+
+def test_every_application_sample_belongs_to_a_declared_metric():
+    session = metrics.SessionMetrics("format-test")
+    session.record_step(5)
+    session.record_sent(100, 0.002, 3)
+    try:
+        declared = {}
+        for line in metrics.registry.render().splitlines():
+            if line.startswith("# TYPE "):
+                _, _, name, kind = line.split(" ")
+                declared[name] = kind
+                continue
+            if line.startswith("#"):
+                continue
+            match = SAMPLE.match(line)
+            assert match, line
+            name = match.group(1)
+            base = re.sub(r"_(bucket|sum|count)$", "", name) if name not in declared else name
+            assert base in declared, line
+            float(match.group(4))
+    finally:
+        session.remove()
@@ -0,0 +1,39 @@
+import time
+import pytest
+from app.algorithms import create_algorithm
+from app.environments import create_environment
+from app.models.schemas import TrainingConfig
+
+def _config(**fields) -> TrainingConfig:
+    return TrainingConfig(algorithm="value_iteration", step_delay_ms=1, **fields)
+
+def test_collection_yields_between_slices():
+    # Collecting 200 MountainCar episodes takes over a second; no single step may hold the event loop that long
+    config = _config(environment="mountaincar", model_episodes=200, model_rounds=1)
+    env = create_environment(config.environment)
+    algorithm = create_algorithm(config.algorithm)
+    longest = 0.0
+    updates = 0
+    try:
+        generator = algorithm.train(env, config)
+        while True:
+            started = time.perf_counter()
+            update = next(generator, None)
+            longest = max(longest, time.perf_counter() - started)
+            if update is None:
+                break
+            updates += 1
+    finally:
+        env.close()
+    assert updates > 5
+    assert longest < 0.5
+    assert len(algorithm.value_function) == algorithm.n_states
+
+def test_learned_models_are_limited_to_cartpole_and_mountaincar():
+    config = _config(environment="breakout")
+    env = create_environment(config.environment)
+    try:
+        with pytest.raises(ValueError, match="cartpole/mountaincar"):
+            next(create_algorithm(config.algorithm).train(env, config))
+    finally:
+        env.close()
@@ -0,0 +1,87 @@
+import time
+import numpy as np
+from app.algorithms import create_algorithm
+from app.algorithms.actor_learner import RECORDS_PER_POLL, ActorLearnerRunner
+from app.algorithms.hogwild import HogwildRunner
+from app.environments import create_environment
+from app.models.schemas import TrainingConfig
+from app.services.learning_curves import EpisodeLog
+
+def _greedy_return(q_table: np.ndarray) -> float:
+    """Return of the greedy policy from the start of the default GridWorld"""
+    env = create_environment("gridworld")
+    state = env.reset().observation
+    total = 0.0
+    for _ in range(env.max_steps):
+        step = env.step(int(np.argmax(q_table[state])))
+        total += step.reward
+        state = step.observation
+        if step.done:
+            break
+    return total
+
+def _train(parallel_mode: str) -> np.ndarray:
+    np.random.seed(0)
+    config = TrainingConfig(environment="gridworld", algorithm="q_learning", parallel_mode=parallel_mode,
+                            n_workers=2, n_episodes=400, epsilon=0.2, learning_rate=0.2, step_delay_ms=1)
+    learner = create_algorithm(config.algorithm)
+    env = create_environment(config.environment)
+    updates = list(learner.train(env, config))
+    assert updates[-1].episode == config.n_episodes
+    return learner.q_table
+
+def test_hogwild_learns_the_serial_policy():
+    serial = _train("none")
+    assert _greedy_return(_train("hogwild")) == _greedy_return(serial) > 0
+
+def test_hogwild_workers_are_joined_on_close():
+    config = TrainingConfig(environment="gridworld", algorithm="q_learning", n_workers=2, n_episodes=100000)
+    n_states = create_environment(config.environment).get_state_space()['n']
+    runner = HogwildRunner(np.zeros((n_states, 4)), config, {})
+    runner.start(seed=0)
+    while runner.totals()[0] == 0:
+        assert runner.is_alive()
+    runner.close()
+    assert runner.workers.wait(timeout=30)
+    assert runner.workers.processes and not any(process.is_alive() for process in runner.workers.processes)
+    assert runner.q.array is None  # shared memory freed after the join
+
+def test_actor_learner_learns_the_serial_policy():
+    serial = _train("none")
+    assert _greedy_return(_train("actor_learner")) == _greedy_return(serial) > 0
+
+def test_actors_are_joined_on_close():
+    config = TrainingConfig(environment="gridworld", algorithm="q_learning", n_workers=2, n_episodes=100000)
+    n_states = create_environment(config.environment).get_state_space()['n']
+    runner = ActorLearnerRunner(np.zeros((n_states, 4)), config, {})
+    runner.start(seed=0)
+    while not any(len(batch) for batch in runner.drain(16)):
+        assert runner.is_alive()
+    runner.close()
+    assert runner.workers.wait(timeout=30)
+    assert runner.workers.processes and not any(process.is_alive() for process in runner.workers.processes)
+    assert runner.policy.array is None
+
+def test_actor_learner_polls_take_a_bounded_number_of_records():
+    config = TrainingConfig(environment="gridworld", algorithm="q_learning", parallel_mode="actor_learner",
+                            n_workers=2, n_episodes=3000, step_delay_ms=1)
+    learner = create_algorithm(config.algorithm)
+    records = []
+    for update in learner.train(create_environment(config.environment), config):
+        records.append(learner.update_env_steps)
+        time.sleep(0.05)  # a slow consumer lets the rings fill up
+    assert RECORDS_PER_POLL // 2 < max(records) <= RECORDS_PER_POLL
+
+def test_hogwild_logs_each_episode():
+    config = TrainingConfig(environment="gridworld", algorithm="q_learning", parallel_mode="hogwild",
+                            n_workers=2, n_episodes=300, step_delay_ms=1)
+    learner = create_algorithm(config.algorithm)
+    learner.episode_log = EpisodeLog()
+    for _ in learner.train(create_environment(config.environment), config):
+        pass
+    _, rewards, lengths = learner.episode_log.curve(config.n_episodes, "none")
+    assert len(learner.episode_log) == config.n_episodes
+    # Real episodes: -0.01 per step, then the goal (1), a hole (-1) or the time limit (-0.01)
+    assert np.array_equal(lengths, np.round(lengths)) and lengths.min() >= 1
+    last_rewards = rewards + 0.01 * (lengths - 1)
+    assert np.isclose(last_rewards[:, None], [1.0, -1.0, -0.01]).any(axis=1).all()
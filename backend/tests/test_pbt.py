@@ -0,0 +1,34 @@
+import asyncio
+import numpy as np
+from app.models.schemas import PBTConfig, TrainingConfig
+from app.services.pbt import EPSILON, LEARNING_RATE, SCORE, SOURCE, PopulationRun
+
+def test_bottom_members_copy_a_top_member_and_perturb_its_hyperparameters():
+    config = PBTConfig(base=TrainingConfig(environment="gridworld", algorithm="q_learning"), population_size=8,
+                       exploit_fraction=0.25, perturb_factors=(0.5, 2.0), seed=3)
+    run = PopulationRun(config, n_states=5, n_actions=2)
+    try:
+        rows = run.rows
+        scores = np.array([5.0, 1.0, 7.0, 0.0, 3.0, 8.0, 2.0, 4.0])
+        rows[:, SCORE] = scores
+        for member in range(8):
+            run.tables.array[member] = member
+        before = np.array(rows)
+        
+        run.exploit_and_explore()
+        bottom, top = {3, 1}, {5, 2}
+        assert int(run.release.array[0]) == 1
+        assert {event.member for event in run.events} == bottom
+        for member in range(8):
+            source = int(rows[member, SOURCE])
+            if member not in bottom:
+                assert source == -1 and np.all(run.tables.array[member] == member)
+                assert np.array_equal(rows[member], np.append(before[member, :SOURCE], -1))
+                continue
+            assert source in top and np.all(run.tables.array[member] == source)
+            for column, bounds in ((LEARNING_RATE, config.learning_rate_range), (EPSILON, config.epsilon_range)):
+                candidates = np.clip(before[source, column] * np.array(config.perturb_factors), *bounds)
+                assert np.isclose(rows[member, column], candidates).any()
+        assert all(event.generation == 1 and event.source == rows[event.member, SOURCE] for event in run.events)
+    finally:
+        asyncio.run(run.finish("completed"))
@@ -0,0 +1,53 @@
+import time
+import numpy as np
+import pytest
+from app.models.schemas import BatchSolveRequest, PreviousSolution, ResolveRequest
+from app.services import planning
+
+EDITED_MAP = ['SFFFF', 'FHFFF', 'FFHFF', 'FHHHF', 'FFFFG']  # default FrozenLake map plus one hole
+
+def _request(**fields) -> ResolveRequest:
+    return ResolveRequest(environment="frozenlake", is_slippery=True, theta=1e-8, **fields)
+
+def _previous(result) -> PreviousSolution:
+    return PreviousSolution(value_function=result.value_function, discount_factor=result.discount_factor,
+                            desc=result.desc, is_slippery=True)
+
+def test_policy_iteration_rejects_undiscounted_problems():
+    with pytest.raises(ValueError, match="discount_factor < 1"):
+        planning.resolve(ResolveRequest(environment="gridworld", algorithm="policy_iteration", discount_factor=1.0))
+
+def test_policy_iteration_respects_max_sweeps():
+    # The all-UP start policy never reaches the goal, so evaluating it takes many sweeps near gamma = 1
+    started = time.perf_counter()
+    result = planning.resolve(ResolveRequest(environment="gridworld", algorithm="policy_iteration",
+                                             discount_factor=0.9999, theta=1e-12, max_sweeps=10))
+    assert time.perf_counter() - started < 5
+    assert not result.converged
+    assert result.sweeps <= 11
+
+def test_warm_policy_iteration_matches_cold_solve():
+    base = planning.resolve(_request(algorithm="policy_iteration"))
+    cold = planning.resolve(_request(algorithm="policy_iteration", desc=EDITED_MAP))
+    warm = planning.resolve(_request(algorithm="policy_iteration", desc=EDITED_MAP, previous=_previous(base)))
+    assert base.converged and cold.converged and warm.converged
+    assert warm.changed_states > 0
+    np.testing.assert_allclose(warm.value_function, cold.value_function, atol=1e-6)
+    assert warm.backups < cold.backups
+
+def test_policy_and_value_iteration_agree():
+    vi = planning.resolve(_request(desc=EDITED_MAP))
+    pi = planning.resolve(_request(algorithm="policy_iteration", desc=EDITED_MAP))
+    np.testing.assert_allclose(pi.value_function, vi.value_function, atol=1e-5)
+
+def test_batch_solve_matches_single_value_iteration():
+    request = BatchSolveRequest(environment="frozenlake", map_size=6, hole_fraction=0.2, map_seeds=[1, 2],
+                                is_slippery=[True, False], discount_factors=[0.9, 0.99], theta=1e-10)
+    result = planning.solve_batch(request)
+    assert len(result.solutions) == 8
+    for solution in result.solutions:
+        single = planning.resolve(ResolveRequest(
+            environment="frozenlake", map_size=6, hole_fraction=0.2, map_seed=solution.map_seed,
+            is_slippery=solution.is_slippery, discount_factor=solution.discount_factor, theta=1e-10))
+        assert solution.converged and single.converged
+        np.testing.assert_allclose(solution.value_function, single.value_function, atol=1e-8)
@@ -0,0 +1,21 @@
+import asyncio
+import tracemalloc
+from types import SimpleNamespace
+from app.models.schemas import ProfileRequest
+from app.services.profiling import ProfilerService
+
+def test_overlapping_memory_profiles_share_tracemalloc():
+    async def run():
+        service = ProfilerService()
+        first = service.start(SimpleNamespace(id="a", profile_job=None),
+                              ProfileRequest(duration_seconds=0.05, trace_memory=True))
+        second = service.start(SimpleNamespace(id="b", profile_job=None),
+                               ProfileRequest(duration_seconds=0.2, trace_memory=True))
+        await asyncio.sleep(0.1)
+        assert first.status == "completed" and tracemalloc.is_tracing()
+        await asyncio.sleep(0.2)
+        return first, second
+    first, second = asyncio.run(run())
+    assert second.status == "completed"
+    assert first.memory_report is not None and second.memory_report is not None
+    assert not tracemalloc.is_tracing()
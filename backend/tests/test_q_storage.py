@@ -0,0 +1,54 @@
+import tracemalloc
+import numpy as np
+from app.algorithms import create_algorithm
+from app.algorithms.convergence import ConvergenceMonitor
+from app.algorithms.projections import Projection
+from app.algorithms.q_storage import HashedQTable, export_table, import_table
+from app.environments import create_environment, environment_options
+from app.models.schemas import ConvergenceConfig, TrainingConfig
+
+def test_hashed_table_matches_dense_updates():
+    rng = np.random.default_rng(0)
+    hashed = HashedQTable(1_000_000, 3, np.float32)
+    dense = {}
+    first = hashed[5]  # views stay valid while later rows and rehashes are added
+    dense[5] = first.copy()
+    for state in rng.integers(1_000_000, size=5000).tolist():
+        action = int(rng.integers(3))
+        if state not in dense:
+            dense[state] = hashed[state].copy()
+        hashed[state][action] += 1.0
+        dense[state][action] += np.float32(1.0)
+    first[0] += 2.0
+    dense[5][0] += np.float32(2.0)
+    states, rows = hashed.items()
+    assert states.tolist() == sorted(dense)
+    np.testing.assert_array_equal(rows, np.array([dense[state] for state in sorted(dense)]))
+    restored = import_table("q_table", export_table("q_table", hashed), hashed.n_states)
+    np.testing.assert_array_equal(restored.items()[1], rows)
+    assert restored.dtype == np.float32
+
+def test_hashed_cartpole_trains_in_memory_bounded_by_visited_states():
+    # 101^4 (about 10^8) states: a dense float32 table alone would take 830 MB
+    config = TrainingConfig(environment="cartpole", algorithm="q_learning", n_episodes=60, step_delay_ms=1,
+                            n_bins=100, q_table_backend="hashed", q_table_dtype="float32")
+    env = create_environment(config.environment, **environment_options(config))
+    algorithm = create_algorithm(config.algorithm)
+    algorithm.convergence = ConvergenceMonitor(ConvergenceConfig(check_every=5, policy_stable_episodes=1000,
+                                                                 q_change_threshold=1e-9))
+    tracemalloc.start()
+    try:
+        snapshots = sum(update.value_function is not None for update in algorithm.train(env, config))
+        value_function, policy = algorithm._snapshot(True)
+        algorithm.projection = Projection.for_state_space(env.get_state_space(), "pole_angle,pole_angular_velocity")
+        projected_values, projected_policy = algorithm._snapshot(True)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        env.close()
+    n_rows = algorithm.q_table.n_rows
+    assert algorithm.n_states == 101 ** 4
+    assert snapshots >= 1
+    assert peak < 32 * 1024 * 1024
+    assert len(value_function) == len(policy) == n_rows
+    assert 0 < len(projected_values) == len(projected_policy) <= min(n_rows, 101 ** 2)
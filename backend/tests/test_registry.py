@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+from app.algorithms import ALGORITHM_REGISTRY, get_algorithm_class
+from app.environments import ENVIRONMENT_REGISTRY
+from app.models.enums import AlgorithmType, EnvironmentType
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(__file__))
+
+def test_every_type_is_registered():
+    assert set(ALGORITHM_REGISTRY) == set(AlgorithmType)
+    assert set(ENVIRONMENT_REGISTRY) == set(EnvironmentType)
+    for algo_type in AlgorithmType:
+        assert get_algorithm_class(algo_type).__name__ == ALGORITHM_REGISTRY[algo_type][1]
+
+def test_serving_gridworld_imports_only_what_it_uses():
+    code = (
+        "import sys\n"
+        "from app.main import app\n"
+        "from app.algorithms import create_algorithm\n"
+        "from app.environments import create_environment\n"
+        "create_environment('gridworld').close()\n"
+        "create_algorithm('q_learning')\n"
+        "loaded = [name for name in ('gymnasium', 'ale_py', 'numba', 'app.environments.cartpole',\n"
+        "                            'app.environments.breakout', 'app.algorithms.sarsa') if name in sys.modules]\n"
+        "assert not loaded, loaded\n"
+        "from app.algorithms import SARSA\n"
+        "assert 'app.algorithms.sarsa' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=BACKEND_DIR,
+                   env={**os.environ, "ENV_POOL_SIZES": "{}"})
@@ -0,0 +1,60 @@
+import asyncio
+import os
+from app.models.schemas import TrainingConfig
+from app.services.training import TrainingService
+
+def test_lookups_that_need_no_tables_leave_sessions_hibernated(tmp_path):
+    async def run():
+        service = TrainingService(hibernation_dir=str(tmp_path))
+        session_id = await service.create_session(TrainingConfig(environment="gridworld", algorithm="q_learning"))
+        session = service.sessions[session_id]
+        session.hibernate(service.hibernation_dir)
+        assert sorted(os.listdir(session.hibernation_path)) == ["curves.npz", "state.npz"]
+        
+        assert service.find_session(session_id).get_status().session_id == session_id
+        await service.stop_training(session_id)
+        assert session.is_hibernated
+        
+        fork_id = await service.fork_session(session_id, {"epsilon": 0.2})
+        assert not session.is_hibernated and service.sessions[fork_id].forked_from == session_id
+        
+        session.hibernate(service.hibernation_dir)
+        assert (await service.get_session(session_id)).algorithm is not None
+        session.hibernate(service.hibernation_dir)
+        path = session.hibernation_path
+        service.delete_session(session_id)
+        assert session.algorithm is None and not os.path.exists(path)
+    asyncio.run(run())
+
+def test_reaper_hibernates_least_recently_used_idle_sessions_until_within_budget(tmp_path):
+    async def run():
+        service = TrainingService(hibernation_dir=str(tmp_path))
+        config = TrainingConfig(environment="gridworld", algorithm="q_learning")
+        sessions = [service.sessions[await service.create_session(config)] for _ in range(4)]
+        for age, session in enumerate(reversed(sessions)):
+            session.last_accessed = 1000.0 - age
+        sessions[0].is_running = True  # oldest, but busy
+        size = sessions[0].estimate_memory()
+        assert size > 0 and all(session.estimate_memory() == size for session in sessions)
+        
+        service.memory_budget = int(2.5 * size)
+        await service.reap()
+        assert [session.is_hibernated for session in sessions] == [False, True, True, False]
+        assert service.get_memory_usage() <= service.memory_budget
+        
+        await service.reap()
+        assert [session.is_hibernated for session in sessions] == [False, True, True, False]
+        assert (await service.get_session(sessions[1].id)).algorithm is not None
+    asyncio.run(run())
+
+def test_lookup_during_hibernation_waits_and_rehydrates(tmp_path):
+    async def run():
+        service = TrainingService(hibernation_dir=str(tmp_path), memory_budget=0)
+        session_id = await service.create_session(TrainingConfig(environment="gridworld", algorithm="q_learning"))
+        reaping = asyncio.create_task(service.reap())
+        await asyncio.sleep(0)
+        assert service.sessions[session_id].rehydrating.locked()
+        session = await service.get_session(session_id)
+        await reaping
+        assert not session.is_hibernated and session.algorithm is not None
+    asyncio.run(run())
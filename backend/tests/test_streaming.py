@@ -0,0 +1,54 @@
+import asyncio
+import json
+import numpy as np
+from app.models.schemas import TrainingConfig
+from app.services.training import TrainingService
+
+class RecordingSocket:
+    def __init__(self):
+        self.frames = []
+
+    async def send_text(self, text: str):
+        self.frames.append(json.loads(text))
+
+def _expand(frames):
+    """Client-side view of the stream: batch frames unpacked into their updates"""
+    updates = []
+    for frame in frames:
+        if frame.get("type") != "batch":
+            if "episode" in frame:
+                updates.append(frame)
+            continue
+        snapshots = {snapshot["index"]: snapshot for snapshot in frame["snapshots"]}
+        for i in range(frame["n"]):
+            snapshot = snapshots.get(i, {})
+            updates.append({
+                "episode": frame["episode"][i], "step": frame["step"][i], "reward": frame["reward"][i],
+                "cumulative_reward": frame["cumulative_reward"][i], "state": frame["state"][i],
+                "action": frame["action"][i], "value_function": snapshot.get("value_function"),
+                "policy": snapshot.get("policy"), "projection": snapshot.get("projection"),
+            })
+    return updates
+
+def _stream(tmp_path, stream_batch_ms):
+    async def run():
+        service = TrainingService(hibernation_dir=str(tmp_path))
+        config = TrainingConfig(environment="gridworld", algorithm="q_learning", n_episodes=3, max_steps=20,
+                                step_delay_ms=1, stream_batch_ms=stream_batch_ms)
+        session = service.sessions[await service.create_session(config)]
+        session.websocket = socket = RecordingSocket()
+        np.random.seed(0)
+        await service.start_training(session.id)
+        await session.task
+        return socket.frames
+    return asyncio.run(run())
+
+def test_batched_frames_carry_the_per_update_stream(tmp_path):
+    single = _stream(tmp_path, 0)
+    batched = _stream(tmp_path, 50)
+    assert all(frame.get("type") != "batch" for frame in single)
+    assert any(frame.get("type") == "batch" and frame["n"] > 1 for frame in batched)
+    assert len(batched) < len(single)
+    expanded = _expand(batched)
+    assert expanded == [{key: update[key] for key in expanded[0]} for update in _expand(single)]
+    assert batched[-1] == single[-1] == {"status": "completed"}
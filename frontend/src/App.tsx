@@ -52,6 +52,7 @@ function App() {
       discount_factor: discountFactor,
       n_step: algo === 'n_step_td' ? nStep : 1,
       step_delay_ms: stepDelay,
+      stream_batch_ms: 32,
     });
   };
 
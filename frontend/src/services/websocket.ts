@@ -1,7 +1,31 @@
-import type { TrainingUpdate } from '../types/training';
+import type { TrainingUpdate, UpdateBatch } from '../types/training';
 
 const WS_URL = import.meta.env.VITE_WS_URL || 'ws://localhost:8000';
 
+// Expand a columnar batch frame (config.stream_batch_ms) into its updates, in order
+export function unpackBatch(batch: UpdateBatch): TrainingUpdate[] {
+    const updates: TrainingUpdate[] = [];
+    for (let i = 0; i < batch.n; i++) {
+        updates.push({
+            episode: batch.episode[i],
+            step: batch.step[i],
+            reward: batch.reward[i],
+            cumulative_reward: batch.cumulative_reward[i],
+            state: batch.state[i],
+            action: batch.action[i],
+            value_function: null,
+            policy: null,
+        });
+    }
+    for (const snapshot of batch.snapshots) {
+        const update = updates[snapshot.index];
+        update.value_function = snapshot.value_function;
+        update.policy = snapshot.policy;
+        update.projection = snapshot.projection;
+    }
+    return updates;
+}
+
 export class TrainingWebSocket {
     private ws: WebSocket | null = null;
     private onMessageCallback: ((data: TrainingUpdate) => void) | null = null;
@@ -34,16 +58,25 @@ export class TrainingWebSocket {
 
                     // Check if this is a completion message
                     if (data.status === 'completed') {
-                        console.log('✅ Training completed');
+                        console.log('✅ Training completed', data.convergence_reason ? `(converged: ${data.convergence_reason})` : '');
                         if (this.onCompleteCallback) {
                             this.onCompleteCallback();
                         }
                         return;
                     }
 
-                    // Otherwise treat as regular training update
+                    if (data.error) {
+                        console.error('Training WebSocket error:', data.error);
+                        return;
+                    }
+
+                    // Otherwise treat as regular training update (or a batch of them)
                     if (this.onMessageCallback) {
-                        this.onMessageCallback(data as TrainingUpdate);
+                        if (data.type === 'batch') {
+                            unpackBatch(data as UpdateBatch).forEach(this.onMessageCallback);
+                        } else {
+                            this.onMessageCallback(data as TrainingUpdate);
+                        }
                     }
                 } catch (error) {
                     console.error('Error parsing WebSocket message:', error);
@@ -90,6 +123,12 @@ export class TrainingWebSocket {
         }
     }
 
+    // Ask for value function/policy snapshots projected onto some state dimensions
+    // (e.g. ['pole_angle', 'pole_angular_velocity']); no dimensions restores full snapshots
+    setProjection(dimensions: string[] = [], reduce: 'max' | 'mean' = 'max') {
+        this.send(dimensions.length ? `PROJECT ${dimensions.join(',')} ${reduce}` : 'PROJECT');
+    }
+
     send(message: string) {
         if (this.ws && this.ws.readyState === WebSocket.OPEN) {
             this.ws.send(message);
@@ -8,6 +8,23 @@ export interface TrainingConfig {
     max_steps: number;
     n_step: number;
     step_delay_ms: number;
+    stream_batch_ms?: number;
+    n_bins?: number | null;
+    // 'hashed' allocates Q-table rows on first visit (large n_bins)
+    q_table_backend?: 'dense' | 'hashed';
+    q_table_dtype?: 'float64' | 'float32';
+    convergence?: ConvergenceConfig | null;
+}
+
+// Early stopping: training ends when any enabled criterion holds
+export interface ConvergenceConfig {
+    check_every?: number;
+    min_episodes?: number;
+    policy_stable_episodes?: number | null;
+    return_window?: number | null;
+    return_tolerance?: number;
+    q_change_threshold?: number | null;
+    patience?: number;
 }
 
 export interface TrainingUpdate {
@@ -17,8 +34,35 @@ export interface TrainingUpdate {
     cumulative_reward: number;
     state: any;
     action: number;
+    // Keyed by state; hashed Q-tables (q_table_backend='hashed') only send visited states
     value_function?: Record<string, number> | null;
     policy?: Record<string, number> | null;
+    // Present when value_function/policy are projected onto a few state dimensions
+    projection?: SnapshotProjection | null;
+}
+
+// Columnar frame carrying several updates (sent when config.stream_batch_ms > 0)
+export interface UpdateBatch {
+    type: 'batch';
+    n: number;
+    episode: number[];
+    step: number[];
+    reward: number[];
+    cumulative_reward: number[];
+    state: any[];
+    action: number[];
+    snapshots: {
+        index: number;
+        value_function?: Record<string, number> | null;
+        policy?: Record<string, number> | null;
+        projection?: SnapshotProjection | null;
+    }[];
+}
+
+export interface SnapshotProjection {
+    dimensions: string[];
+    shape: number[];
+    reduce: 'max' | 'mean';
 }
 
 export interface TrainingStatus {